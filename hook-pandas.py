@@ -1,23 +1,33 @@
-from PyInstaller.utils.hooks import collect_all, collect_data_files
+from PyInstaller.utils.hooks import collect_submodules, copy_metadata
 
-# 收集 pandas 模块的全部依赖和数据文件
-datas, binaries, hiddenimports = collect_all('pandas')
-
-# 补充常用子模块（保证 Excel 读写、日期、缺失值转换功能正常）
-hiddenimports += [
-    'pandas.core',
-    'pandas.core.frame',
-    'pandas.core.dtypes',
-    'pandas.core.tools',
-    'pandas.io',
-    'pandas.io.excel',
+# 只打包实际用到的部分：核心 + 日期/缺失值（C 扩展）+ Excel(openpyxl)，不再 collect_all('pandas')
+hiddenimports = collect_submodules('pandas._libs') + [
     'pandas.io.excel._openpyxl',
-    'padas._libs',
-    'pandas._libs.tslibs',
-    'pandas._libs.missing',
-    'pandas.compact',
-    'pandas.util',
+    'pandas.io.excel._calamine',
+    'pandas.io.parsers.arrow_parser_wrapper',
+    'pandas.io.formats.format',
+    'pandas.io.parquet',
+    'pandas.io.pickle',
+    'pandas.io.sql',
 ]
 
-datas += collect_data_files('pandas')
+# pandas 启动时读取自身版本信息
+datas = copy_metadata('pandas')
 
+# 测试、绘图和用不到的格式
+excludedimports = [
+    'pandas.tests',
+    'pandas.plotting',
+    'pandas.io.clipboard',
+    'pandas.io.formats.style',
+    'pandas.io.html',
+    'pandas.io.spss',
+    'pandas.io.stata',
+    'pandas.io.sas',
+    'matplotlib',
+    'IPython',
+    'jinja2',
+    'scipy',
+    'tables',
+    'sqlalchemy',
+]
@@ -0,0 +1,149 @@
+# 命令行批量处理：多进程并行生成日报和汇总，不依赖 Qt
+
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ivr_config import ConfigManager
+
+# 与 ivr_loader.INPUT_PATTERNS 保持一致（这里不导入 ivr_loader，避免主进程加载 pandas）
+INPUT_PATTERNS = ("*.xlsx", "*.xlsm", "*.xls", "*.csv", "*.parquet")
+
+
+def collect_files(inputs: list) -> list:
+    """目录 / 通配符 / 文件路径 -> 去重后的文件列表（保持给定顺序）"""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for pattern in INPUT_PATTERNS:
+                files.extend(sorted(glob.glob(os.path.join(item, pattern))))
+        elif glob.has_magic(item):
+            files.extend(sorted(glob.glob(item, recursive=True)))
+        else:
+            files.append(item)
+    # Excel 打开文件时留下的 ~$ 临时文件
+    files = [f for f in files if not os.path.basename(f).startswith("~$")]
+    return list(dict.fromkeys(os.path.abspath(f) for f in files))
+
+
+def output_stems(files: list) -> dict:
+    """每个文件的输出文件名前缀：默认为文件名（不含扩展名）
+
+    所有文件写到同一个输出目录，各团队目录下同名的 export.xlsx、同名不同扩展名的
+    a.xlsx / a.csv 会互相覆盖：重名的改用相对公共目录的路径（teamA_export），
+    仍重名再附上扩展名（a_xlsx）。大小写不同也算重名（Windows 文件名不区分大小写）。
+    """
+    def plain(f):
+        return os.path.splitext(os.path.basename(f))[0]
+
+    def relative(f):
+        path = os.path.splitext(os.path.relpath(f, root))[0]
+        return path.replace(os.sep, "_").replace("/", "_")
+
+    def clashing(stems):
+        counts = {}
+        for stem in stems.values():
+            counts[stem.lower()] = counts.get(stem.lower(), 0) + 1
+        return {f for f, stem in stems.items() if counts[stem.lower()] > 1}
+
+    root = os.path.commonpath([os.path.dirname(f) for f in files]) if files else ""
+    stems = {f: plain(f) for f in files}
+    for rename in (relative, lambda f: f"{relative(f)}_{os.path.splitext(f)[1].lstrip('.').lower()}"):
+        for f in clashing(stems):
+            stems[f] = rename(f)
+    if clashing(stems):
+        raise ValueError("输出文件名重复：" + "、".join(sorted(clashing(stems))))
+    return stems
+
+
+# -f 选项 -> 导出格式（both 为旧版的 json + csv）
+OUTPUT_FORMATS = {
+    "json": ("json",),
+    "csv": ("csv",),
+    "xlsx": ("xlsx",),
+    "html": ("html",),
+    "both": ("json", "csv"),
+    "all": ("json", "csv", "xlsx", "html"),
+}
+
+
+def write_reports(out_dir: str, stem: str, daily: dict, summary: dict, fmt: str, events=None) -> list:
+    """写出 <stem>_daily / <stem>_summary（以及违规明细），fmt 为 OUTPUT_FORMATS 的键；返回写出的文件"""
+    from ivr_export import export_report
+
+    return export_report(os.path.join(out_dir, stem), OUTPUT_FORMATS[fmt], daily, summary, events)
+
+
+def process_file(file_name: str, config: dict, out_dir: str, fmt: str, stem: str | None = None) -> dict:
+    """单个文件：读取 -> 统计 -> 写出，在子进程中运行；stem 为输出文件名前缀（见 output_stems）"""
+    from ivr_engine import (daily_violations, load_roster, run_report, summarize_report, violation_events,
+                            ShiftCalendar)
+    from ivr_metrics import profiled
+
+    if not os.path.isfile(file_name):
+        raise FileNotFoundError(f"文件不存在：{file_name}")
+
+    stem = stem or os.path.splitext(os.path.basename(file_name))[0]
+    with profiled(stem):
+        column_map = config.get("column_config", {})
+        roster = None
+        if config.get("roster_file"):
+            roster = load_roster(config["roster_file"], column_map)
+        calendar = ShiftCalendar(config.get("shift_config", {}), roster)
+        # 已在进程池中，文件内的多个 sheet 顺序读取
+        result = run_report(file_name, column_map, calendar, config.get("time_format", ""), workers=1)
+
+        with result.timings.stage("write"):
+            written = write_reports(
+                out_dir, stem, daily_violations(result.report_dict), summarize_report(result.report_dict), fmt,
+                violation_events(result.flagged, result.report_dict),
+            )
+            # 有被剔除或可疑的行时另写一份问题行明细
+            if result.validation:
+                from ivr_validate import write_issue_csv
+
+                written += write_issue_csv(os.path.join(out_dir, f"{stem}_issues.csv"), result.validation)
+    return {"file": file_name, "days": len(result.report_dict), "unparsed": result.unparsed, "written": written,
+            "seconds": result.timings.total(), "memory": result.memory,
+            "validation": result.validation.lines() if result.validation else []}
+
+
+def run_batch(inputs: list, config_path: str | None, out_dir: str, workers: int | None, fmt: str) -> int:
+    """并行处理全部文件，返回进程退出码（有文件失败时为 1）"""
+    if config_path and not os.path.exists(config_path):
+        print(f"配置文件不存在：{config_path}", file=sys.stderr)
+        return 2
+    config = ConfigManager(config_path=config_path).config
+    files = collect_files(inputs)
+    if not files:
+        print("没有找到要处理的文件", file=sys.stderr)
+        return 2
+
+    try:
+        stems = output_stems(files)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_file, f, config, out_dir, fmt, stems[f]): f for f in files}
+        for future in as_completed(futures):
+            file_name = futures[future]
+            try:
+                info = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"失败 {file_name}: {e}", file=sys.stderr)
+                continue
+            note = f"，{info['unparsed']} 个时间无法解析" if info["unparsed"] else ""
+            if info["memory"]:
+                before, after = (sum(info["memory"][k].values()) / 1024 / 1024 for k in ("before", "after"))
+                note += f"，事件表 {before:.1f} MB -> {after:.1f} MB"
+            print(f"完成 {file_name}：{info['days']} 天{note}，耗时 {info['seconds']:.2f}s")
+            for line in info["validation"]:
+                print(f"  {line}")
+    print(f"共 {len(files)} 个文件，成功 {len(files) - failed}，失败 {failed}")
+    return 1 if failed else 0
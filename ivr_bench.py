@@ -0,0 +1,203 @@
+# 性能基准：用模拟数据分阶段计时（读取 / 时间解析 / 统计 / 生成树），结果写成 JSON 便于版本间对比
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+import ivr_loader
+from ivr_engine import (aggregate_flags, flag_events, prepare_events, summarize_report,
+                        EVENT_FIELDS, ShiftCalendar)
+from ivr_loader import load_excel_data
+from ivr_metrics import peak_memory_mb
+from ivr_synth import default_settings, generate_events, write_workbook
+
+# (人数, 天数, 每人每天事件数)
+DEFAULT_SIZES = ("20x7x12", "100x30x12", "300x30x20")
+STAGES = ("load", "normalize", "aggregate", "render")
+# 输入格式；xlsx 在装了 python-calamine 时走 calamine（不论文件大小），xlsx-openpyxl 强制用 openpyxl 流式读取
+FORMATS = ("xlsx", "xlsx-openpyxl", "csv", "parquet")
+
+
+def parse_size(text: str) -> tuple:
+    """"人数x天数x事件数" -> (人数, 天数, 事件数)，事件数可省略（默认 12）"""
+    parts = [int(p) for p in text.lower().split("x")]
+    if len(parts) == 2:
+        parts.append(12)
+    if len(parts) != 3 or min(parts) < 1:
+        raise argparse.ArgumentTypeError(f"规模格式应为 人数x天数[x事件数]：{text}")
+    return tuple(parts)
+
+
+def dataset(data_dir: str, size: tuple, column_map: dict, seed: int = 0, fmt: str = "xlsx") -> str:
+    """生成（或复用已生成的）模拟数据文件"""
+    employees, days, events = size
+    ext = fmt.split("-")[0]
+    path = os.path.join(data_dir, f"synth_{employees}x{days}x{events}_s{seed}.{ext}")
+    if not os.path.exists(path):
+        write_workbook(generate_events(employees, days, events, seed), path, column_map)
+    return path
+
+
+@contextlib.contextmanager
+def input_engine(fmt: str):
+    """xlsx-openpyxl 时临时关闭 calamine，xlsx 时取消 calamine 的文件大小上限"""
+    saved = ivr_loader.HAS_CALAMINE, ivr_loader.CALAMINE_MAX_BYTES
+    ivr_loader.HAS_CALAMINE = saved[0] and fmt != "xlsx-openpyxl"
+    ivr_loader.CALAMINE_MAX_BYTES = float("inf")
+    try:
+        yield
+    finally:
+        ivr_loader.HAS_CALAMINE, ivr_loader.CALAMINE_MAX_BYTES = saved
+
+
+def _tree_builder():
+    """生成树阶段：用 ReportTreeModel 把所有节点全部展开；没有 PyQt6 时返回 None"""
+    try:
+        from ivr_models import daily_nodes, summary_nodes, ReportTreeModel
+    except ImportError:
+        return None
+
+    def expand(model, parent):
+        while model.canFetchMore(parent):
+            model.fetchMore(parent)
+        for row in range(model.rowCount(parent)):
+            expand(model, model.index(row, 0, parent))
+
+    def build(report_dict):
+        daily, summary = ReportTreeModel(), ReportTreeModel()
+        daily.set_nodes(daily_nodes(report_dict))
+        summary.set_nodes(summary_nodes(summarize_report(report_dict)))
+        expand(daily, daily.index(-1, -1))
+        expand(summary, summary.index(-1, -1))
+
+    return build
+
+
+def run_once(file_name: str, column_map: dict, calendar: ShiftCalendar, build_tree) -> dict:
+    timings = {}
+    t = time.perf_counter()
+    df_data = load_excel_data(file_name, column_map)
+    timings["load"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    events, _ = prepare_events(df_data[EVENT_FIELDS])
+    timings["normalize"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    report_dict = aggregate_flags(flag_events(events, calendar))
+    timings["aggregate"] = time.perf_counter() - t
+
+    if build_tree is not None:
+        t = time.perf_counter()
+        build_tree(report_dict)
+        timings["render"] = time.perf_counter() - t
+    return {"rows": len(df_data), "timings": timings}
+
+
+def run_entry(file_name: str, fmt: str, repeat: int, calendar: ShiftCalendar, column_map: dict) -> tuple:
+    """在子进程中跑一个规模、一种格式的 repeat 次，返回 (各次结果, 进程峰值内存 MB)
+
+    峰值内存取的是进程一生的最大值，每种格式单独一个进程才能互相比较。
+    """
+    build_tree = _tree_builder()
+    with input_engine(fmt):
+        runs = [run_once(file_name, column_map, calendar, build_tree) for _ in range(repeat)]
+    return runs, peak_memory_mb()
+
+
+def run_bench(sizes: list, repeat: int, data_dir: str, seed: int = 0, formats=("xlsx",), log=print) -> dict:
+    """每个规模、每种输入格式在单独的子进程中跑 repeat 次，各阶段取中位数和最小值，另记进程峰值内存"""
+    shift_config, column_map = default_settings()
+    calendar = ShiftCalendar(shift_config)
+    if _tree_builder() is None:
+        log("未安装 PyQt6，跳过生成树阶段")
+
+    results = []
+    for size, fmt in [(size, fmt) for size in sizes for fmt in formats]:
+        file_name = dataset(data_dir, size, column_map, seed, fmt)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            runs, peak_mb = pool.submit(run_entry, file_name, fmt, repeat, calendar, column_map).result()
+        entry = {
+            "size": "x".join(map(str, size)),
+            "format": fmt,
+            "employees": size[0], "days": size[1], "events_per_day": size[2],
+            "rows": runs[0]["rows"],
+            "peak_mb": round(peak_mb, 1) if peak_mb is not None else None,
+            "median": {}, "min": {},
+        }
+        for stage in STAGES:
+            values = [r["timings"][stage] for r in runs if stage in r["timings"]]
+            if values:
+                entry["median"][stage] = round(statistics.median(values), 6)
+                entry["min"][stage] = round(min(values), 6)
+        entry["median"]["total"] = round(sum(entry["median"].values()), 6)
+        results.append(entry)
+        peak = f"  峰值内存 {peak_mb:.0f} MB" if peak_mb is not None else ""
+        log(f"{entry['size']:>12} {fmt:>13} {entry['rows']:>8} 行  "
+            + "  ".join(f"{k} {v:.3f}s" for k, v in entry["median"].items()) + peak)
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "calamine": ivr_loader.HAS_CALAMINE,
+        "pyarrow": ivr_loader.HAS_PYARROW,
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, log=print):
+    """按规模和格式对比两次结果的中位数和峰值内存，比值 > 1 表示变慢 / 变大"""
+    base = {(r["size"], r.get("format", "xlsx")): r for r in baseline.get("results", [])}
+    for entry in current["results"]:
+        old = base.get((entry["size"], entry.get("format", "xlsx")))
+        if old is None:
+            continue
+        ratios = [f"{k} x{v / old['median'][k]:.2f}" for k, v in entry["median"].items() if old["median"].get(k)]
+        if entry.get("peak_mb") and old.get("peak_mb"):
+            ratios.append(f"峰值内存 x{entry['peak_mb'] / old['peak_mb']:.2f}")
+        log(f"{entry['size']:>12} {entry.get('format', 'xlsx'):>13}  " + "  ".join(ratios))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="ivr_bench", description="分阶段性能基准")
+    parser.add_argument("-s", "--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in DEFAULT_SIZES],
+                        help="数据规模，格式 人数x天数[x事件数]（默认 %s）" % " ".join(DEFAULT_SIZES))
+    parser.add_argument("-f", "--formats", nargs="+", choices=FORMATS, default=list(FORMATS),
+                        help="输入格式（默认全部）")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="每个规模重复次数（默认 3）")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="结果文件（默认 bench_results.json）")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "ivr_bench"),
+                        help="模拟工作簿目录，已生成的文件直接复用")
+    parser.add_argument("--baseline", help="与之前的结果文件对比")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    result = run_bench(args.sizes, max(1, args.repeat), args.data_dir, args.seed, args.formats)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare(result, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# 已解析工作簿的磁盘缓存：按文件指纹 + 解析配置存储整理后的事件表，超出容量按 LRU 淘汰
+
+import hashlib
+import importlib.util
+import json
+import os
+import time
+
+import pandas as pd
+
+from ivr_config import DEFAULT_CACHE_MB
+
+DEFAULT_MAX_MB = DEFAULT_CACHE_MB
+# 事件表结构变化时加一，旧条目自然失效
+CACHE_VERSION = 2
+HASH_CHUNK = 1 << 20
+
+# 有 pyarrow 时用 parquet（列式、读取快），否则退回 pickle
+HAS_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+
+def file_digest(file_name: str) -> str:
+    """文件内容哈希"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_name, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ParsedCache:
+    """缓存目录位于配置目录下的 cache/，index.json 记录每个条目的大小和最近使用时间"""
+
+    def __init__(self, base_dir: str, max_mb: int = DEFAULT_MAX_MB):
+        self.cache_dir = os.path.join(base_dir, "cache")
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.max_bytes = int(max_mb) * 1024 * 1024
+        self._digests = {}  # (路径, 大小, 修改时间) -> 内容哈希，同一文件的多个 sheet 只算一次
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # 索引
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index: dict):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def _entry_path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
+
+    # 指纹
+    def fingerprint(self, file_name: str, settings: dict) -> str:
+        """路径 + 大小 + 修改时间 + 内容哈希 + 解析配置（列映射等）"""
+        stat = os.stat(file_name)
+        path = os.path.abspath(file_name)
+        stamp = (path, stat.st_size, stat.st_mtime_ns)
+        if stamp not in self._digests:
+            self._digests[stamp] = file_digest(file_name)
+        payload = {
+            "version": CACHE_VERSION,
+            "path": path,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "digest": self._digests[stamp],
+            "settings": settings,
+        }
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # 读写
+    def get(self, key: str):
+        """命中返回 (DataFrame, meta)，否则返回 None"""
+        index = self._load_index()
+        entry = index.get(key)
+        if entry is None:
+            return None
+        path = self._entry_path(key, entry["format"])
+        try:
+            if entry["format"] == "parquet":
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_pickle(path)
+        except Exception:
+            self._remove(index, key)
+            self._save_index(index)
+            return None
+        entry["last_used"] = time.time()
+        self._save_index(index)
+        return df, entry.get("meta", {})
+
+    def put(self, key: str, df: pd.DataFrame, meta: dict | None = None):
+        index = self._load_index()
+        self._remove(index, key)
+        fmt = "pickle"
+        if HAS_PARQUET:
+            try:
+                df.to_parquet(self._entry_path(key, "parquet"), index=False)
+                fmt = "parquet"
+            except Exception:
+                # 混合类型的 object 列写不进 parquet
+                pass
+        if fmt == "pickle":
+            df.reset_index(drop=True).to_pickle(self._entry_path(key, "pickle"))
+
+        index[key] = {
+            "format": fmt,
+            "bytes": os.path.getsize(self._entry_path(key, fmt)),
+            "last_used": time.time(),
+            "meta": meta or {},
+        }
+        self._evict(index, keep=key)
+        self._save_index(index)
+
+    # 淘汰与清理
+    def _remove(self, index: dict, key: str):
+        entry = index.pop(key, None)
+        if entry is None:
+            return
+        try:
+            os.remove(self._entry_path(key, entry["format"]))
+        except OSError:
+            pass
+
+    def _evict(self, index: dict, keep: str | None = None):
+        """按最近使用时间从旧到新删除，直到总大小不超过上限"""
+        total = sum(e["bytes"] for e in index.values())
+        for key in sorted(index, key=lambda k: index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= index[key]["bytes"]
+            self._remove(index, key)
+
+    def size_bytes(self) -> int:
+        return sum(e["bytes"] for e in self._load_index().values())
+
+    def clear(self):
+        """删除全部缓存条目"""
+        for name in os.listdir(self.cache_dir):
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
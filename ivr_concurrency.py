@@ -0,0 +1,154 @@
+# 小休并发：扫描线统计同一时刻在小休的人数，按天 / 班次 / 15 分钟时段给出峰值和超限时段，不依赖 Qt
+
+import numpy as np
+import pandas as pd
+
+from ivr_config import DEFAULT_BREAK_CONCURRENCY
+
+SLOT_MINUTES = 15
+DEFAULT_LIMIT = DEFAULT_BREAK_CONCURRENCY
+
+
+def _sweep(keys: np.ndarray, start: np.ndarray, end: np.ndarray) -> pd.DataFrame:
+    """扫描线：每个开始 +1、每个结束 -1，按 (分组, 时刻) 排序后累加，O(n log n)
+
+    区间为左闭右开，同一时刻先处理结束再处理开始。每组的 +1/-1 数量相等，
+    所以整体累加在组边界处自然归零，不需要分组累加。返回每个端点之后的
+    人数 level，以及该人数持续到的时刻 until（同组下一个端点）。
+    """
+    n = len(start)
+    key = np.concatenate([keys, keys])
+    t = np.concatenate([start, end])
+    delta = np.concatenate([np.ones(n, dtype=np.int64), -np.ones(n, dtype=np.int64)])
+
+    order = np.lexsort((delta, t, key))
+    key, t, delta = key[order], t[order], delta[order]
+    level = np.cumsum(delta)
+
+    until = np.empty_like(t)
+    until[:-1] = t[1:]
+    until[-1] = t[-1]
+    last = np.append(key[1:] != key[:-1], True)
+    until[last] = t[last]
+    return pd.DataFrame({"key": key, "t": t, "until": until, "level": level})
+
+
+def _peaks(points: pd.DataFrame) -> pd.DataFrame:
+    """每组的峰值人数和首次达到峰值的时刻"""
+    idx = points.groupby("key", sort=False)["level"].idxmax()
+    return points.loc[idx, ["key", "t", "level"]].set_index("key")
+
+
+def _slot_peaks(points: pd.DataFrame, slot: np.int64) -> pd.DataFrame:
+    """每个时段内的最高人数：把每段恒定人数的区间展开到它覆盖的时段上取最大值
+
+    同组相邻端点之间的区间互不重叠，展开后的行数不超过 端点数 + 时段数。
+    """
+    spans = points[(points["level"] > 0) & (points["until"] > points["t"])]
+    first = spans["t"].to_numpy() // slot
+    last = (spans["until"].to_numpy() - 1) // slot
+    count = (last - first + 1).astype(np.int64)
+
+    rows = np.repeat(np.arange(len(spans)), count)
+    offset = np.arange(len(rows)) - np.repeat(np.cumsum(count) - count, count)
+    expanded = pd.DataFrame({
+        "key": spans["key"].to_numpy()[rows],
+        "slot": (first[rows] + offset) * slot,
+        "level": spans["level"].to_numpy()[rows],
+    })
+    return expanded.groupby(["key", "slot"], sort=True)["level"].max().reset_index()
+
+
+def _over_windows(points: pd.DataFrame, limit: int) -> pd.DataFrame:
+    """人数超过上限的连续时段：(开始, 结束, 最高人数)"""
+    spans = points[points["until"] > points["t"]]
+    over = (spans["level"] > limit).to_numpy()
+    key = spans["key"].to_numpy()
+    # 组变化或超限状态变化时开始新的一段
+    boundary = np.ones(len(spans), dtype=bool)
+    boundary[1:] = (over[1:] != over[:-1]) | (key[1:] != key[:-1]) | (spans["t"].to_numpy()[1:]
+                                                                       != spans["until"].to_numpy()[:-1])
+    run = np.cumsum(boundary)
+    spans = spans.assign(run=run)[over]
+    return spans.groupby("run", sort=True).agg(
+        key=("key", "first"), start=("t", "min"), end=("until", "max"), peak=("level", "max")
+    )
+
+
+def _ts(ns) -> pd.Timestamp:
+    return pd.Timestamp(int(ns))
+
+
+def break_concurrency(flagged: pd.DataFrame, limit: int = DEFAULT_LIMIT,
+                      slot_minutes: int = SLOT_MINUTES) -> dict:
+    """按 flag_events 的结果统计每天同时小休的人数
+
+    返回 {日期: {"limit", "peak", "peak_at", "shifts": {班次: (峰值, 时刻)},
+    "slots": {时段开始: 峰值}, "windows": [(开始, 结束, 峰值)]}}；时刻已按班次
+    对齐（跨零点班次零点后的小休在次日），只统计有小休的日期。
+    """
+    brk = flagged[flagged["break"] & (flagged["结束时间"] > flagged["开始时间"])]
+    if brk.empty:
+        return {}
+
+    start = brk["开始时间"].to_numpy(dtype="datetime64[ns]").view("i8")
+    end = brk["结束时间"].to_numpy(dtype="datetime64[ns]").view("i8")
+    day_codes, days = pd.factorize(brk["日期"], sort=True)
+    shift_codes, shift_keys = pd.factorize(
+        pd.MultiIndex.from_arrays([brk["日期"], brk["班次"].astype(str)]), sort=True
+    )
+    slot = np.int64(pd.Timedelta(minutes=slot_minutes).value)
+
+    by_day = _sweep(day_codes, start, end)
+    day_peaks = _peaks(by_day)
+    shift_peaks = _peaks(_sweep(shift_codes, start, end))
+    slots = _slot_peaks(by_day, slot)
+    windows = _over_windows(by_day, limit)
+
+    result = {}
+    for code, day in enumerate(days):
+        peak = day_peaks.loc[code]
+        result[day] = {
+            "limit": limit,
+            "peak": int(peak["level"]),
+            "peak_at": _ts(peak["t"]),
+            "shifts": {},
+            "slots": {},
+            "windows": [],
+        }
+    for code, (day, shift) in enumerate(shift_keys):
+        peak = shift_peaks.loc[code]
+        result[day]["shifts"][shift] = (int(peak["level"]), _ts(peak["t"]))
+    for code, t, level in slots[["key", "slot", "level"]].itertuples(index=False):
+        result[days[code]]["slots"][_ts(t)] = int(level)
+    for code, s, e, level in windows[["key", "start", "end", "peak"]].itertuples(index=False):
+        result[days[code]]["windows"].append((_ts(s), _ts(e), int(level)))
+    return result
+
+
+def summarize_concurrency(concurrency: dict) -> dict:
+    """日期范围汇总：最高峰值、超限天数和时长、各时段（一天中的时刻）超限的天数"""
+    if not concurrency:
+        return {}
+    peak_day = max(concurrency, key=lambda d: concurrency[d]["peak"])
+    limit = concurrency[peak_day]["limit"]
+
+    over_days, over_minutes, slot_days = {}, 0.0, {}
+    for day, info in concurrency.items():
+        if info["windows"]:
+            over_days[day] = len(info["windows"])
+            over_minutes += sum((e - s).total_seconds() for s, e, _ in info["windows"]) / 60
+        for t, level in info["slots"].items():
+            if level > limit:
+                key = t.strftime("%H:%M")
+                slot_days[key] = slot_days.get(key, 0) + 1
+
+    return {
+        "limit": limit,
+        "peak": concurrency[peak_day]["peak"],
+        "peak_day": peak_day,
+        "peak_at": concurrency[peak_day]["peak_at"],
+        "over_days": over_days,
+        "over_minutes": round(over_minutes, 1),
+        "slot_days": dict(sorted(slot_days.items(), key=lambda x: (-x[1], x[0]))),
+    }
@@ -0,0 +1,150 @@
+# 用户配置读写，不依赖 Qt（GUI 与命令行共用）
+
+import json
+import os
+import sys
+
+DEFAULT_CACHE_MB = 512
+DEFAULT_BREAK_CONCURRENCY = 5  # 同时小休超过该人数时提醒
+
+
+class ConfigManager:
+    """管理用户配置（班次时间 + 列映射），支持 PyInstaller 打包后使用"""
+
+    def __init__(self, parent=None, config_path: str | None = None):
+        self.parent = parent  # 可选，用于弹窗提示；命令行下为 None
+        self.config_path = config_path or self.get_user_config_path()
+        self.config = self.load_config()
+
+    def report_error(self, title: str, message: str):
+        """出错提示：有父窗口时弹窗，否则输出到 stderr（命令行下不加载 Qt）"""
+        if self.parent is not None:
+            from PyQt6.QtWidgets import QMessageBox
+            QMessageBox.warning(self.parent, title, message)
+        else:
+            print(f"{title}: {message}", file=sys.stderr)
+
+    # 路径管理
+    def get_user_config_path(self) -> str:
+        """返回配置文件路径（跨平台安全）"""
+        base_dir = os.path.join(os.path.expanduser("~"), ".daily_report_config")
+        os.makedirs(base_dir, exist_ok=True)
+        return os.path.join(base_dir, "user_config.json")
+
+    # 默认配置
+    @staticmethod
+    def default_config() -> dict:
+        """生成默认配置"""
+        return {
+            "shift_config": {
+                "A": ["06:00:00", "15:00:00"],
+                "B": ["07:00:00", "16:00:00"],
+                "C": ["08:00:00", "17:00:00"],
+                "D": ["09:00:00", "18:00:00"],
+                "E": ["10:00:00", "19:00:00"],
+                "F": ["11:00:00", "20:00:00"],
+                "G": ["12:00:00", "21:00:00"],
+                "H": ["13:00:00", "22:00:00"],
+                "I": ["14:00:00", "23:00:00"],
+                "J": ["15:00:00", "00:00:00"],
+                "K": ["16:00:00", "01:00:00"],
+                "L": ["17:00:00", "02:00:00"]
+            },
+            "column_config": {
+                "表名": "Sheet1",
+                "日期": "日期",
+                "姓名": "姓名",
+                "班次": "班次",
+                "状态": "状态",
+                "开始时间": "开始时间",
+                "结束时间": "结束时间",
+                "持续时长min": "持续时长min"
+            },
+            "roster_file": "",
+            "time_format": "",
+            "cache_max_mb": DEFAULT_CACHE_MB,
+            "break_concurrency_limit": DEFAULT_BREAK_CONCURRENCY,
+            "auto_refresh": False,
+            "server_url": ""
+        }
+
+    # 加载与保存
+    def load_config(self) -> dict:
+        """加载配置文件（不存在则创建默认配置）"""
+        if not os.path.exists(self.config_path):
+            config = self.default_config()
+            self.save_config(config)
+            return config
+        try:
+            with open(self.config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            return config
+        except Exception as e:
+            self.report_error("加载失败", str(e))
+            return self.default_config()
+
+    def save_config(self, config: dict | None = None):
+        """保存配置文件"""
+        if config is None:
+            config = self.config
+        try:
+            with open(self.config_path, "w", encoding="utf-8") as f:
+                json.dump(config, f, ensure_ascii=False, indent=4)
+        except Exception as e:
+            self.report_error("保存失败", str(e))
+
+    # 获取配置项
+    def get_shift_config(self) -> dict:
+        return self.config.get("shift_config", {})
+
+    def get_column_config(self) -> dict:
+        return self.config.get("column_config", {})
+
+    def get_roster_file(self) -> str:
+        return self.config.get("roster_file", "")
+
+    def get_time_format(self) -> str:
+        """开始/结束时间的文本格式（如 %Y/%m/%d %H:%M），留空则自动识别"""
+        return self.config.get("time_format", "")
+
+    def get_cache_max_mb(self) -> int:
+        return self.config.get("cache_max_mb", DEFAULT_CACHE_MB)
+
+    def get_break_concurrency_limit(self) -> int:
+        return int(self.config.get("break_concurrency_limit", DEFAULT_BREAK_CONCURRENCY))
+
+    def get_auto_refresh(self) -> bool:
+        """打开的文件被覆盖后是否自动增量刷新"""
+        return bool(self.config.get("auto_refresh", False))
+
+    def get_server_url(self) -> str:
+        """报告服务地址（如 http://192.168.1.10:8765），为空时在本机统计"""
+        return str(self.config.get("server_url", "")).strip()
+
+    def get_config_dir(self) -> str:
+        return os.path.dirname(self.config_path)
+
+    # 更新配置项
+    def update_shift(self, shift_dict: dict):
+        self.config["shift_config"] = shift_dict
+        self.save_config()
+
+    def update_columns(self, column_dict: dict):
+        self.config["column_config"] = column_dict
+        self.save_config()
+
+    def update_roster_file(self, file_name: str):
+        self.config["roster_file"] = file_name
+        self.save_config()
+
+    def update_break_concurrency_limit(self, limit: int):
+        self.config["break_concurrency_limit"] = int(limit)
+        self.save_config()
+
+    def update_auto_refresh(self, enabled: bool):
+        self.config["auto_refresh"] = bool(enabled)
+        self.save_config()
+
+    def update_server_url(self, url: str):
+        self.config["server_url"] = url.strip()
+        self.save_config()
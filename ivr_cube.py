@@ -0,0 +1,90 @@
+# 员工 × 日期 × 指标 的数据立方：沿日期做前缀和，任意日期范围的汇总只需 O(员工数)，不依赖 Qt
+
+import numpy as np
+import pandas as pd
+
+from ivr_engine import BREAK_SUM_LIMIT, MEAL_LIMIT, REPORT_KEYS
+
+# 指标轴：用餐分钟、小休总分钟、单次超时次数、首尾半小时小休次数
+METRICS = REPORT_KEYS
+
+
+class MetricCube:
+    """由 report_dict 一次建立，之后按日期范围查询汇总
+
+    values[e, d, m] 为第 e 个员工第 d 天的指标原值（当天没有记录为 NaN）；
+    prefix[e, d, m] 为前 d 天对汇总的贡献之和：时长类为超时天数，次数类为次数，
+    于是 [lo, hi) 的汇总就是 prefix[:, hi] - prefix[:, lo]。
+    """
+
+    def __init__(self, employees: list, days: list, values: np.ndarray, seq: np.ndarray):
+        self.employees = np.array(employees, dtype=object)
+        self.days = pd.DatetimeIndex(days)
+        self.values = values
+        n_emp, n_day = values.shape[:2]
+
+        with np.errstate(invalid="ignore"):
+            counts = np.stack([
+                values[..., 0] > MEAL_LIMIT,
+                values[..., 1] > BREAK_SUM_LIMIT,
+                np.nan_to_num(values[..., 2]),
+                np.nan_to_num(values[..., 3]),
+            ], axis=-1).astype(np.int32)
+        self.prefix = np.zeros((n_emp, n_day + 1, len(METRICS)), dtype=np.int32)
+        np.cumsum(counts, axis=1, out=self.prefix[:, 1:])
+
+        # 同次数的人按范围内首次出现的 (日期, 当天顺序) 排列，与 HistoryStore.summarize 一致：
+        # first[e, d] 为第 d 天及之后该员工首次有记录的日期序号，没有则为 n_day
+        self.seq = seq
+        present = seq >= 0
+        self.first = np.full((n_emp, n_day + 1), n_day, dtype=np.int32)
+        for d in range(n_day - 1, -1, -1):
+            self.first[:, d] = np.where(present[:, d], d, self.first[:, d + 1])
+
+    @classmethod
+    def from_report(cls, report_dict: dict) -> "MetricCube":
+        days = sorted(report_dict)
+        positions, cells = {}, []
+        for d, day in enumerate(days):
+            rules = report_dict[day]
+            emps = dict.fromkeys(e for key in REPORT_KEYS for e in rules[key])
+            for s, emp in enumerate(emps):
+                e = positions.setdefault(emp, len(positions))
+                cells.append((e, d, s, [rules[key].get(emp, np.nan) for key in REPORT_KEYS]))
+
+        values = np.full((len(positions), len(days), len(METRICS)), np.nan)
+        seq = np.full((len(positions), len(days)), -1, dtype=np.int32)
+        if cells:
+            e, d, s, v = zip(*cells)
+            values[e, d] = np.array(v, dtype=np.float64)
+            seq[e, d] = s
+        return cls(list(positions), days, values, seq)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def bounds(self, start, end) -> tuple:
+        """日期范围（含两端） -> 日期轴上的 [lo, hi)"""
+        lo = int(self.days.searchsorted(pd.Timestamp(start).normalize(), side="left"))
+        hi = int(self.days.searchsorted(pd.Timestamp(end).normalize(), side="right"))
+        return lo, max(lo, hi)
+
+    def summarize(self, start=None, end=None) -> dict:
+        """日期范围汇总，结构同 summarize_report；省略时为全部日期，范围内没有数据返回空字典"""
+        if not len(self.days):
+            return {}
+        lo, hi = self.bounds(self.days[0] if start is None else start, self.days[-1] if end is None else end)
+        if lo >= hi:
+            return {}
+
+        totals = self.prefix[:, hi] - self.prefix[:, lo]
+        first = self.first[:, lo]
+        order_seq = self.seq[np.arange(len(self.employees)), np.minimum(first, len(self.days) - 1)]
+
+        summary = {"start": self.days[lo], "end": self.days[hi - 1]}
+        for m, key in enumerate(METRICS):
+            hit = np.flatnonzero(totals[:, m] > 0)
+            # lexsort 以最后一个键为主键：次数从多到少，再按首次出现的日期、当天顺序
+            order = hit[np.lexsort((order_seq[hit], first[hit], -totals[hit, m]))]
+            summary[key] = {self.employees[e]: int(totals[e, m]) for e in order}
+        return summary
@@ -0,0 +1,755 @@
+# 日报统计规则：整列运算实现，不依赖 Qt，可在 GUI 之外复用
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, time
+from numbers import Real
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype, is_object_dtype
+
+from ivr_loader import list_sources, load_excel_data, REQUIRED_FIELDS
+from ivr_metrics import column_bytes, logger, merge_memory, StageTimer
+
+# 规则阈值（分钟）
+MEAL_LIMIT = 46            # 就餐超时
+BREAK_SUM_LIMIT = 61       # 小休总时长超时
+BREAK_ONCE_LIMIT = 8       # 单次小休超时
+SHIFT_EDGE_MINUTES = 30    # 班次首尾半小时
+
+REPORT_KEYS = ("meal", "break_sum", "break_once", "break_shift")
+
+RULE_LABELS = {
+    "meal": "用餐时长",
+    "break_sum": "小休总时长",
+    "break_once": "单次小休",
+    "break_shift": "首尾半小时小休",
+}
+
+# 统计用到的字段，事件表只保留这些列
+EVENT_FIELDS = REQUIRED_FIELDS
+# 合并多个 sheet / 文件时的去重键
+DEDUP_FIELDS = ["日期", "姓名", "开始时间"]
+# 重复值多的文本列，事件表中存为 category（整数编码 + 去重后的取值）
+CATEGORY_FIELDS = ["姓名", "班次", "状态"]
+
+# 事件数达到这个值才按日期分块、在进程池中并行统计，更少时启动进程的开销比统计本身还大
+PARALLEL_MIN_ROWS = 1_000_000
+
+# 只有时刻的文本格式，如 08:30:00 / 8:30 / 08:30:00.5
+CLOCK_FORMATS = ("%H:%M:%S", "%H:%M", "%H:%M:%S.%f")
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+DATE_DIRECTIVES = ("%Y", "%y", "%m", "%d", "%b", "%B", "%j")
+
+
+def time_of_day(value):
+    """把 "06:00:00" 之类的班次时间转成距零点的 Timedelta，无法解析返回 NaT"""
+    try:
+        t = pd.to_datetime(value)
+    except Exception:
+        return pd.NaT
+    if pd.isna(t):
+        return pd.NaT
+    return t - t.normalize()
+
+
+def shift_offsets(shift_dict: dict) -> pd.DataFrame:
+    """班次配置 -> 以班次为索引的开始/结束偏移表"""
+    return pd.DataFrame(
+        {
+            "开始时间": [time_of_day(v[0]) for v in shift_dict.values()],
+            "结束时间": [time_of_day(v[1]) for v in shift_dict.values()],
+        },
+        index=pd.Index(list(shift_dict.keys()), dtype=object),
+    )
+
+
+def _fill(report_dict: dict, key: str, grouped: pd.Series):
+    """把 (日期, 姓名) 分组结果写回 report_dict[日期][key]"""
+    for (day, emp), value in zip(grouped.index, grouped.tolist()):
+        report_dict[day][key][emp] = value
+
+
+def _minutes(values: pd.Series) -> pd.Series:
+    """float32 时长还原成两位小数的 float64，求和与输出不带单精度误差"""
+    return values.astype("float64").round(2)
+
+
+def _sum_keep_nan(values: pd.Series, keys: list) -> pd.Series:
+    """分组求和，组内只要有缺失值结果就是 NaN（与逐行累加一致）"""
+    values = _minutes(values)
+    grouped = values.groupby(keys, sort=False, dropna=False)
+    total = grouped.sum()
+    has_nan = values.isna().groupby(keys, sort=False, dropna=False).any()
+    return total.mask(has_nan)
+
+
+def _from_excel_serial(serial: pd.Series, days: pd.Series) -> pd.Series:
+    """Excel 序列值：小于 1 的是 days 当天的时刻，否则是完整的日期时间"""
+    serial = serial.astype("float64")
+    is_time = serial < 1
+    offset = pd.to_timedelta((serial % 1) * 86400, unit="s").dt.round("ms")
+    full = EXCEL_EPOCH + pd.to_timedelta(serial, unit="D").dt.round("ms")
+    return (days + offset).where(is_time, full)
+
+
+def _parse_text(text: pd.Series, days: pd.Series, time_format: str | None) -> pd.Series:
+    """文本时间：配置格式 -> 纯时刻格式 -> ISO -> 剩余单元格逐个推断"""
+    parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+    done = pd.Series(False, index=text.index)
+
+    def attempt(fmt, anchored):
+        todo = ~done
+        if not todo.any():
+            return
+        result = pd.to_datetime(text[todo], format=fmt, errors="coerce").astype("datetime64[ns]")
+        done[todo] = result.notna()
+        if anchored:
+            result = days[result.index] + (result - result.dt.normalize())
+        parsed[todo] = result
+
+    if time_format:
+        attempt(time_format, not any(d in time_format for d in DATE_DIRECTIVES))
+    for fmt in CLOCK_FORMATS:
+        attempt(fmt, True)
+    attempt("ISO8601", False)
+    attempt("mixed", False)
+    return parsed
+
+
+def normalize_time_column(values: pd.Series, anchor: pd.Series, time_format: str | None = None):
+    """整列把 开始时间/结束时间 统一成 datetime64，返回 (结果, 无法解析的单元格数)
+
+    只按列类型判断一次：datetime64 列原样使用；数值列按 Excel 序列值处理；
+    datetime.time 和 "08:30:00" 之类只有时刻的值拼到 anchor（记录的 日期）上；
+    其余文本依次按 time_format、ISO 格式整列解析，最后才对剩下的单元格逐个推断格式。
+    anchor 缺失导致无法定位日期的单元格不计入无法解析数。
+    """
+    days = pd.to_datetime(anchor, errors="coerce").dt.normalize().astype("datetime64[ns]")
+
+    if is_datetime64_any_dtype(values):
+        if getattr(values.dt, "tz", None) is not None:
+            values = values.dt.tz_localize(None)
+        return values.astype("datetime64[ns]"), 0
+
+    present = values.notna()
+    if is_numeric_dtype(values) and not is_bool_dtype(values):
+        result = _from_excel_serial(values, days)
+        failed = int((present & result.isna() & ((values >= 1) | days.notna())).sum())
+        return result, failed
+
+    cells = values[present]
+    parsed = pd.Series(pd.NaT, index=cells.index, dtype="datetime64[ns]")
+    is_text = pd.Series(True, index=cells.index)
+
+    # object 列里可能混着 time / datetime / 数字对象，各走各的整列路径
+    if is_object_dtype(values):
+        kinds = cells.map(type)
+        is_clock = kinds == time
+        if is_clock.any():
+            clocks = cells[is_clock]
+            seconds = [t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6 for t in clocks]
+            parsed[is_clock] = days[clocks.index] + pd.to_timedelta(seconds, unit="s")
+        is_stamp = kinds.isin([datetime, pd.Timestamp])
+        if is_stamp.any():
+            parsed[is_stamp] = pd.to_datetime(cells[is_stamp]).astype("datetime64[ns]")
+        # numpy 标量（混合类型 concat 后常见）也算数字，bool 除外；按类型判断，不逐个单元格
+        number_types = [k for k in kinds.unique() if issubclass(k, Real) and not issubclass(k, (bool, np.bool_))]
+        is_number = kinds.isin(number_types)
+        if is_number.any():
+            serials = cells[is_number].astype("float64")
+            parsed[is_number] = _from_excel_serial(serials, days[serials.index])
+        is_text = ~(is_clock | is_stamp | is_number)
+
+    if is_text.any():
+        text = cells[is_text].astype(str).str.strip()
+        parsed[is_text] = _parse_text(text, days[text.index], time_format)
+
+    result = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    result[parsed.index] = parsed
+    failed = int((parsed.isna() & days[parsed.index].notna()).sum())
+    return result, failed
+
+
+class ShiftCalendar:
+    """班次日历：由班次配置一次性构建，把 (日期, 班次) 解析成绝对的开始/结束时间
+
+    跨零点的班次（结束时间早于开始时间）结束时间顺延一天。可选的排班表
+    按 (日期, 姓名) 覆盖个人当天的班次。
+    """
+
+    def __init__(self, shift_dict: dict, roster: pd.DataFrame | None = None):
+        offsets = shift_offsets(shift_dict)
+        offsets = offsets[~offsets.index.duplicated()]
+        start_off = offsets["开始时间"]
+        end_off = offsets["结束时间"]
+        overnight = end_off < start_off
+        end_off = end_off.mask(overnight, end_off + pd.Timedelta(days=1))
+
+        # 跨零点班次：下班到下次上班的空档取中点，早于该时刻的事件属于零点之后那一段
+        gap = pd.Timedelta(days=1) - (end_off - start_off)
+        rollover = (start_off - gap / 2).where(overnight)
+
+        self.codes = offsets.index
+        self.start_off = pd.to_timedelta(start_off).to_numpy()
+        self.end_off = pd.to_timedelta(end_off).to_numpy()
+        self.rollover = pd.to_timedelta(rollover).to_numpy()
+        self._windows = {
+            code: (s, e) for code, s, e in zip(self.codes, start_off, end_off)
+            if pd.notna(s) and pd.notna(e)
+        }
+
+        self.roster = None
+        self._roster_map = {}
+        if roster is not None and not roster.empty:
+            roster = roster.dropna(subset=["日期", "姓名", "班次"])
+            roster = roster.assign(日期=pd.to_datetime(roster["日期"], errors="coerce").dt.normalize())
+            roster = roster.drop_duplicates(subset=["日期", "姓名"], keep="last")
+            self.roster = pd.Series(
+                roster["班次"].to_numpy(dtype=object),
+                index=pd.MultiIndex.from_arrays([roster["日期"], roster["姓名"].astype(object)]),
+            )
+            self._roster_map = self.roster.to_dict()
+
+    def shift_of(self, day, code, name=None):
+        """排班表优先，否则返回记录自带的班次"""
+        if name is not None and self._roster_map:
+            return self._roster_map.get((pd.Timestamp(day).normalize(), name), code)
+        return code
+
+    def resolve(self, day, code, name=None):
+        """单条查询：返回 (开始, 结束) 时间戳，未知班次返回 None"""
+        window = self._windows.get(self.shift_of(day, code, name))
+        if window is None:
+            return None
+        day = pd.Timestamp(day).normalize()
+        return day + window[0], day + window[1]
+
+    def shift_codes(self, dates: pd.Series, codes: pd.Series, names: pd.Series | None = None) -> pd.Series:
+        """整列查询每条记录当天实际的班次代码：排班表优先，否则为记录自带的班次"""
+        codes = codes.astype(object)
+        if names is not None and self.roster is not None:
+            days = pd.to_datetime(dates, errors="coerce").dt.normalize()
+            keys = pd.MultiIndex.from_arrays([days, names.astype(object)])
+            pos = self.roster.index.get_indexer(keys)
+            override = self.roster.to_numpy()[pos]
+            codes = codes.mask(pos >= 0, pd.Series(override, index=codes.index))
+        return codes
+
+    def windows(self, dates: pd.Series, codes: pd.Series, names: pd.Series | None = None) -> pd.DataFrame:
+        """整列查询：返回与输入对齐的 班次/班次开始/班次结束/翻日界限 四列"""
+        days = pd.to_datetime(dates, errors="coerce").dt.normalize()
+        codes = self.shift_codes(dates, codes, names)
+
+        pos = self.codes.get_indexer(codes)
+        known = pos >= 0
+
+        def pick(values):
+            if not len(values):
+                return pd.Series(pd.NaT, index=days.index, dtype="timedelta64[ns]")
+            picked = pd.Series(values[pos], index=days.index)
+            return pd.to_timedelta(picked.where(known))
+
+        return pd.DataFrame({
+            "班次": codes,
+            "班次开始": days + pick(self.start_off),
+            "班次结束": days + pick(self.end_off),
+            "翻日界限": days + pick(self.rollover),
+        }, index=days.index)
+
+
+def load_roster(file_name: str, column_map: dict) -> pd.DataFrame:
+    """读取排班表（日期/姓名/班次 三列，列名沿用列映射配置）"""
+    fields = ["日期", "姓名", "班次"]
+    names = {column_map.get(f, f): f for f in fields}
+    if file_name.lower().endswith(".csv"):
+        df = pd.read_csv(file_name, usecols=list(names))
+    else:
+        df = pd.read_excel(file_name, sheet_name=0, usecols=list(names))
+    return df.rename(columns=names)[fields]
+
+
+def flag_events(df_data: pd.DataFrame, calendar: ShiftCalendar) -> pd.DataFrame:
+    """按规则给每条有效事件打标记，无效行（缺时间/日期、未知班次、下班后的小休）被剔除
+
+    df_data 需已完成列映射：开始时间/结束时间为时间，日期为 datetime64，
+    持续时长min 为数值。事件按时刻放到记录日期所在班次的时间线上，
+    跨零点班次零点后的事件归入次日。返回的表保持原始行顺序，附带
+    班次开始/班次结束 和 meal/break/once/edge 四个标记列。
+    """
+    start_t = pd.to_datetime(df_data["开始时间"], errors="coerce")
+    end_t = pd.to_datetime(df_data["结束时间"], errors="coerce")
+    status = df_data["状态"]
+    dates = df_data["日期"]
+    dur = df_data["持续时长min"]
+
+    # 一次性解析每条记录的班次窗口，未知班次得到 NaT
+    window = calendar.windows(dates, df_data["班次"], df_data["姓名"])
+    shift_start = window["班次开始"]
+    shift_end = window["班次结束"]
+
+    length = (end_t - start_t) % pd.Timedelta(days=1)
+    start_t = dates.dt.normalize() + (start_t - start_t.dt.normalize())
+    start_t = start_t.mask(start_t < window["翻日界限"], start_t + pd.Timedelta(days=1))
+    end_t = start_t + length
+
+    is_meal = status == "就餐"
+    is_break = status == "小休"
+
+    valid = (
+        start_t.notna() & end_t.notna() & window["班次"].notna() & dates.notna()
+        & shift_start.notna() & shift_end.notna()
+    )
+    valid &= ~(is_break & (start_t >= shift_end))
+
+    edge = pd.Timedelta(minutes=SHIFT_EDGE_MINUTES)
+    at_edge = ((shift_start < start_t) & (start_t < shift_start + edge)) | \
+              ((shift_end - edge < start_t) & (start_t < shift_end))
+
+    return pd.DataFrame({
+        "日期": dates[valid],
+        "姓名": df_data["姓名"][valid],
+        "班次": window["班次"][valid].astype("category"),
+        "状态": status[valid],
+        "开始时间": start_t[valid],
+        "结束时间": end_t[valid],
+        "持续时长min": dur[valid],
+        "班次开始": shift_start[valid],
+        "班次结束": shift_end[valid],
+        "meal": is_meal[valid],
+        "break": is_break[valid],
+        "once": (is_break & (dur > BREAK_ONCE_LIMIT))[valid],
+        "edge": (is_break & at_edge)[valid],
+    })
+
+
+def aggregate_flags(flagged: pd.DataFrame) -> dict:
+    """flag_events 的结果按 (日期, 姓名) 汇总成 report_dict
+
+    返回 {日期: {"meal"/"break_sum"/"break_once"/"break_shift": {姓名: 值}}}，
+    字典顺序与数据中首次出现的顺序一致。
+    """
+    report_dict = {
+        day: {key: {} for key in REPORT_KEYS}
+        for day in flagged["日期"].drop_duplicates()
+    }
+    if not report_dict:
+        return report_dict
+
+    meal = flagged[flagged["meal"]]
+    _fill(report_dict, "meal", _sum_keep_nan(meal["持续时长min"], [meal["日期"], meal["姓名"]]))
+
+    brk = flagged[flagged["break"]]
+    _fill(report_dict, "break_sum", _sum_keep_nan(brk["持续时长min"], [brk["日期"], brk["姓名"]]))
+
+    once = flagged[flagged["once"]]
+    _fill(report_dict, "break_once", once.groupby(["日期", "姓名"], sort=False, dropna=False).size())
+
+    at_shift = flagged[flagged["edge"]]
+    _fill(report_dict, "break_shift", at_shift.groupby(["日期", "姓名"], sort=False, dropna=False).size())
+
+    return report_dict
+
+
+def _partition_days(dates: pd.Series, parts: int) -> tuple:
+    """按日期把行分成 parts 段，每段是连续的若干天、行数相近；返回 (行号, 各段边界)
+
+    行号按段排列（段内保持原始顺序），第 p 段为 行号[边界[p]:边界[p + 1]]；
+    日期为空的行本来就会被剔除，不分到任何段。
+    """
+    codes, uniques = pd.factorize(dates, sort=True)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    before = np.cumsum(counts) - counts
+    part_of_day = np.minimum(before * parts // max(int(counts.sum()), 1), parts - 1)
+    rows = np.flatnonzero(codes >= 0)
+    part_of_row = part_of_day[codes[rows]]
+    rows = rows[np.argsort(part_of_row, kind="stable")]
+    bounds = np.searchsorted(part_of_day[codes[rows]], np.arange(parts + 1))
+    return rows, bounds
+
+
+def _share_events(events: pd.DataFrame, rows: np.ndarray) -> tuple:
+    """按 rows 的顺序把事件表各列写进一块共享内存，返回 (共享内存, 布局)
+
+    布局为 [(列名, dtype, 偏移, category 取值)]，子进程按布局直接在共享内存上建视图，
+    不经过序列化；category 列只放整数编码。"__row" 列为在原事件表中的位置。
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    arrays = {"__row": rows.astype(np.int64)}
+    categories = {}
+    for col in EVENT_FIELDS:
+        values = events[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories[col] = values.cat.categories
+            values = values.cat.codes
+        arrays[col] = values.to_numpy()[rows]
+
+    layout, offset = [], 0
+    for col, values in arrays.items():
+        layout.append((col, values.dtype.str, offset, categories.get(col)))
+        offset += -(-values.nbytes // 8) * 8
+    shm = SharedMemory(create=True, size=max(offset, 1))
+    for (col, dtype, start, _), values in zip(layout, arrays.values()):
+        np.ndarray(len(rows), dtype=dtype, buffer=shm.buf, offset=start)[:] = values
+    return shm, layout
+
+
+def _aggregate_partition(shm_name: str, layout: list, total: int, lo: int, hi: int, calendar: ShiftCalendar):
+    """子进程：对共享事件表的 [lo, hi) 行打标记并汇总，返回 (flagged, report_dict)
+
+    flagged 的行号为在原事件表中的位置。
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    shm = SharedMemory(name=shm_name)
+    try:
+        columns = {}
+        for col, dtype, offset, categories in layout:
+            values = np.ndarray(total, dtype=dtype, buffer=shm.buf, offset=offset)[lo:hi]
+            if categories is not None:
+                values = pd.Categorical.from_codes(values, categories)
+            columns[col] = values
+        index = pd.Index(columns.pop("__row").copy())
+        flagged = flag_events(pd.DataFrame(columns, index=index), calendar)
+        # 打标记时已按行筛选复制，结果不再引用共享内存
+        columns = values = None
+        return flagged, aggregate_flags(flagged)
+    finally:
+        shm.close()
+
+
+def _aggregate_parallel(events: pd.DataFrame, calendar: ShiftCalendar, workers: int, step) -> tuple:
+    """按日期分块，在进程池中各自打标记、汇总，再按原始行顺序合并"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    rows, bounds = _partition_days(events["日期"], workers)
+    shm, layout = _share_events(events, rows)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = [
+            pool.submit(_aggregate_partition, shm.name, layout, len(rows), bounds[p], bounds[p + 1], calendar)
+            for p in range(workers) if bounds[p] < bounds[p + 1]
+        ]
+        parts, merged = [], {}
+        for done, future in enumerate(as_completed(futures), start=1):
+            flagged, report_dict = future.result()
+            parts.append(flagged)
+            merged.update(report_dict)
+            step("aggregate", 70 + 20 * done // len(futures))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        shm.close()
+        shm.unlink()
+
+    if not parts:
+        return flag_events(events.iloc[:0], calendar), {}
+    flagged = pd.concat(parts).sort_index()
+    flagged.index = events.index[flagged.index]
+    # 各段的 班次 取值不同，合并后退回 object
+    for col in CATEGORY_FIELDS:
+        flagged[col] = flagged[col].astype("category")
+    # 日期的顺序与单进程一致：数据中首次出现的顺序
+    return flagged, {day: merged[day] for day in flagged["日期"].drop_duplicates()}
+
+
+def aggregate_events(events: pd.DataFrame, calendar: ShiftCalendar, workers: int | None = None,
+                     step=None) -> tuple:
+    """打标记并汇总，返回 (flagged, report_dict)，结果与 flag_events + aggregate_flags 相同
+
+    规则按天独立：事件数达到 PARALLEL_MIN_ROWS 且 workers 不为 1 时按日期分块，
+    在进程池中并行统计（workers 为进程数上限，默认 CPU 核数），列数据经共享内存传给子进程。
+    step(stage, percent) 为可选的进度回调。
+    """
+    workers = workers or os.cpu_count() or 1
+    parallel = workers > 1 and len(events) >= PARALLEL_MIN_ROWS
+    if parallel:
+        # 天数少于进程数时多出的进程分不到日期
+        workers = min(workers, events["日期"].nunique())
+    if parallel and workers > 1:
+        return _aggregate_parallel(events, calendar, workers, step or (lambda stage, percent: None))
+    flagged = flag_events(events, calendar)
+    return flagged, aggregate_flags(flagged)
+
+
+def build_report_dict(df_data: pd.DataFrame, calendar: ShiftCalendar) -> dict:
+    """按规则统计每天每人的就餐/小休情况，见 flag_events 与 aggregate_flags"""
+    return aggregate_flags(flag_events(df_data, calendar))
+
+
+def violation_events(flagged: pd.DataFrame, report_dict: dict) -> pd.DataFrame:
+    """违规明细：每条事件按触犯的规则各占一行（规则列为 REPORT_KEYS 之一）
+
+    用餐/小休总时长超时的人当天全部对应事件都算，单次超时和首尾半小时按事件本身判断。
+    """
+    columns = ["日期", "姓名", "班次", "状态", "开始时间", "结束时间", "持续时长min"]
+    over = {
+        "meal": {(day, emp) for day, rules in report_dict.items()
+                 for emp, v in rules["meal"].items() if v > MEAL_LIMIT},
+        "break_sum": {(day, emp) for day, rules in report_dict.items()
+                      for emp, v in rules["break_sum"].items() if v > BREAK_SUM_LIMIT},
+    }
+    keys = pd.MultiIndex.from_arrays([flagged["日期"], flagged["姓名"]])
+    masks = {
+        "meal": flagged["meal"].to_numpy() & keys.isin(list(over["meal"])) if over["meal"] else None,
+        "break_sum": flagged["break"].to_numpy() & keys.isin(list(over["break_sum"])) if over["break_sum"] else None,
+        "break_once": flagged["once"].to_numpy(),
+        "break_shift": flagged["edge"].to_numpy(),
+    }
+    parts = [
+        flagged.loc[mask, columns].assign(规则=key)
+        for key, mask in masks.items() if mask is not None and mask.any()
+    ]
+    if not parts:
+        return pd.DataFrame(columns=columns + ["规则"])
+    events = pd.concat(parts, ignore_index=True)
+    events["持续时长min"] = _minutes(events["持续时长min"])
+    return events
+
+
+def _by_count(counts: dict) -> dict:
+    """按次数从多到少排序（次数相同保持原顺序）"""
+    return dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+
+
+def day_violations(rules: dict) -> dict:
+    """某一天的违规人员：时长类只留超过阈值的人，次数类按次数排序"""
+    return {
+        "meal": {k: v for k, v in rules["meal"].items() if v > MEAL_LIMIT},
+        "break_sum": {k: v for k, v in rules["break_sum"].items() if v > BREAK_SUM_LIMIT},
+        "break_once": _by_count(rules["break_once"]),
+        "break_shift": _by_count(rules["break_shift"]),
+    }
+
+
+def daily_violations(report_dict: dict) -> dict:
+    """按日期排序的每日违规人员"""
+    return {day: day_violations(report_dict[day]) for day in sorted(report_dict)}
+
+
+def summarize_report(report_dict: dict) -> dict:
+    """整个日期范围的汇总：时长类统计超时天数，次数类累加次数；没有数据返回空字典"""
+    if not report_dict:
+        return {}
+    totals = {key: {} for key in REPORT_KEYS}
+    for rules in report_dict.values():
+        for k, v in rules["meal"].items():
+            if v > MEAL_LIMIT:
+                totals["meal"][k] = totals["meal"].get(k, 0) + 1
+        for k, v in rules["break_sum"].items():
+            if v > BREAK_SUM_LIMIT:
+                totals["break_sum"][k] = totals["break_sum"].get(k, 0) + 1
+        for key in ("break_once", "break_shift"):
+            for k, v in rules[key].items():
+                totals[key][k] = totals[key].get(k, 0) + v
+
+    dates = sorted(report_dict)
+    summary = {"start": dates[0], "end": dates[-1]}
+    summary.update({key: _by_count(counts) for key, counts in totals.items()})
+    return summary
+
+
+class ReportCancelled(Exception):
+    """生成过程被用户取消"""
+
+
+@dataclass
+class ReportResult:
+    """一次生成的结果：GUI 线程只拿它来画树，不再重新计算"""
+    file_name: str
+    report_dict: dict
+    events: pd.DataFrame = field(repr=False)
+    unparsed: int = 0
+    flagged: pd.DataFrame | None = field(default=None, repr=False)
+    summary: dict | None = None
+    concurrency: dict | None = None
+    timings: StageTimer | None = field(default=None, repr=False)
+    memory: dict | None = None
+    cube: object | None = field(default=None, repr=False)  # ivr_cube.MetricCube，按日期范围即时汇总
+    names: object | None = field(default=None, repr=False)  # ivr_index.NameIndex，按姓名搜索
+    snapshots: list | None = field(default=None, repr=False)  # ivr_refresh.SourceState，自动刷新时对比用
+    changed_days: list | None = None  # 增量刷新时有变化的日期，None 表示全部重新统计
+    validation: object | None = field(default=None, repr=False)  # ivr_validate.ValidationReport
+    removed: list | None = field(default=None, repr=False)  # 合并时去掉的重复行，改配置后重新检查用
+
+
+def compact_events(events: pd.DataFrame) -> pd.DataFrame:
+    """事件表换成紧凑类型：只保留 EVENT_FIELDS，姓名/班次/状态 为 category，持续时长为 float32
+
+    时间列本身就是 datetime64（每个 8 字节的整数），保持不变。多个事件表合并后
+    category 的取值不同会退回 object，再调用一次即可。
+    """
+    columns = {}
+    for col in EVENT_FIELDS:
+        values = events[col]
+        if col in CATEGORY_FIELDS and not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype("category")
+        elif col == "持续时长min":
+            values = values.astype("float32")
+        columns[col] = values
+    return pd.DataFrame(columns, index=events.index)
+
+
+def prepare_events(df_data: pd.DataFrame, time_format: str | None = None, timer: StageTimer | None = None):
+    """把列映射后的原始数据整理成统计用的事件表，返回 (事件表, 无法解析的时间数)
+
+    事件表的 attrs["memory"] 记录读取后（原始类型）和压缩后各列占用的字节数。
+    """
+    timer = StageTimer() if timer is None else timer
+    with timer.stage("mapping", rows=len(df_data)):
+        before = column_bytes(df_data)
+        df_data = df_data.copy()
+        df_data["持续时长min"] = pd.to_numeric(df_data["持续时长min"], errors="coerce").round(2)
+        df_data["日期"] = pd.to_datetime(df_data["日期"], errors="coerce")
+
+    # 整列转换时间，只有时刻的值落在记录的日期上
+    unparsed = 0
+    with timer.stage("parse", rows=len(df_data)):
+        for col in ["开始时间", "结束时间"]:
+            df_data[col], failed = normalize_time_column(df_data[col], df_data["日期"], time_format)
+            unparsed += failed
+
+    with timer.stage("compact", rows=len(df_data)):
+        events = compact_events(df_data)
+        events.attrs["memory"] = {"before": before, "after": column_bytes(events)}
+    return events, unparsed
+
+
+def load_source(file_name: str, sheet: str | None, column_map: dict, time_format: str | None = None,
+                on_chunk=None, timer: StageTimer | None = None):
+    """读取并整理一个 sheet，返回 (事件表, 无法解析的时间数)；可在子进程中运行"""
+    timer = StageTimer() if timer is None else timer
+    with timer.stage("read") as record:
+        df_data = load_excel_data(file_name, column_map, on_chunk=on_chunk, sheet=sheet)
+        record.rows = len(df_data)
+    return prepare_events(df_data[EVENT_FIELDS], time_format, timer)
+
+
+def combine_parts(parts: list, timer: StageTimer | None = None, removed: list | None = None) -> tuple:
+    """各 sheet 的事件表合并成一张并去重，返回 (事件表, 内存统计)
+
+    同一人同一开始时间的事件只保留第一条，不论重复出现在同一个 sheet 内还是多个 sheet / 文件
+    重叠的日期里；去重键不完整的行不算重复，留给数据检查按缺失归因。
+    removed 为列表时，去掉的重复行追加到其中（供数据检查）。
+    """
+    timer = StageTimer() if timer is None else timer
+    memory = merge_memory([part.attrs.get("memory") for part in parts])
+    with timer.stage("dedup") as record:
+        events = parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+        complete = events[DEDUP_FIELDS].notna().all(axis=1)
+        duplicated = events.duplicated(subset=DEDUP_FIELDS, keep="first") & complete
+        if duplicated.any():
+            if removed is not None:
+                removed.append(events[duplicated])
+            events = events[~duplicated].reset_index(drop=True)
+        if len(parts) > 1:
+            events = compact_events(events)
+        record.rows = len(events)
+    if memory is not None and len(parts) > 1:
+        memory["after"] = column_bytes(events)
+    return events, memory
+
+
+def describe_sources(sources) -> str:
+    """用于显示和记录的来源名：单个文件为其路径，多个文件用分号连接"""
+    if isinstance(sources, str):
+        return sources
+    return "; ".join(dict.fromkeys(file_name for file_name, _ in sources))
+
+
+def _load_parallel(pending: list, column_map: dict, time_format: str | None, workers: int | None, step) -> list:
+    """多个 sheet 在进程池中并行读取和解析，耗时接近最慢的一个；返回与 pending 同序的结果"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+    # spawn：GUI 后台线程中 fork 不安全，打包后的 exe 也只能用 spawn
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = {
+            pool.submit(load_source, file_name, sheet, column_map, time_format): i
+            for i, (file_name, sheet) in enumerate(pending)
+        }
+        results = [None] * len(pending)
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            step("read", 40 * done // len(pending))
+        return results
+    finally:
+        # 取消或出错时不等待仍在运行的子进程
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_report(sources, column_map: dict, calendar: ShiftCalendar, time_format: str | None = None,
+               progress=None, is_cancelled=None, cache=None, timer: StageTimer | None = None,
+               workers: int | None = None) -> ReportResult:
+    """读取 -> 解析 -> 统计，阶段之间回报进度并检查是否取消
+
+    sources 为单个文件（读取其中表头符合列映射的全部 sheet）或 [(文件, sheet), ...]；
+    多个 sheet 在进程池中并行读取（workers 为进程数上限），合并后按
+    (日期, 姓名, 开始时间) 去重；事件多时统计也按日期分块并行，见 aggregate_events。progress(stage, percent) 与 is_cancelled() 都是
+    可选回调，供后台线程使用；传入 ParsedCache 时，同一 sheet、同一解析配置
+    直接复用上次整理好的事件表。各阶段耗时记录在 timer（默认新建）中，随结果返回。
+    """
+    def step(stage, percent):
+        if is_cancelled is not None and is_cancelled():
+            raise ReportCancelled()
+        if progress is not None:
+            progress(stage, percent)
+
+    timer = StageTimer() if timer is None else timer
+    label = describe_sources(sources)
+    step("read", 0)
+    if isinstance(sources, str):
+        sources = list_sources([sources], column_map)
+
+    parts, keys, failed = [None] * len(sources), [None] * len(sources), [0] * len(sources)
+    if cache is not None:
+        with timer.stage("cache") as record:
+            for i, (file_name, sheet) in enumerate(sources):
+                keys[i] = cache.fingerprint(
+                    file_name, {"columns": column_map, "time_format": time_format or "", "sheet": sheet}
+                )
+                cached = cache.get(keys[i])
+                if cached is not None:
+                    parts[i] = cached[0]
+                    failed[i] = cached[1].get("unparsed", 0)
+            record.rows = sum(len(p) for p in parts if p is not None)
+
+    missing = [i for i, part in enumerate(parts) if part is None]
+    if len(missing) == 1 or (missing and workers == 1):
+        for i in missing:
+            parts[i], failed[i] = load_source(*sources[i], column_map, time_format,
+                                              on_chunk=lambda rows: step("read", 0), timer=timer)
+    elif missing:
+        with timer.stage("read") as record:
+            loaded = _load_parallel([sources[i] for i in missing], column_map, time_format, workers, step)
+            record.rows = sum(len(events) for events, _ in loaded)
+        for i, (events, count) in zip(missing, loaded):
+            parts[i], failed[i] = events, count
+    step("parse", 40)
+
+    if cache is not None and missing:
+        with timer.stage("cache_write"):
+            for i in missing:
+                # 缓存只是加速，写不进去（磁盘满、目录只读或被占用）时照常出报表
+                try:
+                    cache.put(keys[i], parts[i], {"unparsed": failed[i]})
+                except OSError as e:
+                    logger.warning("cache write failed, continuing: %s [%s]: %s", sources[i][0], sources[i][1], e)
+
+    removed = []
+    events, memory = combine_parts(parts, timer, removed)
+
+    step("aggregate", 70)
+    with timer.stage("aggregate", rows=len(events)):
+        flagged, report_dict = aggregate_events(events, calendar, workers, step)
+    with timer.stage("validate", rows=len(events)):
+        from ivr_validate import validate_events
+
+        validation = validate_events(events, flagged, calendar, removed, sum(failed))
+    step("render", 90)
+    return ReportResult(label, report_dict, events, sum(failed), flagged, timings=timer, memory=memory,
+                        validation=validation, removed=removed)
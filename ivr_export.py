@@ -0,0 +1,179 @@
+# 报告导出：日报、日期范围汇总、违规明细写成 xlsx / csv / html / json，逐行写出，不依赖 Qt
+
+import csv
+import html
+import json
+import os
+
+from ivr_engine import RULE_LABELS
+
+EXPORT_FORMATS = ("xlsx", "csv", "html", "json")
+EVENT_CHUNK = 20000  # 违规明细每次转换的行数
+
+DAILY_HEADER = ["日期", "规则", "姓名", "数值"]
+SUMMARY_HEADER = ["开始日期", "结束日期", "规则", "姓名", "次数"]
+EVENT_HEADER = ["日期", "姓名", "班次", "状态", "开始时间", "结束时间", "持续时长min", "规则"]
+
+
+def _day(value) -> str:
+    return value.strftime("%Y-%m-%d")
+
+
+# 各部分的行（生成器，写到哪里生成到哪里）
+def daily_rows(daily: dict):
+    for day, rules in daily.items():
+        for key, people in rules.items():
+            for emp, value in people.items():
+                yield _day(day), RULE_LABELS[key], emp, value
+
+
+def summary_rows(summary: dict):
+    if not summary:
+        return
+    start, end = _day(summary["start"]), _day(summary["end"])
+    for key in RULE_LABELS:
+        for emp, count in summary[key].items():
+            yield start, end, RULE_LABELS[key], emp, count
+
+
+def event_rows(events, as_text: bool = False):
+    """违规明细，分块转换；as_text 时时间转成文本（csv/html），否则保留 datetime（xlsx）"""
+    if events is None:
+        return
+    for begin in range(0, len(events), EVENT_CHUNK):
+        part = events.iloc[begin:begin + EVENT_CHUNK]
+        days = part["日期"].dt.strftime("%Y-%m-%d")
+        if as_text:
+            starts = part["开始时间"].dt.strftime("%Y-%m-%d %H:%M:%S")
+            ends = part["结束时间"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        else:
+            starts = part["开始时间"].dt.to_pydatetime()
+            ends = part["结束时间"].dt.to_pydatetime()
+        durations = part["持续时长min"].astype(float).where(part["持续时长min"].notna(), None)
+        labels = part["规则"].map(RULE_LABELS)
+        yield from zip(days, part["姓名"], part["班次"], part["状态"], starts, ends, durations, labels)
+
+
+def _sections(daily: dict, summary: dict, events, as_text: bool):
+    return [
+        ("daily", "日报", DAILY_HEADER, daily_rows(daily)),
+        ("summary", "汇总", SUMMARY_HEADER, summary_rows(summary)),
+        ("events", "违规明细", EVENT_HEADER, event_rows(events, as_text)),
+    ]
+
+
+# 写出
+def write_xlsx(path: str, daily: dict, summary: dict, events=None):
+    """openpyxl 只写模式：行直接写入临时文件，内存占用不随行数增长"""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for _, title, header, rows in _sections(daily, summary, events, as_text=False):
+        ws = wb.create_sheet(title)
+        ws.append(header)
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+    return [path]
+
+
+def write_csv(base: str, daily: dict, summary: dict, events=None):
+    """每部分一个文件：<base>_daily.csv / _summary.csv / _events.csv（utf-8-sig，Excel 直接打开不乱码）"""
+    written = []
+    for name, _, header, rows in _sections(daily, summary, events, as_text=True):
+        path = f"{base}_{name}.csv"
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        written.append(path)
+    return written
+
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: "Microsoft YaHei", sans-serif; margin: 24px; color: #333; }}
+h1 {{ font-size: 20px; }}
+h2 {{ font-size: 16px; margin-top: 28px; }}
+table {{ border-collapse: collapse; font-size: 13px; }}
+th, td {{ border: 1px solid #ddd; padding: 4px 10px; text-align: left; }}
+th {{ background: #f5f5f5; position: sticky; top: 0; }}
+tr:nth-child(even) td {{ background: #fafafa; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+"""
+
+
+def write_html(path: str, daily: dict, summary: dict, events=None, title: str | None = None):
+    """单个自包含的 HTML 页面（内联样式），表格逐行写出"""
+    if title is None:
+        title = "日报"
+        if summary:
+            title += f" {_day(summary['start'])} ~ {_day(summary['end'])}"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HTML_HEAD.format(title=html.escape(title)))
+        for _, heading, header, rows in _sections(daily, summary, events, as_text=True):
+            f.write(f"<h2>{heading}</h2>\n<table>\n<tr>")
+            f.write("".join(f"<th>{html.escape(h)}</th>" for h in header))
+            f.write("</tr>\n")
+            for row in rows:
+                cells = "".join(
+                    f"<td>{'' if v is None else html.escape(str(v))}</td>" for v in row
+                )
+                f.write(f"<tr>{cells}</tr>\n")
+            f.write("</table>\n")
+        f.write("</body>\n</html>\n")
+    return [path]
+
+
+def report_to_json(daily: dict, summary: dict) -> tuple:
+    """日报 / 汇总 -> 可直接 json.dump 的结构（日期转成字符串）"""
+    daily_json = {_day(day): rules for day, rules in daily.items()}
+    summary_json = dict(summary)
+    if summary_json:
+        summary_json["start"] = _day(summary["start"])
+        summary_json["end"] = _day(summary["end"])
+    return daily_json, summary_json
+
+
+def write_json(base: str, daily: dict, summary: dict, events=None):
+    """<base>_daily.json / <base>_summary.json（违规明细只导出到表格格式）"""
+    written = []
+    daily_json, summary_json = report_to_json(daily, summary)
+    for name, data in (("daily", daily_json), ("summary", summary_json)):
+        path = f"{base}_{name}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        written.append(path)
+    return written
+
+
+def export_report(base: str, formats, daily: dict, summary: dict, events=None) -> list:
+    """按格式写出，base 为不带扩展名的输出路径；返回写出的文件
+
+    daily 为 daily_violations 的结果，summary 为 summarize_report / HistoryStore.summarize
+    的结果，events 为 violation_events 的结果（可省略）。只用已算好的结构，不重新统计。
+    """
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"不支持的导出格式：{'、'.join(unknown)}")
+    directory = os.path.dirname(os.path.abspath(base))
+    os.makedirs(directory, exist_ok=True)
+
+    written = []
+    for fmt in formats:
+        if fmt == "xlsx":
+            written += write_xlsx(f"{base}.xlsx", daily, summary, events)
+        elif fmt == "html":
+            written += write_html(f"{base}.html", daily, summary, events)
+        elif fmt == "csv":
+            written += write_csv(base, daily, summary, events)
+        else:
+            written += write_json(base, daily, summary, events)
+    return written
@@ -0,0 +1,1188 @@
+# 图形界面（PyQt6），由 ivr_status.py 启动
+# pandas 相关模块（ivr_engine / ivr_cache / ivr_store）只在用到时导入，窗口先显示，再在后台预热
+
+import importlib
+import json
+import sys, os
+import time
+from PyQt6.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QPushButton, QFileDialog, QLabel, QHBoxLayout,
+    QTreeView, QDialog, QTableWidget, QMessageBox, QTableWidgetItem, QHeaderView, QProgressBar, QDateEdit,
+    QToolButton, QPlainTextEdit, QInputDialog, QListWidget, QListWidgetItem, QCheckBox, QLineEdit
+)
+from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import Qt, QDate, QFileSystemWatcher, QThread, QTimer, pyqtSignal
+
+from ivr_config import ConfigManager
+from ivr_metrics import (
+    log_memory, log_timings, logger, memory_lines, profiled, setup_logging, StageTimer, STARTUP_PROBE_ENV,
+)
+from ivr_models import concurrency_summary_nodes, daily_nodes, summary_nodes, ReportTreeModel
+
+# 窗口显示后在后台线程导入，选择文件时通常已加载完毕
+WARMUP_MODULES = ("ivr_engine", "ivr_concurrency", "ivr_cache", "ivr_store", "openpyxl")
+
+RESOURCE_PATHS = {
+    "icon": "note.ico",
+    "stylesheet": "light.qss"
+}
+
+
+# 工具函数
+def resource_path(relative_path):
+    """获取资源文件路径（兼容打包/开发模式）"""
+    if hasattr(sys, "_MEIPASS"):
+        return os.path.join(sys._MEIPASS, relative_path)
+    return os.path.join(os.path.abspath("."), relative_path)
+
+
+def load_stylesheet():
+    # 加载样式表（只加载一次）
+    try:
+        with open(resource_path(RESOURCE_PATHS["stylesheet"]), "r", encoding="utf-8") as f:
+            return f.read()
+    except Exception:
+        return ""
+
+
+# 预加载样式表
+STYLESHEET = load_stylesheet()
+
+
+class ChangeDialog(QDialog):
+    # 班次、列名或排班表保存后发出，主窗口立即按新配置重新统计
+    settings_changed = pyqtSignal()
+
+    def __init__(self, config_manager, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("修改配置")
+        self.setFixedSize(250, 360)
+        self.config_manager = config_manager
+
+        # 创建导入和导出的按钮
+        self.btn_column = QPushButton("修改表格列名")
+        self.btn_shift = QPushButton("修改班次时间")
+        self.btn_roster = QPushButton("导入排班表")
+        self.btn_concurrency = QPushButton("小休并发上限")
+        self.btn_clear_cache = QPushButton("清除缓存")
+        self.btn_server = QPushButton("报告服务器")
+        self.btn_cancel = QPushButton("⛌  取消")
+        self.btn_cancel.clicked.connect(self.close)
+
+        self.btn_shift.clicked.connect(self.shift_change)
+        self.btn_column.clicked.connect(self.column_change)
+        self.btn_roster.clicked.connect(self.roster_change)
+        self.btn_concurrency.clicked.connect(self.concurrency_change)
+        self.btn_clear_cache.clicked.connect(self.clear_cache)
+        self.btn_server.clicked.connect(self.server_change)
+
+        # 布局
+        button_layout = QVBoxLayout()
+        button_layout.addWidget(self.btn_column)
+        button_layout.addWidget(self.btn_shift)
+        button_layout.addWidget(self.btn_roster)
+        button_layout.addWidget(self.btn_concurrency)
+        button_layout.addWidget(self.btn_clear_cache)
+        button_layout.addWidget(self.btn_server)
+        button_layout.addWidget(self.btn_cancel)
+
+        self.setLayout(button_layout)
+
+    def shift_change(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("编辑班次时间")
+        dialog.resize(400, 490)
+
+        vbox = QVBoxLayout(dialog)
+        table = QTableWidget(dialog)
+        table.verticalHeader().setVisible(False)
+
+        shift_dict = self.config_manager.get_shift_config()
+        table.setRowCount(len(shift_dict))
+        table.setColumnCount(3)
+        table.setHorizontalHeaderLabels(["班次", "开始时间", "结束时间"])
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+        for i, (k, v) in enumerate(shift_dict.items()):
+            item_field = QTableWidgetItem(k)
+            item_field.setFlags(Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled)
+            table.setItem(i, 0, item_field)
+            item_field.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+
+            item_value1 = QTableWidgetItem(v[0])
+            item_value1.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            table.setItem(i, 1, item_value1)
+            item_value2 = QTableWidgetItem(v[1])
+            item_value2.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            table.setItem(i, 2, item_value2)
+
+        vbox.addWidget(table)
+        btn_layout = QHBoxLayout()
+        btn_save = QPushButton("保存修改")
+        btn_cancel = QPushButton("⛌  取消")
+        btn_cancel.clicked.connect(dialog.close)
+        btn_layout.addWidget(btn_save)
+        btn_layout.addWidget(btn_cancel)
+        vbox.addLayout(btn_layout)
+
+        def save_shift():
+            current_item = table.currentItem()
+            if current_item is not None:
+                table.closePersistentEditor(current_item)
+            new_dict = {}
+            for i in range(table.rowCount()):
+                shift = table.item(i, 0).text().strip()
+                start = table.item(i, 1).text().strip()
+                end = table.item(i, 2).text().strip()
+                if shift and start and end:
+                    new_dict[shift] = [start, end]
+            self.config_manager.update_shift(new_dict)
+            self.settings_changed.emit()
+            QMessageBox.warning(self, "成功", "班次时间已更新！")
+            dialog.close()
+
+        btn_save.clicked.connect(save_shift)
+        dialog.exec()
+
+    # ================= 排班表 =================
+    def roster_change(self):
+        """选择按日期覆盖个人班次的排班表（日期/姓名/班次 三列）"""
+        current = self.config_manager.get_roster_file()
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "选择排班表", "", "排班表 (*.xlsx *.xls *.csv)"
+        )
+        if file_name:
+            self.config_manager.update_roster_file(file_name)
+            self.settings_changed.emit()
+            QMessageBox.warning(self, "成功", "排班表已更新！")
+        elif current:
+            reply = QMessageBox.question(self, "排班表", f"当前排班表：\n{current}\n\n是否清除？")
+            if reply == QMessageBox.StandardButton.Yes:
+                self.config_manager.update_roster_file("")
+                self.settings_changed.emit()
+
+    # ================= 小休并发 =================
+    def concurrency_change(self):
+        limit, ok = QInputDialog.getInt(
+            self, "小休并发上限", "同时小休超过多少人时提醒：",
+            self.config_manager.get_break_concurrency_limit(), 1, 9999
+        )
+        if ok:
+            self.config_manager.update_break_concurrency_limit(limit)
+            QMessageBox.warning(self, "成功", "小休并发上限已更新！")
+
+    # ================= 报告服务器 =================
+    def server_change(self):
+        """填写 ivr_status serve 的地址后从服务器取报告，清空则在本机统计"""
+        url, ok = QInputDialog.getText(
+            self, "报告服务器", "服务器地址（如 http://192.168.1.10:8765，留空则在本机统计）：",
+            text=self.config_manager.get_server_url()
+        )
+        if ok:
+            self.config_manager.update_server_url(url)
+            QMessageBox.warning(self, "成功", "报告服务器已更新！")
+
+    # ================= 缓存 =================
+    def clear_cache(self):
+        from ivr_cache import ParsedCache
+
+        cache = ParsedCache(self.config_manager.get_config_dir(), self.config_manager.get_cache_max_mb())
+        size_mb = cache.size_bytes() / 1024 / 1024
+        cache.clear()
+        QMessageBox.warning(self, "成功", f"已清除缓存（{size_mb:.1f} MB）！")
+
+    # ================= 列名修改 =================
+    def column_change(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("编辑列名")
+        dialog.resize(400, 370)
+
+        vbox = QVBoxLayout(dialog)
+        table = QTableWidget(dialog)
+        table.verticalHeader().setVisible(False)
+
+        col_dict = self.config_manager.get_column_config()
+        table.setRowCount(len(col_dict))
+        table.setColumnCount(2)
+        table.setHorizontalHeaderLabels(["字段", "列名"])
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+        for i, (k, v) in enumerate(col_dict.items()):
+            item_field = QTableWidgetItem(k)
+            item_field.setFlags(Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled)
+            item_field.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            table.setItem(i, 0, item_field)
+
+            item_value = QTableWidgetItem(v)
+            item_value.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            table.setItem(i, 1, item_value)
+
+        vbox.addWidget(table)
+        btn_layout = QHBoxLayout()
+        btn_save = QPushButton("保存修改")
+        btn_cancel = QPushButton("⛌  取消")
+        btn_cancel.clicked.connect(dialog.reject)
+        btn_layout.addWidget(btn_save)
+        btn_layout.addWidget(btn_cancel)
+        vbox.addLayout(btn_layout)
+
+        def save_column():
+            current_item = table.currentItem()
+            if current_item is not None:
+                table.closePersistentEditor(current_item)
+            new_dict = {}
+            for i in range(table.rowCount()):
+                field = table.item(i, 0).text().strip()
+                col = table.item(i, 1).text().strip()
+                if field and col:
+                    new_dict[field] = col
+            logger.info("column config saved: %s", new_dict)
+            self.config_manager.update_columns(new_dict)
+            self.settings_changed.emit()
+            QMessageBox.warning(self, "成功", "列名配置已更新！")
+            dialog.close()
+
+        btn_save.clicked.connect(save_column)
+        dialog.exec()
+
+
+STAGE_TEXT = {
+    "read": "读取文件",
+    "parse": "解析时间",
+    "aggregate": "统计规则",
+    "render": "生成报告",
+}
+
+# 状态面板中各阶段的名称
+TIMING_TEXT = {
+    "cache": "缓存查找",
+    "read": "读取 Excel",
+    "mapping": "列映射",
+    "parse": "时间解析",
+    "compact": "压缩事件表",
+    "diff": "对比变化",
+    "cache_write": "写入缓存",
+    "aggregate": "规则统计",
+    "concurrency": "小休并发",
+    "cube": "汇总索引",
+    "index": "姓名索引",
+    "validate": "数据检查",
+    "fetch": "从报告服务获取",
+    "decode": "解析服务端结果",
+    "history": "写入历史库",
+    "tree": "生成树",
+    "total": "合计",
+    "memory": "事件表内存",
+}
+
+
+class SheetDialog(QDialog):
+    """选择要合并统计的 sheet，默认全部勾选"""
+
+    def __init__(self, sources, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("选择工作表")
+        self.resize(400, 360)
+        self.sources = sources
+
+        vbox = QVBoxLayout(self)
+        vbox.addWidget(QLabel("以下工作表将合并为一份报告（重复记录自动去除）："))
+        self.list = QListWidget()
+        for file_name, sheet in sources:
+            item = QListWidgetItem(f"{os.path.basename(file_name)} / {sheet}")
+            item.setCheckState(Qt.CheckState.Checked)
+            self.list.addItem(item)
+        vbox.addWidget(self.list)
+
+        btn_layout = QHBoxLayout()
+        btn_ok = QPushButton("确定")
+        btn_ok.clicked.connect(self.accept)
+        btn_cancel = QPushButton("⛌  取消")
+        btn_cancel.clicked.connect(self.reject)
+        btn_layout.addWidget(btn_ok)
+        btn_layout.addWidget(btn_cancel)
+        vbox.addLayout(btn_layout)
+
+    def selected(self) -> list:
+        return [
+            source for i, source in enumerate(self.sources)
+            if self.list.item(i).checkState() == Qt.CheckState.Checked
+        ]
+
+
+class WarmupWorker(QThread):
+    """后台导入 pandas 等重模块，导入失败留到真正使用时再报错"""
+
+    def run(self):
+        for name in WARMUP_MODULES:
+            if self.isInterruptionRequested():
+                return
+            try:
+                importlib.import_module(name)
+            except Exception:
+                logger.exception("warm-up import failed: %s", name)
+
+
+# 文件最后一次变化后等待多久再刷新（毫秒），导出程序分多次写入时只刷新一次
+REFRESH_DELAY_MS = 2000
+
+
+class ReportWorker(QThread):
+    """后台线程：读取、解析、统计，结果通过信号交回 GUI 线程
+
+    incremental 时走 ivr_refresh.refresh_report：与 previous 对比，只解析新增行、
+    只重新统计受影响的 (日期, 姓名)。reapply 为 (有变化的班次代码, 有变化的字段) 时走
+    ivr_refresh.reapply_settings，用 previous 的事件表按新配置重新统计。设置了 server_url 时先向报告服务请求（按文件名），
+    服务不可用或没有该文件时退回本机统计。
+    """
+    progress = pyqtSignal(str, int)
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_name, column_map, shift_calendar, time_format, cache=None, store=None,
+                 concurrency_limit=None, parent=None, previous=None, incremental=False, server_url="",
+                 reapply=None):
+        super().__init__(parent)
+        self.file_name = file_name
+        self.column_map = dict(column_map)
+        self.shift_calendar = shift_calendar
+        self.time_format = time_format
+        self.cache = cache
+        self.store = store
+        self.concurrency_limit = concurrency_limit
+        self.previous = previous
+        self.incremental = incremental
+        self.reapply = reapply
+        # 报告服务按单个文件（可指定 sheet）统计，合并多个 sheet / 文件时在本机统计
+        self.server_source = None
+        if isinstance(file_name, str):
+            self.server_source = (file_name, None)
+        elif len(file_name) == 1:
+            self.server_source = tuple(file_name[0])
+        self.server_url = server_url if self.server_source is not None and reapply is None else ""
+
+    def _fetch(self, timer):
+        """从报告服务取日报、汇总、小休并发和数据检查摘要；没有事件明细
+
+        按内容（大小和 sha256）确认服务器上的文件就是本地这一份，对不上时抛出 ValueError。
+        """
+        from ivr_engine import ReportResult
+        from ivr_server import (concurrency_from_payload, fetch_matching_report, report_from_payload,
+                                summary_from_payload)
+        from ivr_validate import ValidationReport
+
+        file_name, sheet = self.server_source
+        with timer.stage("fetch"):
+            payload = fetch_matching_report(self.server_url, file_name, sheet)
+        with timer.stage("decode"):
+            result = ReportResult(file_name, report_from_payload(payload["report"]), None,
+                                  payload["unparsed"], timings=timer)
+            result.summary = summary_from_payload(payload["summary"])
+            result.concurrency = concurrency_from_payload(payload["concurrency"]) or None
+            if payload["validation"] is not None:
+                result.validation = ValidationReport(**payload["validation"])
+        logger.info("fetched %s as %s from %s (%s)", file_name, payload["file"], self.server_url, payload["source"])
+        return result
+
+    def run(self):
+        from ivr_concurrency import break_concurrency
+        from ivr_cube import MetricCube
+        from ivr_engine import describe_sources, run_report, summarize_report, ReportCancelled
+        from ivr_index import NameIndex
+
+        timer = StageTimer()
+        try:
+            # 设置了 IVR_PROFILE 时记录本次生成的 cProfile
+            with profiled("report"):
+                result = None
+                if self.server_url:
+                    try:
+                        result = self._fetch(timer)
+                    except (OSError, RuntimeError, ValueError) as e:
+                        logger.warning("report server unavailable, computing locally: %s", e)
+                if result is None and self.reapply is not None:
+                    from ivr_refresh import reapply_settings
+
+                    codes, fields = self.reapply
+                    result = reapply_settings(
+                        self.previous, self.file_name, self.column_map, self.shift_calendar, codes, fields,
+                        self.time_format, self.concurrency_limit, timer
+                    )
+                elif result is None and self.incremental:
+                    from ivr_refresh import refresh_report
+
+                    result = refresh_report(
+                        self.file_name, self.column_map, self.shift_calendar, self.time_format,
+                        previous=self.previous, concurrency_limit=self.concurrency_limit, timer=timer,
+                        progress=self.progress.emit, is_cancelled=self.isInterruptionRequested
+                    )
+                elif result is None:
+                    result = run_report(
+                        self.file_name, self.column_map, self.shift_calendar, self.time_format,
+                        progress=self.progress.emit, is_cancelled=self.isInterruptionRequested, cache=self.cache,
+                        timer=timer
+                    )
+                    if self.concurrency_limit is not None and not self.isInterruptionRequested():
+                        with timer.stage("concurrency", rows=int(result.flagged["break"].sum())):
+                            result.concurrency = break_concurrency(result.flagged, self.concurrency_limit)
+                with timer.stage("cube"):
+                    result.cube = MetricCube.from_report(result.report_dict)
+                if result.flagged is not None:
+                    with timer.stage("index", rows=len(result.flagged)):
+                        result.names = NameIndex(result.flagged)
+                # 入库后汇总直接从历史库查询，库里同时包含之前导入的日期；
+                # 报告服务的结果已带汇总、没有事件明细，不写入本机历史库
+                if result.flagged is None:
+                    pass
+                elif self.store is not None and result.report_dict and not self.isInterruptionRequested():
+                    # 增量刷新只替换有变化的日期
+                    report_dict, flagged = result.report_dict, result.flagged
+                    if result.changed_days is not None:
+                        report_dict = {d: report_dict[d] for d in result.changed_days if d in report_dict}
+                        flagged = flagged[flagged["日期"].isin(list(report_dict))]
+                    with timer.stage("history", rows=len(flagged)):
+                        if report_dict:
+                            self.store.ingest(report_dict, flagged, result.file_name)
+                        result.summary = self.store.summarize(min(result.report_dict), max(result.report_dict))
+                else:
+                    result.summary = summarize_report(result.report_dict)
+        except ReportCancelled:
+            log_timings(describe_sources(self.file_name), timer, "cancelled")
+            self.cancelled.emit()
+        except Exception as e:
+            log_timings(describe_sources(self.file_name), timer, "failed")
+            logger.exception("report failed: %s", describe_sources(self.file_name))
+            self.failed.emit(str(e))
+        else:
+            if self.isInterruptionRequested():
+                self.cancelled.emit()
+            else:
+                self.succeeded.emit(result)
+
+
+class ExportWorker(QThread):
+    """后台导出：只用已算好的统计结果和事件，不重新统计"""
+    succeeded = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, base, fmt, result, summary, parent=None):
+        super().__init__(parent)
+        self.base = base
+        self.fmt = fmt
+        self.result = result
+        self.summary = summary
+
+    def run(self):
+        from ivr_engine import daily_violations, violation_events
+        from ivr_export import export_report
+
+        try:
+            written = export_report(
+                self.base, [self.fmt], daily_violations(self.result.report_dict), self.summary,
+                None if self.result.flagged is None else
+                violation_events(self.result.flagged, self.result.report_dict),
+            )
+        except Exception as e:
+            logger.exception("export failed: %s", self.base)
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(written)
+
+
+# 导出对话框的文件类型 -> 格式
+EXPORT_FILTERS = {
+    "Excel 工作簿 (*.xlsx)": "xlsx",
+    "网页 (*.html)": "html",
+    "CSV，日报/汇总/明细各一个文件 (*.csv)": "csv",
+}
+
+
+class DailyReportApp(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("日报生成器")
+        self.resize(700, 600)
+        self.setMinimumSize(500, 400)
+        self.setWindowIcon(QIcon(resource_path(RESOURCE_PATHS["icon"])))
+
+        self.config_manager = ConfigManager(parent=self)
+        setup_logging(self.config_manager.get_config_dir())
+        self.shift_dict = self.config_manager.get_shift_config()
+        self.column_map = self.config_manager.get_column_config()
+        self._roster_file = self.config_manager.get_roster_file()
+        # 班次日历、缓存、历史库都依赖 pandas，首次使用时才创建
+        self._shift_calendar = None
+        self._parsed_cache = None
+        self._history_store = None
+
+        layout = QVBoxLayout(self)
+        top_area = QHBoxLayout()
+        layout.addLayout(top_area)
+
+        self.btn_select = QPushButton("选择文件")
+        self.btn_select.setFixedWidth(100)
+        self.btn_select.clicked.connect(self.select_file)
+        top_area.addWidget(self.btn_select)
+
+        self.label = QLabel("请选择 Excel 文件：")
+        top_area.addWidget(self.label)
+
+        # 自动刷新：监视打开的文件，被覆盖后增量刷新
+        self.chk_refresh = QCheckBox("自动刷新")
+        self.chk_refresh.setToolTip("文件被覆盖后自动刷新，只统计新增或变化的行")
+        self.chk_refresh.setChecked(self.config_manager.get_auto_refresh())
+        self.chk_refresh.toggled.connect(self.toggle_auto_refresh)
+        top_area.addWidget(self.chk_refresh)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(REFRESH_DELAY_MS)
+        self.refresh_timer.timeout.connect(self.refresh_report)
+
+        # 折叠/展开耗时面板
+        self.btn_details = QToolButton()
+        self.btn_details.setArrowType(Qt.ArrowType.RightArrow)
+        self.btn_details.setCheckable(True)
+        self.btn_details.setToolTip("各阶段耗时")
+        self.btn_details.toggled.connect(self.toggle_details)
+        top_area.addWidget(self.btn_details)
+
+        self.btn_modify = QPushButton("")
+        self.btn_modify.setIcon(QIcon(resource_path("setting.svg")))
+        self.btn_modify.setFixedWidth(40)
+        self.btn_modify.clicked.connect(self.change_dialog)
+        top_area.addWidget(self.btn_modify)
+
+        # 进度条 + 取消
+        progress_area = QHBoxLayout()
+        layout.addLayout(progress_area)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        progress_area.addWidget(self.progress_bar)
+        self.btn_cancel = QPushButton("⛌  取消")
+        self.btn_cancel.setFixedWidth(100)
+        self.btn_cancel.clicked.connect(self.cancel_report)
+        progress_area.addWidget(self.btn_cancel)
+        self.progress_bar.hide()
+        self.btn_cancel.hide()
+
+        # 耗时面板：各阶段耗时、行数、峰值内存，默认折叠
+        self.status_panel = QPlainTextEdit()
+        self.status_panel.setReadOnly(True)
+        self.status_panel.setMaximumHeight(130)
+        self.status_panel.setPlaceholderText("生成报告后显示各阶段耗时")
+        self.status_panel.hide()
+        layout.addWidget(self.status_panel)
+
+        # 历史汇总：按日期范围查询历史库
+        range_area = QHBoxLayout()
+        layout.addLayout(range_area)
+        range_area.addWidget(QLabel("汇总范围："))
+        self.date_start = QDateEdit()
+        self.date_end = QDateEdit()
+        for edit in (self.date_start, self.date_end):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+            edit.setDate(QDate.currentDate())
+            edit.dateChanged.connect(self.on_range_changed)
+        range_area.addWidget(self.date_start)
+        range_area.addWidget(QLabel("~"))
+        range_area.addWidget(self.date_end)
+        self.btn_history = QPushButton("历史汇总")
+        self.btn_history.setFixedWidth(100)
+        self.btn_history.clicked.connect(self.show_history_summary)
+        range_area.addWidget(self.btn_history)
+        range_area.addStretch()
+        self.btn_heatmap = QPushButton("时段热力图")
+        self.btn_heatmap.setFixedWidth(100)
+        self.btn_heatmap.setEnabled(False)
+        self.btn_heatmap.setToolTip("汇总范围内各班次每天就餐/小休集中在哪些时段")
+        self.btn_heatmap.clicked.connect(self.show_heatmap)
+        range_area.addWidget(self.btn_heatmap)
+        self.btn_issues = QPushButton("数据问题")
+        self.btn_issues.setFixedWidth(120)
+        self.btn_issues.setEnabled(False)
+        self.btn_issues.setToolTip("统计时被剔除或可疑的行，可导出明细")
+        self.btn_issues.clicked.connect(self.show_issues)
+        range_area.addWidget(self.btn_issues)
+        self.btn_export = QPushButton("导出")
+        self.btn_export.setFixedWidth(100)
+        self.btn_export.setEnabled(False)
+        self.btn_export.clicked.connect(self.export_report)
+        range_area.addWidget(self.btn_export)
+
+        # 按姓名筛选两棵树，查看单人时间线
+        search_area = QHBoxLayout()
+        layout.addLayout(search_area)
+        search_area.addWidget(QLabel("员工："))
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("输入姓名筛选")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.on_search_changed)
+        search_area.addWidget(self.search_edit)
+        self.btn_timeline = QPushButton("时间线")
+        self.btn_timeline.setFixedWidth(100)
+        self.btn_timeline.setEnabled(False)
+        self.btn_timeline.setToolTip("筛选到一名员工时查看其就餐/小休时间线，也可双击树中的姓名")
+        self.btn_timeline.clicked.connect(lambda: self.show_timeline())
+        search_area.addWidget(self.btn_timeline)
+
+        # QTreeView + 模型显示报告，节点展开时才生成
+        content_area = QHBoxLayout()
+        layout.addLayout(content_area)
+        self.daily_model = ReportTreeModel(self)
+        self.summary_model = ReportTreeModel(self)
+        self.daily_tree = QTreeView()
+        self.summary_tree = QTreeView()
+        for tree, model in ((self.daily_tree, self.daily_model), (self.summary_tree, self.summary_model)):
+            tree.setModel(model)
+            tree.setUniformRowHeights(True)
+            tree.header().hide()
+            content_area.addWidget(tree)
+
+        self.file_path = None
+        self.worker = None
+        self.last_result = None  # 最近一次生成的结果，导出和自动刷新时直接使用
+        self.refreshing = False  # 当前后台任务是自动刷新
+        self.reapplying = False  # 当前后台任务是改配置后的重新统计
+        self.shown_summary = None  # 汇总树当前显示的汇总（生成或历史查询），未按姓名筛选
+        self._summary_extra = []
+        self._daily = ({}, None)  # 日报树的数据 (report_dict, concurrency)，未按姓名筛选
+        self._workers = []  # 线程结束前需保留引用，包括已取消但仍在运行的
+
+        self.daily_tree.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.daily_tree.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.summary_tree.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.summary_tree.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+
+        def enable_click_expand(tree: QTreeView):
+            def on_item_clicked(index):
+                if tree.model().hasChildren(index):
+                    # 如果节点已展开，则折叠；否则展开
+                    tree.setExpanded(index, not tree.isExpanded(index))
+
+            tree.clicked.connect(on_item_clicked)
+
+        # 调用
+        enable_click_expand(self.summary_tree)
+        enable_click_expand(self.daily_tree)
+        for tree in (self.daily_tree, self.summary_tree):
+            tree.doubleClicked.connect(self.on_node_double_clicked)
+
+    def change_dialog(self):
+        dlg = ChangeDialog(self.config_manager, self)
+        dlg.settings_changed.connect(self.apply_settings)
+        dlg.exec()
+
+    def apply_settings(self):
+        """班次、列名或排班表保存后更新配置，并立即用内存中的事件表按新配置重新统计
+
+        改班次只给受影响班次的事件重新打标记；改列名只重新整理改动的字段；
+        上次因缺列生成失败时按新列名重新生成。都不需要重新选择文件。
+        """
+        from ivr_refresh import changed_fields, shift_changes
+
+        shift_dict = self.config_manager.get_shift_config()
+        column_map = self.config_manager.get_column_config()
+        roster_file = self.config_manager.get_roster_file()
+        codes = shift_changes(self.shift_dict, shift_dict)
+        fields = changed_fields(self.column_map, column_map)
+        roster_changed = roster_file != self._roster_file
+        self.shift_dict, self.column_map, self._roster_file = shift_dict, column_map, roster_file
+        self._shift_calendar = None
+        if not (codes or fields or roster_changed) or not self.file_path:
+            return
+
+        result = self.last_result
+        if self.worker is not None or (result is None and fields):
+            # 正在生成的用的是旧配置，重新生成
+            self.start_report(self.file_path)
+            return
+        if result is None or result.events is None:
+            # 报告服务的结果按服务端的配置统计
+            return
+        self.reapplying = True
+        self.label.setText("配置已更新，重新统计中...")
+        self._run_worker(ReportWorker(
+            self.file_path, self.column_map, self.shift_calendar, self.config_manager.get_time_format(),
+            None, self.history_store, self.config_manager.get_break_concurrency_limit(), self,
+            previous=result, reapply=(None if roster_changed else codes, fields)
+        ))
+
+    @property
+    def shift_calendar(self):
+        if self._shift_calendar is None:
+            self._shift_calendar = self.build_shift_calendar()
+        return self._shift_calendar
+
+    @property
+    def parsed_cache(self):
+        if self._parsed_cache is None:
+            from ivr_cache import ParsedCache
+            self._parsed_cache = ParsedCache(
+                self.config_manager.get_config_dir(), self.config_manager.get_cache_max_mb()
+            )
+        return self._parsed_cache
+
+    @property
+    def history_store(self):
+        if self._history_store is None:
+            from ivr_store import HistoryStore
+            self._history_store = HistoryStore.in_dir(self.config_manager.get_config_dir())
+        return self._history_store
+
+    def warm_up(self):
+        """窗口显示后调用：后台导入重模块，和生成报告的线程一样在关闭窗口时等待结束"""
+        worker = WarmupWorker(self)
+        worker.finished.connect(lambda w=worker: self._release_worker(w))
+        self._workers.append(worker)
+        worker.start()
+
+    def build_shift_calendar(self):
+        """根据班次配置和可选的排班表构建班次日历（每次配置变更只构建一次）"""
+        from ivr_engine import load_roster, ShiftCalendar
+
+        roster = None
+        roster_file = self.config_manager.get_roster_file()
+        if roster_file:
+            try:
+                roster = load_roster(roster_file, self.column_map)
+            except Exception as e:
+                QMessageBox.warning(self, "排班表读取失败", str(e))
+        return ShiftCalendar(self.shift_dict, roster)
+
+    def select_file(self):
+        """选择一个或多个 Excel 文件，符合列映射的 sheet 合并后在后台生成日报"""
+        from ivr_loader import list_sources, INPUT_PATTERNS
+
+        files, _ = QFileDialog.getOpenFileNames(
+            self, "选择导出文件（可多选）", "", f"导出文件 ({' '.join(INPUT_PATTERNS)});;Excel Files (*.xlsx *.xls)"
+        )
+        if not files:
+            return
+
+        try:
+            sources = list_sources(files, self.column_map)
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"读取工作表失败:\n{e}")
+            return
+        if len(sources) > 1:
+            dialog = SheetDialog(sources, self)
+            if dialog.exec() != QDialog.DialogCode.Accepted:
+                return
+            sources = dialog.selected()
+            if not sources:
+                return
+
+        self.file_path = sources
+        self.start_report(sources)
+
+    def start_report(self, file_name):
+        """启动后台生成；上一次还在运行时先取消它。file_name 为文件路径或 [(文件, sheet), ...]"""
+        self._discard_worker()
+        self.refresh_timer.stop()
+        self.refreshing = False
+        self.reapplying = False
+        self.daily_model.clear()
+        self.summary_model.clear()
+        self.last_result = None
+        self.btn_export.setEnabled(False)
+        self.btn_heatmap.setEnabled(False)
+        self.btn_issues.setEnabled(False)
+        self.btn_issues.setText("数据问题")
+        self.label.setText("生成中，请稍候...")
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.btn_cancel.show()
+
+        # 首次生成走完整路径（缓存、进度与取消、并行读取和统计），增量路径只用于文件变化后的刷新
+        self._run_worker(ReportWorker(
+            file_name, self.column_map, self.shift_calendar, self.config_manager.get_time_format(),
+            self.parsed_cache, self.history_store, self.config_manager.get_break_concurrency_limit(), self,
+            server_url=self.config_manager.get_server_url()
+        ))
+
+    def _run_worker(self, worker):
+        worker.progress.connect(self.on_report_progress)
+        worker.succeeded.connect(self.on_report_succeeded)
+        worker.failed.connect(self.on_report_failed)
+        worker.cancelled.connect(self.on_report_cancelled)
+        worker.finished.connect(lambda w=worker: self._release_worker(w))
+        self._workers.append(worker)
+        self.worker = worker
+        worker.start()
+
+    def cancel_report(self):
+        if self.worker is not None:
+            self._discard_worker()
+            self.on_report_cancelled()
+
+    def _discard_worker(self):
+        """断开当前线程的结果信号并请求中断，线程结束后由 _release_worker 释放"""
+        worker = self.worker
+        if worker is None:
+            return
+        self.worker = None
+        for signal in (worker.progress, worker.succeeded, worker.failed, worker.cancelled):
+            signal.disconnect()
+        worker.requestInterruption()
+
+    def _release_worker(self, worker):
+        if worker in self._workers:
+            self._workers.remove(worker)
+        worker.deleteLater()
+
+    def _finish_report(self, text):
+        self.progress_bar.hide()
+        self.btn_cancel.hide()
+        self.label.setText(text)
+        self.worker = None
+        self.refreshing = False
+        self.reapplying = False
+
+    def on_report_progress(self, stage, percent):
+        self.progress_bar.setValue(percent)
+        self.label.setText(f"{STAGE_TEXT.get(stage, stage)}，请稍候...")
+
+    def toggle_details(self, checked):
+        self.btn_details.setArrowType(Qt.ArrowType.DownArrow if checked else Qt.ArrowType.RightArrow)
+        self.status_panel.setVisible(checked)
+
+    def _show_timings(self, file_name, timer, memory=None, validation=None):
+        names = "、".join(os.path.basename(f) for f in file_name.split("; "))
+        lines = [names] + timer.lines(TIMING_TEXT) + memory_lines(memory, TIMING_TEXT)
+        if validation is not None:
+            lines += validation.lines()
+        self.status_panel.setPlainText("\n".join(lines))
+
+    def on_report_succeeded(self, result):
+        self.on_report_progress("render", 90)
+        timer = result.timings or StageTimer()
+        partial = (self.refreshing or self.reapplying) and result.changed_days is not None
+        self.last_result = result
+        try:
+            with timer.stage("tree"):
+                if partial:
+                    self._update_content(result)
+                else:
+                    self._report_content(result.report_dict, result.summary, result.concurrency)
+        except Exception as e:
+            log_timings(result.file_name, timer, "failed")
+            logger.exception("render failed: %s", result.file_name)
+            self._finish_report(f"生成失败：{str(e)}")
+            return
+        log_timings(result.file_name, timer)
+        log_memory(result.file_name, result.memory)
+        validation = result.validation
+        if validation:
+            logger.info("validation %s total=%d dropped=%d %s", result.file_name, validation.total,
+                        validation.dropped, {k: v for k, v in validation.counts.items() if v})
+        self._show_timings(result.file_name, timer, result.memory, validation)
+        self.btn_export.setEnabled(True)
+        self.btn_heatmap.setEnabled(result.flagged is not None)
+        self.btn_issues.setEnabled(bool(validation))
+        self.btn_issues.setText(f"数据问题 ({validation.issues})" if validation else "数据问题")
+        self.on_search_changed(self.search_edit.text(), refresh=False)
+        self._watch_sources()
+        if self.reapplying:
+            days = f"，{len(result.changed_days)} 天有变化" if partial else ""
+            self._finish_report(f"已按新配置重新统计{days}")
+        elif partial:
+            self._finish_report(f"已自动刷新（{len(result.changed_days)} 天有变化）")
+        elif validation and validation.dropped:
+            self._finish_report(f"生成成功（剔除 {validation.dropped} 行，详见“数据问题”）")
+        elif result.unparsed:
+            self._finish_report(f"生成成功（{result.unparsed} 个时间无法解析）")
+        else:
+            self._finish_report("生成成功")
+
+    def on_report_failed(self, message):
+        if self.refreshing:
+            # 文件可能还在写入，之后的写入会再次触发刷新，不弹窗打断
+            self._finish_report(f"自动刷新失败：{message}")
+            return
+        self._finish_report(f"生成失败：{message}")
+        QMessageBox.critical(self, "错误", f"生成日报失败:\n{message}")
+
+    def on_report_cancelled(self):
+        self._finish_report("已取消")
+
+    def closeEvent(self, event):
+        # 关闭窗口前等后台线程退出，避免线程对象先于线程销毁
+        self._discard_worker()
+        for worker in list(self._workers):
+            worker.requestInterruption()
+            worker.wait()
+        super().closeEvent(event)
+
+    def _report_content(self, report_dict, summary=None, concurrency=None):
+        """根据统计结果设置两棵树的模型（在 GUI 线程调用），子节点展开时才生成"""
+        self._daily = (report_dict, concurrency)
+        self._show_daily()
+        self._summary_content(report_dict, summary, concurrency)
+
+    def _update_content(self, result):
+        """增量刷新：日报树只替换有变化的日期，汇总按新数据重建"""
+        report_dict = result.report_dict
+        self._daily = (report_dict, result.concurrency)
+        if self._matched_names() is not None:
+            self._show_daily()
+        else:
+            present = {d: report_dict[d] for d in result.changed_days if d in report_dict}
+            removed = [d.strftime("%Y-%m-%d") for d in result.changed_days if d not in report_dict]
+            self.daily_model.replace_nodes(daily_nodes(present, result.concurrency), removed)
+        self._summary_content(report_dict, result.summary, result.concurrency)
+
+    def _summary_content(self, report_dict, summary=None, concurrency=None):
+        if summary is None:
+            from ivr_engine import summarize_report
+            summary = summarize_report(report_dict)
+        extra = []
+        if concurrency:
+            from ivr_concurrency import summarize_concurrency
+            extra = concurrency_summary_nodes(summarize_concurrency(concurrency))
+        self._show_summary(summary, extra)
+        if summary:
+            self._set_range(summary["start"], summary["end"])
+
+    def _set_range(self, start, end):
+        """程序设置日期范围，不触发范围汇总"""
+        for edit, day in ((self.date_start, start), (self.date_end, end)):
+            edit.blockSignals(True)
+            edit.setDate(QDate(day.year, day.month, day.day))
+            edit.blockSignals(False)
+
+    def _show_daily(self):
+        report_dict, concurrency = self._daily
+        names = self._matched_names()
+        if names is not None:
+            report_dict = self.last_result.names.filter_report(report_dict, names)
+        self.daily_model.set_nodes(daily_nodes(report_dict, concurrency))
+        self.daily_tree.expandToDepth(0)
+
+    def _show_summary(self, summary, extra_nodes=()):
+        self.shown_summary = summary
+        self._summary_extra = list(extra_nodes)
+        names = self._matched_names()
+        if names is not None and summary:
+            keep = set(names)
+            summary = {k: v if k in ("start", "end") else {n: c for n, c in v.items() if n in keep}
+                       for k, v in summary.items()}
+        self.summary_model.set_nodes(summary_nodes(summary) + self._summary_extra)
+        self.summary_tree.expandToDepth(0)
+
+    # 按姓名筛选
+    def _matched_names(self):
+        """搜索框中的文字匹配到的姓名（查姓名索引）；没有输入或还没有结果时返回 None"""
+        text = self.search_edit.text().strip()
+        result = self.last_result
+        if not text or result is None or result.names is None:
+            return None
+        return result.names.search(text)
+
+    def _timeline_name(self):
+        """搜索框对应的唯一员工：完全同名优先，否则要求只匹配到一人"""
+        result = self.last_result
+        if result is None or result.names is None or not self.search_edit.text().strip():
+            return None
+        name = result.names.exact(self.search_edit.text())
+        if name is None:
+            names = result.names.search(self.search_edit.text())
+            name = names[0] if len(names) == 1 else None
+        return name
+
+    def on_search_changed(self, text, refresh=True):
+        """每次输入都按索引重建两棵树的节点，节点仍在展开时才生成"""
+        if refresh and self.last_result is not None:
+            self._show_daily()
+            self._show_summary(self.shown_summary, self._summary_extra)
+        self.btn_timeline.setEnabled(self._timeline_name() is not None)
+
+    def on_node_double_clicked(self, index):
+        """双击 "姓名：..." 节点查看该员工的时间线"""
+        result = self.last_result
+        text = index.model().node(index).text
+        name = text.split("：", 1)[0]
+        if result is not None and result.names is not None and name in result.names.rows:
+            self.show_timeline(name)
+
+    def show_timeline(self, name=None):
+        from ivr_timeline import TimelineDialog
+
+        name = self._timeline_name() if name is None else name
+        if name is None:
+            return
+        days = self.last_result.names.timeline(name, self.last_result.report_dict)
+        TimelineDialog(name, days, self).exec()
+
+    # 自动刷新
+    def _source_files(self) -> list:
+        if not self.file_path:
+            return []
+        if isinstance(self.file_path, str):
+            return [self.file_path]
+        return list(dict.fromkeys(file_name for file_name, _ in self.file_path))
+
+    def _watch_sources(self):
+        """自动刷新打开时监视当前文件，关闭时全部移除"""
+        if self.watcher.files():
+            self.watcher.removePaths(self.watcher.files())
+        files = [f for f in self._source_files() if os.path.exists(f)]
+        if self.chk_refresh.isChecked() and files:
+            self.watcher.addPaths(files)
+
+    def toggle_auto_refresh(self, checked):
+        self.config_manager.update_auto_refresh(checked)
+        if not checked:
+            self.refresh_timer.stop()
+        self._watch_sources()
+
+    def on_file_changed(self, path):
+        # 整个文件被替换时监视会失效，重新加上
+        if os.path.exists(path) and path not in self.watcher.files():
+            self.watcher.addPath(path)
+        self.refresh_timer.start()
+
+    def refresh_report(self):
+        """文件变化稳定后在后台增量刷新；正在生成时稍后再试"""
+        if not self.chk_refresh.isChecked() or self.last_result is None:
+            return
+        if self.worker is not None:
+            self.refresh_timer.start()
+            return
+        if not all(os.path.exists(f) for f in self._source_files()):
+            return
+        self.refreshing = True
+        self.label.setText("文件已更新，刷新中...")
+        self._run_worker(ReportWorker(
+            self.file_path, self.column_map, self.shift_calendar, self.config_manager.get_time_format(),
+            None, self.history_store, self.config_manager.get_break_concurrency_limit(), self,
+            previous=self.last_result, incremental=True, server_url=self.config_manager.get_server_url()
+        ))
+
+    def on_range_changed(self):
+        """日期范围改变时用最近一次结果的数据立方直接汇总，不重新读取和统计"""
+        result = self.last_result
+        if result is None or result.cube is None or not len(result.cube):
+            return
+        start = self.date_start.date().toPyDate()
+        end = self.date_end.date().toPyDate()
+        summary = result.cube.summarize(start, end)
+        extra = []
+        if result.concurrency and summary:
+            from ivr_concurrency import summarize_concurrency
+            days = {d: v for d, v in result.concurrency.items() if summary["start"] <= d <= summary["end"]}
+            extra = concurrency_summary_nodes(summarize_concurrency(days))
+        self._show_summary(summary, extra)
+        if not summary:
+            self.label.setText(f"当前文件中没有 {start} ~ {end} 的数据，可点击“历史汇总”查询历史库")
+        else:
+            self.label.setText(f"汇总范围 {summary['start']:%Y-%m-%d} ~ {summary['end']:%Y-%m-%d}")
+
+    def show_heatmap(self):
+        """最近一次结果中汇总范围内的事件按时段分箱，班次按班次配置的顺序排列"""
+        import pandas as pd
+        from ivr_heatmap_view import HeatmapDialog
+
+        result = self.last_result
+        if result is None or result.flagged is None:
+            return
+        start = pd.Timestamp(self.date_start.date().toPyDate())
+        end = pd.Timestamp(self.date_end.date().toPyDate())
+        days = result.flagged["日期"]
+        flagged = result.flagged[(days >= start) & (days <= end)]
+        title = f"{start:%Y-%m-%d} ~ {end:%Y-%m-%d}"
+        HeatmapDialog(flagged, list(self.shift_dict), title, self).exec()
+
+    def show_issues(self):
+        """数据检查的摘要，可把问题行导出成 CSV"""
+        result = self.last_result
+        if result is None or not result.validation:
+            return
+        buttons = QMessageBox.StandardButton.Close
+        if result.validation.rows is not None:
+            buttons |= QMessageBox.StandardButton.Save
+        box = QMessageBox(QMessageBox.Icon.Information, "数据问题", "\n".join(result.validation.lines()), buttons, self)
+        if result.validation.rows is None:
+            box.setInformativeText("报告来自报告服务，问题行明细请在服务器上导出")
+        else:
+            box.button(QMessageBox.StandardButton.Save).setText("导出问题行")
+        if box.exec() != QMessageBox.StandardButton.Save:
+            return
+        stem = os.path.splitext(os.path.basename(result.file_name.split("; ")[0]))[0]
+        path, _ = QFileDialog.getSaveFileName(self, "导出问题行", f"{stem}_问题行.csv", "CSV (*.csv)")
+        if not path:
+            return
+        from ivr_validate import write_issue_csv
+
+        try:
+            write_issue_csv(path, result.validation)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"导出失败:\n{e}")
+            return
+        self.label.setText(f"已导出 {len(result.validation.rows)} 行：{path}")
+
+    def show_history_summary(self):
+        """从历史库查询所选日期范围的汇总，不需要重新读取文件"""
+        start = self.date_start.date().toString("yyyy-MM-dd")
+        end = self.date_end.date().toString("yyyy-MM-dd")
+        summary = self.history_store.summarize(start, end)
+        self._show_summary(summary)
+        if not summary:
+            self.label.setText(f"历史库中没有 {start} ~ {end} 的数据")
+
+    def export_report(self):
+        """导出最近一次的日报、汇总树当前显示的汇总和违规明细"""
+        if self.last_result is None:
+            return
+        stem = os.path.splitext(os.path.basename(self.last_result.file_name.split("; ")[0]))[0]
+        path, selected = QFileDialog.getSaveFileName(
+            self, "导出报告", f"{stem}_日报.xlsx", ";;".join(EXPORT_FILTERS)
+        )
+        if not path:
+            return
+        fmt = EXPORT_FILTERS.get(selected, "xlsx")
+        base, ext = os.path.splitext(path)
+        if ext.lower().lstrip(".") != fmt:
+            base = path
+
+        self.btn_export.setEnabled(False)
+        self.label.setText("导出中，请稍候...")
+        worker = ExportWorker(base, fmt, self.last_result, self.shown_summary, self)
+        worker.succeeded.connect(self.on_export_succeeded)
+        worker.failed.connect(self.on_export_failed)
+        worker.finished.connect(lambda w=worker: self._release_worker(w))
+        self._workers.append(worker)
+        worker.start()
+
+    def on_export_succeeded(self, written):
+        self.btn_export.setEnabled(self.last_result is not None)
+        self.label.setText("已导出：" + "、".join(os.path.basename(p) for p in written))
+
+    def on_export_failed(self, message):
+        self.btn_export.setEnabled(self.last_result is not None)
+        self.label.setText(f"导出失败：{message}")
+        QMessageBox.critical(self, "错误", f"导出失败:\n{message}")
+
+
+def run_gui(argv=None):
+    app = QApplication(argv if argv is not None else sys.argv)
+    app.setStyleSheet(STYLESHEET)
+    window = DailyReportApp()
+    window.show()
+
+    probe = os.environ.get(STARTUP_PROBE_ENV)
+    if probe:
+        QTimer.singleShot(0, lambda: _write_startup_probe(probe, app))
+    else:
+        QTimer.singleShot(0, window.warm_up)
+    return app.exec()
+
+
+def _write_startup_probe(path, app):
+    """记录窗口显示的时刻和此时 pandas 是否已被导入，然后退出"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"shown": time.time(), "pandas_loaded": "pandas" in sys.modules}, f)
+    app.quit()
@@ -0,0 +1,104 @@
+# 就餐/小休时段热力图：按 (班次, 日期) × 时段累计分钟数，整列运算分箱，不依赖 Qt
+
+import csv
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+SLOT_CHOICES = (5, 15, 30)
+HEATMAP_STATUSES = ("小休", "就餐")
+
+
+@dataclass
+class Heatmap:
+    """values[r, k] 为第 r 行（一个班次的一天）在第 k 个时段内处于所选状态的总分钟数
+
+    时段 k 覆盖当天零点后 [origin + k * slot, origin + (k + 1) * slot) 分钟，
+    跨零点班次零点之后的时段大于 24 小时。
+    """
+    slot: int
+    origin: int
+    rows: list  # [(班次, 日期)]，按班次分组、组内按日期排列
+    values: np.ndarray = field(repr=False)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def slot_labels(self) -> list:
+        labels = []
+        for k in range(self.values.shape[1]):
+            minutes = self.origin + k * self.slot
+            text = f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+            labels.append(f"次日{text}" if minutes >= 24 * 60 else text)
+        return labels
+
+    def shifts(self) -> list:
+        return list(dict.fromkeys(shift for shift, _ in self.rows))
+
+    def shift_mean(self, shift) -> np.ndarray:
+        """该班次各时段的日均分钟数"""
+        picked = [r for r, (code, _) in enumerate(self.rows) if code == shift]
+        return self.values[picked].mean(axis=0)
+
+
+def break_heatmap(flagged: pd.DataFrame, slot: int = 15, statuses=HEATMAP_STATUSES,
+                  shift_order=None) -> Heatmap:
+    """flagged 为 flag_events 的结果；统计 statuses 中的事件在每个时段内的总分钟数
+
+    每条事件对时段的贡献为两者重叠的分钟数。记 F(t) 为 t 之前累计的分钟数：
+    F(b) = Σ_{s<b} (b - s) - Σ_{e<b} (b - e)，开始/结束时刻按时段分箱后用
+    bincount 得到各时段的个数与时刻之和，沿时段做前缀和即得每个边界上的 F，
+    相邻边界相减就是各时段的分钟数，不逐条遍历事件。
+    shift_order 为班次的显示顺序（如 shift_config 的顺序），不在其中的排在后面。
+    """
+    events = flagged[flagged["状态"].isin(list(statuses))]
+    days = events["日期"].dt.normalize()
+    start = ((events["开始时间"] - days) / pd.Timedelta(minutes=1)).to_numpy(dtype=float)
+    end = ((events["结束时间"] - days) / pd.Timedelta(minutes=1)).to_numpy(dtype=float)
+    ok = np.isfinite(start) & np.isfinite(end) & (end > start)
+    start, end = start[ok], end[ok]
+    if not len(start):
+        return Heatmap(slot, 0, [], np.zeros((0, 24 * 60 // slot)))
+
+    # 行：班次按 shift_order，组内日期升序
+    shift_codes, shift_values = pd.factorize(events["班次"].to_numpy()[ok])
+    present = set(shift_values)
+    order = [code for code in (shift_order or []) if code in present]
+    order += sorted(present - set(order), key=str)
+    shift_rank = pd.Index(order).get_indexer(shift_values)[shift_codes]
+    day_codes, day_values = pd.factorize(days.to_numpy()[ok], sort=True)
+    keys, row = np.unique(shift_rank * len(day_values) + day_codes, return_inverse=True)
+    rows = [(order[key // len(day_values)], pd.Timestamp(day_values[key % len(day_values)])) for key in keys]
+
+    origin = int(np.floor(start.min() / slot)) * slot
+    n_slots = max(int(np.ceil((end.max() - origin) / slot)), 1)
+    width = n_slots + 1
+    bounds = origin + slot * np.arange(width)
+
+    def before(times):
+        """每行在每个边界之前的 (个数, 时刻之和)"""
+        k = np.clip(np.floor((times - origin) / slot).astype(np.int64) + 1, 0, n_slots)
+        flat = row * width + k
+        count = np.bincount(flat, minlength=len(rows) * width).reshape(len(rows), width)
+        total = np.bincount(flat, weights=times, minlength=len(rows) * width).reshape(len(rows), width)
+        return np.cumsum(count, axis=1), np.cumsum(total, axis=1)
+
+    started, start_sum = before(start)
+    ended, end_sum = before(end)
+    covered = (started * bounds - start_sum) - (ended * bounds - end_sum)
+    values = np.clip(np.diff(covered, axis=1), 0, None).round(2)
+    return Heatmap(slot, origin, rows, values)
+
+
+def write_heatmap_csv(path: str, heatmap: Heatmap) -> list:
+    """每行一个班次的一天，每个时段一列（分钟数）；每个班次后附一行日均"""
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["班次", "日期"] + heatmap.slot_labels())
+        for shift in heatmap.shifts():
+            for (code, day), values in zip(heatmap.rows, heatmap.values):
+                if code == shift:
+                    writer.writerow([code, day.strftime("%Y-%m-%d")] + values.tolist())
+            writer.writerow([shift, "日均"] + heatmap.shift_mean(shift).round(2).tolist())
+    return [path]
@@ -0,0 +1,185 @@
+# 时段热力图窗口：每行一个班次的一天（每个班次先列一行日均），颜色越深该时段就餐/小休的分钟数越多
+
+import numpy as np
+from PyQt6.QtCore import QEvent, QRectF, Qt
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen
+from PyQt6.QtWidgets import (QComboBox, QDialog, QFileDialog, QHBoxLayout, QLabel, QMessageBox, QPushButton,
+                             QScrollArea, QToolTip, QVBoxLayout, QWidget)
+
+from ivr_heatmap import break_heatmap, write_heatmap_csv, SLOT_CHOICES
+
+CELL_WIDTH = {5: 4, 15: 10, 30: 18}
+ROW_HEIGHT = 16
+AXIS_HEIGHT = 20
+LABEL_WIDTH = 110
+MARGIN = 12
+# 色阶：白 -> 橙 -> 深红
+COLOR_STOPS = ((0.0, (255, 255, 255)), (0.5, (253, 174, 97)), (1.0, (165, 0, 38)))
+STATUS_CHOICES = {"就餐 + 小休": ("小休", "就餐"), "小休": ("小休",), "就餐": ("就餐",)}
+
+
+def _palette() -> np.ndarray:
+    """256 级色表，值为 0xFFRRGGBB"""
+    positions = np.linspace(0, 1, 256)
+    stops = [p for p, _ in COLOR_STOPS]
+    channels = [np.interp(positions, stops, [c[i] for _, c in COLOR_STOPS]).astype(np.uint32) for i in range(3)]
+    return 0xFF000000 | (channels[0] << 16) | (channels[1] << 8) | channels[2]
+
+
+PALETTE = _palette()
+
+
+class HeatmapWidget(QWidget):
+    """整张热力图先按单元格映射成一张 QImage（一个像素一个单元格），绘制时整体放大，不逐格填充"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.heatmap = None
+        self.lines = []  # [(标签, 数值行, 是否日均)]
+        self.image = None
+
+    def set_heatmap(self, heatmap):
+        self.heatmap = heatmap
+        self.lines = []
+        for shift in heatmap.shifts():
+            self.lines.append((f"{shift}班 日均", heatmap.shift_mean(shift), True))
+            self.lines += [(f"{shift}班 {day:%m-%d}", values, False)
+                           for (code, day), values in zip(heatmap.rows, heatmap.values) if code == shift]
+
+        if self.lines:
+            grid = np.vstack([values for _, values, _ in self.lines])
+            top = grid.max() or 1.0
+            self._pixels = np.ascontiguousarray(PALETTE[np.round(grid / top * 255).astype(np.intp)])
+            height, width = self._pixels.shape
+            self.image = QImage(self._pixels.data, width, height, width * 4, QImage.Format.Format_RGB32)
+        else:
+            self.image = None
+        slots = heatmap.values.shape[1]
+        self.setFixedSize(LABEL_WIDTH + slots * self.cell_width + MARGIN,
+                          AXIS_HEIGHT + len(self.lines) * ROW_HEIGHT + MARGIN)
+        self.update()
+
+    @property
+    def cell_width(self) -> int:
+        return CELL_WIDTH.get(self.heatmap.slot, 10) if self.heatmap is not None else 10
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("white"))
+        if self.heatmap is None or self.image is None:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "所选范围内没有就餐/小休记录")
+            painter.end()
+            return
+
+        width = self.heatmap.values.shape[1] * self.cell_width
+        painter.drawImage(QRectF(LABEL_WIDTH, AXIS_HEIGHT, width, len(self.lines) * ROW_HEIGHT), self.image)
+
+        # 横轴：整点刻度
+        per_hour = 60 // self.heatmap.slot
+        first = -(-self.heatmap.origin // 60) * 60
+        painter.setPen(QPen(QColor("#999999")))
+        for minutes in range(first, self.heatmap.origin + self.heatmap.values.shape[1] * self.heatmap.slot, 60):
+            x = LABEL_WIDTH + (minutes - self.heatmap.origin) / self.heatmap.slot * self.cell_width
+            painter.drawLine(int(x), AXIS_HEIGHT - 4, int(x), AXIS_HEIGHT)
+            if per_hour * self.cell_width >= 24 or minutes % 120 == 0:
+                painter.drawText(QRectF(x - 20, 0, 40, AXIS_HEIGHT - 4), Qt.AlignmentFlag.AlignCenter,
+                                 f"{minutes // 60 % 24:02d}")
+
+        for row, (label, _, mean) in enumerate(self.lines):
+            top = AXIS_HEIGHT + row * ROW_HEIGHT
+            font = painter.font()
+            font.setBold(mean)
+            painter.setFont(font)
+            painter.setPen(QPen(QColor("#333333")))
+            painter.drawText(QRectF(4, top, LABEL_WIDTH - 8, ROW_HEIGHT),
+                             Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, label)
+            if mean and row:
+                painter.setPen(QPen(QColor("#666666")))
+                painter.drawLine(0, top, LABEL_WIDTH + width, top)
+        painter.end()
+
+    def event(self, event):
+        if event.type() == QEvent.Type.ToolTip and self.image is not None:
+            pos = event.position() if hasattr(event, "position") else event.pos()
+            row = int((pos.y() - AXIS_HEIGHT) // ROW_HEIGHT)
+            slot = int((pos.x() - LABEL_WIDTH) // self.cell_width)
+            if 0 <= row < len(self.lines) and 0 <= slot < self.heatmap.values.shape[1]:
+                label, values, _ = self.lines[row]
+                begin, end = self.heatmap.slot_labels()[slot], self._clock(slot + 1)
+                QToolTip.showText(event.globalPos(), f"{label} {begin}~{end}：{values[slot]:.1f} 分钟", self)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().event(event)
+
+    def _clock(self, slot: int) -> str:
+        minutes = self.heatmap.origin + slot * self.heatmap.slot
+        return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+
+
+class HeatmapDialog(QDialog):
+    """flagged 为 flag_events 的结果（已按日期范围筛选）；切换状态或时段粒度时重新分箱"""
+
+    def __init__(self, flagged, shift_order=None, title: str = "", parent=None):
+        super().__init__(parent)
+        self.flagged = flagged
+        self.shift_order = shift_order
+        self.setWindowTitle(f"就餐/小休时段热力图 {title}".strip())
+        self.resize(1000, 640)
+        vbox = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        vbox.addLayout(controls)
+        controls.addWidget(QLabel("状态："))
+        self.status_box = QComboBox()
+        self.status_box.addItems(list(STATUS_CHOICES))
+        controls.addWidget(self.status_box)
+        controls.addWidget(QLabel("时段："))
+        self.slot_box = QComboBox()
+        for slot in SLOT_CHOICES:
+            self.slot_box.addItem(f"{slot} 分钟", slot)
+        self.slot_box.setCurrentIndex(SLOT_CHOICES.index(15))
+        controls.addWidget(self.slot_box)
+        controls.addStretch()
+        self.btn_image = QPushButton("导出图片")
+        self.btn_image.clicked.connect(self.export_image)
+        controls.addWidget(self.btn_image)
+        self.btn_csv = QPushButton("导出 CSV")
+        self.btn_csv.clicked.connect(self.export_csv)
+        controls.addWidget(self.btn_csv)
+
+        self.view = HeatmapWidget()
+        scroll = QScrollArea()
+        scroll.setWidget(self.view)
+        vbox.addWidget(scroll)
+        self.hint = QLabel()
+        vbox.addWidget(self.hint)
+
+        self.status_box.currentIndexChanged.connect(self.refresh)
+        self.slot_box.currentIndexChanged.connect(self.refresh)
+        self.refresh()
+
+    def refresh(self):
+        self.heatmap = break_heatmap(self.flagged, self.slot_box.currentData(),
+                                     STATUS_CHOICES[self.status_box.currentText()], self.shift_order)
+        self.view.set_heatmap(self.heatmap)
+        days = len({day for _, day in self.heatmap.rows})
+        self.hint.setText(f"{days} 天，{len(self.heatmap.shifts())} 个班次；数值为该时段内所有人处于"
+                          f"{self.status_box.currentText()}的分钟数之和，颜色按最大值归一")
+        has_data = len(self.heatmap) > 0
+        self.btn_image.setEnabled(has_data)
+        self.btn_csv.setEnabled(has_data)
+
+    def export_image(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出图片", "热力图.png", "PNG 图片 (*.png)")
+        if path and not self.view.grab().save(path):
+            QMessageBox.critical(self, "错误", f"保存图片失败:\n{path}")
+
+    def export_csv(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出 CSV", "热力图.csv", "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            write_heatmap_csv(path, self.heatmap)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"导出失败:\n{e}")
@@ -0,0 +1,97 @@
+# 姓名索引：每次生成后建立一次，姓名 -> 在 flag_events 结果中的行号，搜索和单人时间线都只查索引，不依赖 Qt
+
+import numpy as np
+import pandas as pd
+
+from ivr_engine import BREAK_SUM_LIMIT, MEAL_LIMIT, REPORT_KEYS
+
+
+def _hours(times: pd.Series, day: pd.Timestamp) -> np.ndarray:
+    """相对当天零点的小时数，跨零点班次零点之后的时刻大于 24"""
+    return ((times - day) / pd.Timedelta(hours=1)).to_numpy(dtype=float)
+
+
+class NameIndex:
+    """flagged 为 flag_events 的结果；姓名按首次出现的顺序排列"""
+
+    def __init__(self, flagged: pd.DataFrame):
+        self.flagged = flagged
+        self.rows = flagged.groupby("姓名", observed=True, sort=False).indices
+        self.names = list(self.rows)
+        self._keys = [str(name).casefold() for name in self.names]
+        self._days = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, text: str) -> list:
+        """姓名包含 text（不区分大小写）的员工；text 为空时返回全部"""
+        text = text.strip().casefold()
+        if not text:
+            return list(self.names)
+        return [name for name, key in zip(self.names, self._keys) if text in key]
+
+    def exact(self, text: str):
+        """与 text 完全相同的姓名，没有返回 None"""
+        text = text.strip().casefold()
+        return next((name for name, key in zip(self.names, self._keys) if key == text), None)
+
+    def days(self, name) -> list:
+        """该员工有记录的日期（升序）"""
+        if name not in self._days:
+            dates = self.flagged["日期"].to_numpy()[self.rows[name]]
+            self._days[name] = list(pd.DatetimeIndex(pd.unique(dates)).sort_values())
+        return self._days[name]
+
+    def events(self, name) -> pd.DataFrame:
+        """该员工的全部有效事件，按开始时间排序"""
+        return self.flagged.iloc[self.rows[name]].sort_values("开始时间", kind="stable")
+
+    def filter_report(self, report_dict: dict, names: list) -> dict:
+        """只保留 names 的日报：这些人有记录的日期，每天每项规则只留这些人"""
+        by_day = {}
+        for name in names:
+            for day in self.days(name):
+                by_day.setdefault(day, []).append(name)
+        filtered = {}
+        for day in sorted(by_day):
+            rules = report_dict.get(day)
+            if rules is None:
+                continue
+            filtered[day] = {
+                key: {name: rules[key][name] for name in by_day[day] if name in rules[key]}
+                for key in REPORT_KEYS
+            }
+        return filtered
+
+    def timeline(self, name, report_dict: dict | None = None) -> list:
+        """单人时间线，每天一项：{"day", "shift", "shift_span": (开始, 结束), "events": [...], "meal", "break_sum"}
+
+        时刻均为相对当天零点的小时数；events 中每项为 (开始, 结束, 状态, 是否违规, 持续分钟)，
+        单次小休超时、首尾半小时小休，以及当天用餐/小休总时长超时的事件算违规。
+        """
+        report_dict = report_dict or {}
+        events = self.events(name)
+        days = []
+        for day, group in events.groupby("日期", sort=True):
+            day = pd.Timestamp(day)
+            rules = report_dict.get(day, {})
+            meal = rules.get("meal", {}).get(name)
+            break_sum = rules.get("break_sum", {}).get(name)
+            warn = (group["once"] | group["edge"]).to_numpy(copy=True)
+            if meal is not None and meal > MEAL_LIMIT:
+                warn |= group["meal"].to_numpy()
+            if break_sum is not None and break_sum > BREAK_SUM_LIMIT:
+                warn |= group["break"].to_numpy()
+            starts, ends = _hours(group["开始时间"], day), _hours(group["结束时间"], day)
+            days.append({
+                "day": day,
+                "shift": str(group["班次"].iloc[0]),
+                "shift_span": (float(_hours(group["班次开始"].iloc[:1], day)[0]),
+                               float(_hours(group["班次结束"].iloc[:1], day)[0])),
+                "events": list(zip(starts.tolist(), ends.tolist(), group["状态"].astype(str).tolist(),
+                                   warn.tolist(), group["持续时长min"].astype(float).round(2).tolist())),
+                "meal": meal,
+                "break_sum": break_sum,
+            })
+        return days
@@ -0,0 +1,263 @@
+# 读取导出文件并按列映射配置改名，不依赖 Qt
+# 按扩展名选择读取引擎：xlsx（小文件且有 python-calamine 时用它，否则 openpyxl 流式）、xls、csv、parquet
+
+import importlib.util
+import operator
+import os
+
+import pandas as pd
+
+from ivr_metrics import logger
+
+# 列映射里不对应表格列的配置项
+META_FIELDS = ("表名",)
+# 统计必需的字段，列映射里没写的按同名列处理
+REQUIRED_FIELDS = ["日期", "姓名", "班次", "状态", "开始时间", "结束时间", "持续时长min"]
+CHUNK_ROWS = 50000
+
+HAS_CALAMINE = importlib.util.find_spec("python_calamine") is not None
+# calamine 把整张表（所有列）读成 Python 对象再选列，峰值内存约为文件大小的 10 倍；
+# 超过这个大小的 xlsx 用 openpyxl 流式读取，内存只与块大小有关
+CALAMINE_MAX_BYTES = 16 * 1024 * 1024
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+# 电话系统导出的 CSV 可能是 UTF-8（带 BOM）或 GBK
+CSV_ENCODINGS = ("utf-8-sig", "gb18030")
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+
+
+class ColumnMappingError(ValueError):
+    """列映射里的列名在表头中找不到"""
+
+
+def mapped_columns(column_map: dict) -> dict:
+    """字段名 -> Excel 列名，去掉非列配置项并补齐必需字段"""
+    columns = {f: column_map.get(f, f) for f in REQUIRED_FIELDS}
+    for field, excel_name in column_map.items():
+        if field not in META_FIELDS and field not in columns:
+            columns[field] = excel_name
+    return columns
+
+
+def resolve_columns(header, column_map: dict) -> dict:
+    """在表头中定位每个字段，返回 字段名 -> 列序号；缺列时报出全部缺失项"""
+    names = [str(h).strip() if h is not None else "" for h in header]
+    positions, missing = {}, []
+    for field, excel_name in mapped_columns(column_map).items():
+        if excel_name in names:
+            positions[field] = names.index(excel_name)
+        else:
+            missing.append(f"{field}（{excel_name}）")
+    if missing:
+        raise ColumnMappingError(
+            f"表格中找不到列：{'、'.join(missing)}\n现有列：{'、'.join(n for n in names if n)}"
+        )
+    return positions
+
+
+def _typed_chunk(rows: list, fields: list) -> pd.DataFrame:
+    """一块原始行 -> DataFrame，日期/时长先转成定长类型，时间列留给 normalize_time_column"""
+    return _typed_frame(pd.DataFrame.from_records(rows, columns=fields))
+
+
+def _typed_frame(chunk: pd.DataFrame) -> pd.DataFrame:
+    if "日期" in chunk:
+        chunk["日期"] = pd.to_datetime(chunk["日期"], errors="coerce")
+    if "持续时长min" in chunk:
+        chunk["持续时长min"] = pd.to_numeric(chunk["持续时长min"], errors="coerce")
+    return chunk
+
+
+def xlsx_sheet_names(file_name: str) -> list:
+    """直接读 xl/workbook.xml 取 sheet 名，不加载共享字符串；.xls 或解析失败返回空列表"""
+    import zipfile
+    from xml.etree import ElementTree
+
+    if os.path.splitext(file_name)[1].lower() == ".xls":
+        return []
+    try:
+        with zipfile.ZipFile(file_name) as zf:
+            root = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return []
+    return [el.get("name") for el in root.iter() if el.tag.endswith("}sheet") or el.tag == "sheet"]
+
+
+def _header_matches(header, column_map: dict) -> bool:
+    try:
+        resolve_columns(header or (), column_map)
+    except ColumnMappingError:
+        return False
+    return True
+
+
+def list_sources(files: list, column_map: dict) -> list:
+    """每个文件中表头符合列映射的 sheet -> [(文件, sheet), ...]
+
+    汇总页等表头不符的 sheet 跳过；某个文件一个都不符合时抛出第一个 sheet 的缺列错误。
+    """
+    sources = []
+    for file_name in files:
+        if os.path.splitext(file_name)[1].lower() not in EXCEL_EXTENSIONS:
+            # csv / parquet 只有一张表
+            sources.append((file_name, None))
+            continue
+        names = xlsx_sheet_names(file_name)
+        if len(names) == 1:
+            # 只有一个 sheet 时不预读表头，缺列在读取时报错
+            sources.append((file_name, names[0]))
+            continue
+        if os.path.splitext(file_name)[1].lower() == ".xls":
+            with pd.ExcelFile(file_name) as xls:
+                headers = {name: xls.parse(name, nrows=0).columns for name in xls.sheet_names}
+        else:
+            import openpyxl
+
+            wb = openpyxl.load_workbook(file_name, read_only=True, data_only=True)
+            try:
+                headers = {ws.title: next(ws.iter_rows(max_row=1, values_only=True), None) for ws in wb.worksheets}
+            finally:
+                wb.close()
+
+        matched = [(file_name, name) for name, header in headers.items() if _header_matches(header, column_map)]
+        if not matched:
+            first = next(iter(headers.values()), None)
+            if first is None:
+                raise ColumnMappingError(f"{os.path.basename(file_name)}：工作表为空，没有表头")
+            try:
+                resolve_columns(first, column_map)
+            except ColumnMappingError as e:
+                raise ColumnMappingError(f"{os.path.basename(file_name)}：{e}") from None
+        sources.extend(matched)
+    return sources
+
+
+def read_xlsx_columns(file_name: str, column_map: dict, chunk_rows: int = CHUNK_ROWS,
+                      on_chunk=None, sheet: str | None = None) -> pd.DataFrame:
+    """只读模式逐行流式读取一个 sheet（默认第一个），只取列映射中的列，按块转成定长类型
+
+    on_chunk(已读行数) 每读完一块调用一次，可在其中抛异常中止读取。
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0] if sheet is None else wb[sheet]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ColumnMappingError("工作表为空，没有表头")
+        positions = resolve_columns(header, column_map)
+        fields = list(positions)
+        width = max(positions.values()) + 1
+        pick = operator.itemgetter(*positions.values())
+        empty = (None,) * len(fields)
+
+        chunks, buffer, total = [], [], 0
+        for row in rows:
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            values = pick(row)
+            if len(fields) == 1:
+                values = (values,)
+            if values == empty:
+                continue
+            buffer.append(values)
+            if len(buffer) >= chunk_rows:
+                chunks.append(_typed_chunk(buffer, fields))
+                total += len(buffer)
+                buffer = []
+                if on_chunk is not None:
+                    on_chunk(total)
+        if buffer or not chunks:
+            chunks.append(_typed_chunk(buffer, fields))
+    finally:
+        wb.close()
+
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def _select_columns(header, column_map: dict, read) -> pd.DataFrame:
+    """按表头定位字段后调用 read(列序号列表) 只读需要的列，返回以字段名为列名的 DataFrame"""
+    positions = resolve_columns(header, column_map)
+    used = sorted(set(positions.values()))
+    df_data = read(used)
+    source = {pos: df_data.columns[i] for i, pos in enumerate(used)}
+    return pd.DataFrame({field: df_data[source[pos]] for field, pos in positions.items()})
+
+
+def read_xls_columns(file_name: str, column_map: dict, sheet: str | int | None = None,
+                     engine: str | None = None) -> pd.DataFrame:
+    """整表读取的 Excel 引擎（.xls 的 xlrd、xlsx 的 calamine）：先读表头定位，再只读需要的列"""
+    sheet = 0 if sheet is None else sheet
+    header = pd.read_excel(file_name, sheet_name=sheet, nrows=0, engine=engine).columns
+    return _select_columns(
+        header, column_map, lambda used: pd.read_excel(file_name, sheet_name=sheet, usecols=used, engine=engine)
+    )
+
+
+def read_csv_columns(file_name: str, column_map: dict) -> pd.DataFrame:
+    """CSV：有 pyarrow 时用它的多线程解析器，否则用 pandas 的 C 解析器"""
+    engine = "pyarrow" if HAS_PYARROW else "c"
+    for encoding in CSV_ENCODINGS:
+        try:
+            header = pd.read_csv(file_name, nrows=0, encoding=encoding).columns
+            return _typed_frame(_select_columns(
+                header, column_map,
+                lambda used: pd.read_csv(file_name, usecols=[header[i] for i in used], encoding=encoding,
+                                         engine=engine),
+            ))
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"无法识别文件编码（已尝试 {'、'.join(CSV_ENCODINGS)}）：{file_name}")
+
+
+def read_parquet_columns(file_name: str, column_map: dict) -> pd.DataFrame:
+    """Parquet：按列式存储只读取映射到的列"""
+    import pyarrow.parquet as pq
+
+    header = pq.read_schema(file_name).names
+    return _typed_frame(_select_columns(
+        header, column_map, lambda used: pd.read_parquet(file_name, columns=[header[i] for i in used])
+    ))
+
+
+def _calamine_errors() -> tuple:
+    """calamine 读取可能抛出的异常：安装损坏、calamine 解析失败、pandas 转换失败"""
+    try:
+        from python_calamine import CalamineError
+    except ImportError:
+        return ImportError, ValueError
+    return ImportError, ValueError, CalamineError
+
+
+def read_xlsx(file_name: str, column_map: dict, on_chunk=None, sheet: str | None = None) -> pd.DataFrame:
+    """xlsx：不超过 CALAMINE_MAX_BYTES 且装了 python-calamine 时整表快速读取，
+    大文件、读取失败或未安装时用 openpyxl 流式读取"""
+    if HAS_CALAMINE and os.path.getsize(file_name) <= CALAMINE_MAX_BYTES:
+        try:
+            return _typed_frame(read_xls_columns(file_name, column_map, sheet, engine="calamine"))
+        except ColumnMappingError:
+            raise
+        except _calamine_errors() as e:
+            logger.warning("calamine failed on %s, falling back to openpyxl: %r", file_name, e, exc_info=True)
+    return read_xlsx_columns(file_name, column_map, on_chunk=on_chunk, sheet=sheet)
+
+
+# 扩展名 -> 读取函数，签名统一为 (文件, 列映射, on_chunk, sheet)
+INPUT_READERS = {
+    ".xlsx": read_xlsx,
+    ".xlsm": read_xlsx,
+    ".xls": lambda file_name, column_map, on_chunk=None, sheet=None: read_xls_columns(file_name, column_map, sheet),
+    ".csv": lambda file_name, column_map, on_chunk=None, sheet=None: read_csv_columns(file_name, column_map),
+    ".parquet": lambda file_name, column_map, on_chunk=None, sheet=None: read_parquet_columns(file_name, column_map),
+}
+INPUT_PATTERNS = tuple(f"*{ext}" for ext in INPUT_READERS)
+
+
+def load_excel_data(file_name: str, column_map: dict, on_chunk=None, sheet: str | None = None) -> pd.DataFrame:
+    """读取导出文件的一个 sheet（默认第一个），返回以内部字段名为列名的 DataFrame；缺列抛 ColumnMappingError"""
+    ext = os.path.splitext(file_name)[1].lower()
+    reader = INPUT_READERS.get(ext)
+    if reader is None:
+        raise ValueError(f"不支持的文件类型：{ext or file_name}")
+    return reader(file_name, column_map, on_chunk=on_chunk, sheet=sheet)
@@ -0,0 +1,178 @@
+# 运行指标：分阶段计时、峰值内存、滚动日志和可选的 cProfile 输出，不依赖 Qt
+
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+LOG_NAME = "ivr_status"
+LOG_FILE = "ivr_status.log"
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+# 设置为目录时，每次生成都写一份 .pstats 到该目录
+PROFILE_ENV = "IVR_PROFILE"
+# 设置为文件路径时，窗口显示后写入显示时刻并退出（ivr_startup.py 测量启动耗时用）
+STARTUP_PROBE_ENV = "IVR_STARTUP_PROBE"
+
+logger = logging.getLogger(LOG_NAME)
+
+
+def peak_memory_mb() -> float | None:
+    """进程峰值内存（MB），取不到时返回 None"""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                    (name, ctypes.c_size_t) for name in (
+                        "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                        "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+                    )
+                ]
+
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return None
+            return counters.PeakWorkingSetSize / 1024 / 1024
+
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except Exception:
+        return None
+
+
+def column_bytes(df) -> dict:
+    """DataFrame 各列实际占用的字节数（含字符串对象本身）"""
+    return {str(col): int(n) for col, n in df.memory_usage(index=False, deep=True).items()}
+
+
+def merge_memory(reports: list) -> dict | None:
+    """多个 {"before": {列: 字节}, "after": {...}} 按列相加；有任何一个缺失时返回 None"""
+    if not reports or any(r is None for r in reports):
+        return None
+    merged = {"before": {}, "after": {}}
+    for report in reports:
+        for key in merged:
+            for col, n in report[key].items():
+                merged[key][col] = merged[key].get(col, 0) + n
+    return merged
+
+
+def memory_lines(memory: dict | None, labels: dict | None = None) -> list:
+    """事件表内存：每列一行 "读取后 -> 压缩后"，最后一行为合计"""
+    if not memory:
+        return []
+    labels = labels or {}
+    before, after = memory["before"], memory["after"]
+    lines = [f"{col}：{before.get(col, 0) / 1024 / 1024:.1f} MB -> {n / 1024 / 1024:.1f} MB"
+             for col, n in after.items()]
+    total_before, total_after = sum(before.values()), sum(after.values())
+    ratio = f"（{total_before / total_after:.1f} 倍）" if total_after else ""
+    lines.append(f"{labels.get('memory', 'memory')}：{total_before / 1024 / 1024:.1f} MB -> "
+                 f"{total_after / 1024 / 1024:.1f} MB{ratio}")
+    return lines
+
+
+@dataclass
+class StageTiming:
+    name: str
+    seconds: float = 0.0
+    rows: int | None = None
+    peak_mb: float | None = None
+
+
+@dataclass
+class StageTimer:
+    """按顺序记录各阶段耗时；stage() 产出的记录可以在阶段内补上行数"""
+    stages: list = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None):
+        record = StageTiming(name, rows=rows)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            record.peak_mb = peak_memory_mb()
+            self.stages.append(record)
+
+    def total(self) -> float:
+        return sum(s.seconds for s in self.stages)
+
+    def lines(self, labels: dict | None = None) -> list:
+        """每个阶段一行：名称、耗时、行数、峰值内存"""
+        labels = labels or {}
+        lines = []
+        for s in self.stages:
+            text = f"{labels.get(s.name, s.name)}：{s.seconds:.3f}s"
+            if s.rows is not None:
+                text += f"，{s.rows} 行"
+            if s.peak_mb is not None:
+                text += f"，峰值内存 {s.peak_mb:.0f} MB"
+            lines.append(text)
+        lines.append(f"{labels.get('total', 'total')}：{self.total():.3f}s")
+        return lines
+
+    def as_dict(self) -> dict:
+        return {s.name: round(s.seconds, 4) for s in self.stages}
+
+
+def setup_logging(log_dir: str) -> logging.Logger:
+    """在配置目录下写滚动日志（单个 1MB，保留 3 份），重复调用不会重复添加 handler"""
+    path = os.path.join(log_dir, LOG_FILE)
+    if not any(getattr(h, "baseFilename", None) == os.path.abspath(path) for h in logger.handlers):
+        os.makedirs(log_dir, exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+def log_timings(file_name: str, timer: StageTimer, outcome: str = "ok"):
+    stages = " ".join(
+        f"{s.name}={s.seconds:.3f}s" + (f"/{s.rows}rows" if s.rows is not None else "") for s in timer.stages
+    )
+    peak = next((s.peak_mb for s in reversed(timer.stages) if s.peak_mb is not None), None)
+    peak_text = f" peak={peak:.0f}MB" if peak is not None else ""
+    logger.info("%s %s total=%.3fs %s%s", outcome, file_name, timer.total(), stages, peak_text)
+
+
+def log_memory(file_name: str, memory: dict | None):
+    if memory:
+        logger.info("memory %s before=%dB after=%dB", file_name, sum(memory["before"].values()),
+                    sum(memory["after"].values()))
+
+
+@contextmanager
+def profiled(label: str, out_dir: str | None = None):
+    """设置了 IVR_PROFILE（或传入 out_dir）时用 cProfile 记录当前线程，结束后写出 .pstats"""
+    out_dir = out_dir or os.environ.get(PROFILE_ENV)
+    if not out_dir:
+        yield None
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        os.makedirs(out_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(out_dir, f"{label}_{stamp}_{os.getpid()}.pstats")
+        profiler.dump_stats(path)
+        logger.info("profile written to %s", path)
@@ -0,0 +1,269 @@
+# 日报/汇总树的数据模型：节点只在展开时生成，子节点分批插入
+# ivr_engine（pandas）在生成节点时才导入，窗口可以先于 pandas 显示
+
+import bisect
+
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt
+from PyQt6.QtGui import QBrush, QColor
+
+WARN_COLOR = "#ED856E"
+FETCH_BATCH = 200  # 每次展开/滚动最多插入的行数
+
+
+class ReportNode:
+    """树节点：loader 在首次展开时生成子节点列表，pending 为尚未插入视图的子节点"""
+    __slots__ = ("text", "warn", "parent", "row", "children", "pending", "loader")
+
+    def __init__(self, text: str, warn: bool = False, loader=None):
+        self.text = text
+        self.warn = warn
+        self.parent = None
+        self.row = 0
+        self.children = []
+        self.pending = []
+        self.loader = loader
+
+    def has_children(self) -> bool:
+        return bool(self.children or self.pending or self.loader)
+
+    def can_fetch(self) -> bool:
+        return bool(self.pending or self.loader)
+
+
+class ReportTreeModel(QAbstractItemModel):
+    """单列树模型，所有超时人员共用一个前景色画刷"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = ReportNode("")
+        self.warn_brush = QBrush(QColor(WARN_COLOR))
+
+    def set_nodes(self, nodes: list):
+        self.beginResetModel()
+        self.root = ReportNode("")
+        self._attach(self.root, nodes)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_nodes([])
+
+    def replace_nodes(self, nodes: list, removed=()):
+        """按文本更新顶层节点（顶层需按文本排序）：同名节点原位替换，子节点重新按需生成；
+        没有的按顺序插入，removed 中的删除；其余节点和它们的展开状态不变"""
+        root = QModelIndex()
+        for text in list(removed) + [node.text for node in nodes]:
+            texts = [child.text for child in self.root.children]
+            if text in texts:
+                row = texts.index(text)
+                self.beginRemoveRows(root, row, row)
+                del self.root.children[row]
+                self._renumber(row)
+                self.endRemoveRows()
+        for node in nodes:
+            row = bisect.bisect_left([child.text for child in self.root.children], node.text)
+            self.beginInsertRows(root, row, row)
+            node.parent = self.root
+            self.root.children.insert(row, node)
+            self._renumber(row)
+            self.endInsertRows()
+
+    def _renumber(self, start: int):
+        for row in range(start, len(self.root.children)):
+            self.root.children[row].row = row
+
+    @staticmethod
+    def _attach(parent: ReportNode, nodes: list):
+        start = len(parent.children)
+        for i, node in enumerate(nodes):
+            node.parent = parent
+            node.row = start + i
+        parent.children.extend(nodes)
+
+    def node(self, index: QModelIndex) -> ReportNode:
+        return index.internalPointer() if index.isValid() else self.root
+
+    # QAbstractItemModel 接口
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.node(parent)
+        if column != 0 or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self.root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self.node(parent).children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        return self.node(parent).has_children()
+
+    def canFetchMore(self, parent):
+        return self.node(parent).can_fetch()
+
+    def fetchMore(self, parent):
+        node = self.node(parent)
+        if node.loader is not None:
+            node.pending = list(node.loader())
+            node.loader = None
+        batch, node.pending = node.pending[:FETCH_BATCH], node.pending[FETCH_BATCH:]
+        if not batch:
+            return
+        first = len(node.children)
+        self.beginInsertRows(parent, first, first + len(batch) - 1)
+        self._attach(node, batch)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.text
+        if role == Qt.ItemDataRole.ForegroundRole and node.warn:
+            return self.warn_brush
+        return None
+
+
+# 由统计结果生成节点
+def _people(people: dict, fmt: str):
+    return lambda: [ReportNode(fmt.format(k, v), warn=True) for k, v in people.items()]
+
+
+def _day_rule_nodes(rules: dict) -> list:
+    """某一天四项规则的节点"""
+    from ivr_engine import day_violations, RULE_LABELS
+
+    rules = day_violations(rules)
+    nodes = []
+
+    # 用餐 / 小休总时长
+    for key in ("meal", "break_sum"):
+        over = rules[key]
+        if not over:
+            nodes.append(ReportNode(f"{RULE_LABELS[key]}：全员遵时"))
+        else:
+            nodes.append(ReportNode(f"{RULE_LABELS[key]}：{len(over)}人超时", loader=_people(over, "{}：{:.1f} 分钟")))
+
+    # 单次小休
+    once = rules["break_once"]
+    if not once:
+        nodes.append(ReportNode("单次小休：全员遵时"))
+    else:
+        def once_children():
+            top_cnt = next(iter(once.values()))
+            top_names = [k for k, v in once.items() if v == top_cnt]
+            top = ReportNode(f"小休超时Top：{', '.join(top_names)} {top_cnt}次", warn=True)
+            return [top] + _people(once, "{}：{} 次")()
+
+        nodes.append(ReportNode(f"单次小休：{len(once)}人超时，共{sum(once.values())}次", loader=once_children))
+
+    # 首尾半小时小休
+    edge = rules["break_shift"]
+    if not edge:
+        nodes.append(ReportNode("首尾半小时小休：全员遵时"))
+    else:
+        nodes.append(ReportNode(f"首尾半小时小休：{len(edge)}人，共{sum(edge.values())}次",
+                                loader=_people(edge, "{}：{} 次")))
+    return nodes
+
+
+def _clock(t, day) -> str:
+    """时刻显示为 HH:MM，跨零点班次零点之后的加“次日”"""
+    text = t.strftime("%H:%M")
+    return f"次日{text}" if t.normalize() > day else text
+
+
+def concurrency_node(info: dict, day) -> ReportNode:
+    """某一天的小休并发节点：按班次峰值、超限时段、15 分钟时段峰值"""
+    limit = info["limit"]
+    peak = f"小休并发：峰值{info['peak']}人（{_clock(info['peak_at'], day)}）"
+
+    def children():
+        shifts = ReportNode("按班次", loader=lambda: [
+            ReportNode(f"{code}班：峰值{n}人（{_clock(t, day)}）", warn=n > limit)
+            for code, (n, t) in info["shifts"].items()
+        ])
+        nodes = [shifts]
+        if info["windows"]:
+            nodes.append(ReportNode(f"超过{limit}人的时段：{len(info['windows'])}段", loader=lambda: [
+                ReportNode(f"{_clock(s, day)}:{s.second:02d} ~ {_clock(e, day)}:{e.second:02d}：{n}人", warn=True)
+                for s, e, n in info["windows"]
+            ]))
+        nodes.append(ReportNode("按15分钟", loader=lambda: [
+            ReportNode(f"{_clock(t, day)}：{n}人", warn=n > limit) for t, n in info["slots"].items()
+        ]))
+        return nodes
+
+    if info["windows"]:
+        return ReportNode(f"{peak}，{len(info['windows'])}段超过{limit}人", warn=True, loader=children)
+    return ReportNode(f"{peak}，未超过{limit}人", loader=children)
+
+
+def daily_nodes(report_dict: dict, concurrency: dict | None = None) -> list:
+    """每天一个节点，规则节点在展开当天时才计算；concurrency 来自 break_concurrency"""
+    concurrency = concurrency or {}
+
+    def day_nodes(day):
+        nodes = _day_rule_nodes(report_dict[day])
+        if day in concurrency:
+            nodes.append(concurrency_node(concurrency[day], day))
+        return nodes
+
+    return [
+        ReportNode(day.strftime("%Y-%m-%d"), loader=lambda day=day: day_nodes(day))
+        for day in sorted(report_dict)
+    ]
+
+
+def summary_nodes(summary: dict) -> list:
+    """日期范围汇总节点，summary 来自 summarize_report 或 HistoryStore.summarize"""
+    if not summary:
+        return []
+    from ivr_engine import REPORT_KEYS, RULE_LABELS
+
+    def rule_nodes():
+        nodes = []
+        for key in REPORT_KEYS:
+            totals = summary[key]
+            if not totals:
+                nodes.append(ReportNode(f"{RULE_LABELS[key]}：全员遵时"))
+            else:
+                verdict = "人" if key == "break_shift" else "人超时"
+                nodes.append(ReportNode(f"{RULE_LABELS[key]}：{len(totals)}{verdict}，共{sum(totals.values())}次",
+                                        loader=_people(totals, "{}：{} 次")))
+        return nodes
+
+    title = f"日期范围：{summary['start'].strftime('%Y-%m-%d')} ~ {summary['end'].strftime('%Y-%m-%d')}"
+    return [ReportNode(title, loader=rule_nodes)]
+
+
+def concurrency_summary_nodes(summary: dict) -> list:
+    """日期范围内的小休并发汇总，summary 来自 summarize_concurrency"""
+    if not summary:
+        return []
+    limit = summary["limit"]
+    day = summary["peak_day"]
+    title = f"小休并发：峰值{summary['peak']}人（{day.strftime('%Y-%m-%d')} {_clock(summary['peak_at'], day)}）"
+    over_days = summary["over_days"]
+    if not over_days:
+        return [ReportNode(f"{title}，未超过{limit}人")]
+
+    def children():
+        return [
+            ReportNode(f"超限日期：{len(over_days)}天", loader=lambda: [
+                ReportNode(f"{d.strftime('%Y-%m-%d')}：{n}段", warn=True) for d, n in sorted(over_days.items())
+            ]),
+            ReportNode("超限时段（15分钟）", loader=_people(summary["slot_days"], "{}：{} 天")),
+        ]
+
+    return [ReportNode(f"{title}，{len(over_days)}天超过{limit}人，共{summary['over_minutes']:.0f}分钟",
+                       warn=True, loader=children)]
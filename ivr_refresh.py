@@ -0,0 +1,364 @@
+# 自动刷新：导出文件被覆盖后只解析新增的行，只重新统计受影响的 (日期, 姓名)；
+# 改配置后用内存中的事件表重新统计，不重新选择文件。不依赖 Qt
+
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_object_dtype
+
+from ivr_engine import (aggregate_events, aggregate_flags, combine_parts, compact_events, describe_sources,
+                        flag_events, normalize_time_column, prepare_events, run_report, CATEGORY_FIELDS,
+                        EVENT_FIELDS, ReportCancelled, ReportResult, ShiftCalendar)
+from ivr_loader import list_sources, load_excel_data, mapped_columns
+from ivr_metrics import column_bytes, merge_memory, StageTimer
+from ivr_validate import validate_events
+
+# 受影响的事件超过这个比例时直接整体重新统计
+FULL_RECOMPUTE_RATIO = 0.5
+# 列映射改动后要重新整理的字段：时间列按 日期 锚定，三者一起重新解析
+FIELD_GROUPS = (("日期", "开始时间", "结束时间"), ("持续时长min",), ("姓名",), ("班次",), ("状态",))
+
+
+def file_stamp(file_name: str) -> tuple:
+    stat = os.stat(file_name)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """逐行哈希（不含行号）；时间列统一成 ns，同一时刻不会因精度不同得到不同哈希，
+    object 列（time 对象等）先转成文本再整列哈希，比逐个对象哈希快"""
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if is_datetime64_any_dtype(values):
+            values = values.astype("datetime64[ns]")
+        elif is_object_dtype(values):
+            values = values.astype(str)
+        columns[col] = values
+    return pd.util.hash_pandas_object(pd.DataFrame(columns, index=df.index), index=False).to_numpy()
+
+
+def match_rows(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """new 的每一行在 old 中的位置，没有对应行为 -1；哈希相同的行按出现先后配对"""
+    def keyed(hashes):
+        occurrence = pd.Series(hashes).groupby(hashes).cumcount().to_numpy()
+        return pd.MultiIndex.from_arrays([hashes, occurrence])
+
+    return keyed(old).get_indexer(keyed(new))
+
+
+def _event_keys(events: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays([
+        events["日期"].astype("datetime64[ns]"), events["姓名"].astype(object)
+    ])
+
+
+@dataclass
+class SourceState:
+    """一个 sheet 上次读取的结果：文件大小/修改时间、整理后的事件表、原始行哈希"""
+    file_name: str
+    sheet: str | None
+    stamp: tuple
+    events: pd.DataFrame = field(repr=False)
+    unparsed: int = 0
+    hashes: np.ndarray | None = field(default=None, repr=False)
+
+
+def load_state(file_name: str, sheet: str | None, column_map: dict, time_format: str | None = None,
+               previous: SourceState | None = None, timer: StageTimer | None = None) -> SourceState:
+    """读取一个 sheet；上次的每一行都还在时只解析新增的行，否则整体重新解析"""
+    timer = StageTimer() if timer is None else timer
+    stamp = file_stamp(file_name)
+    with timer.stage("read") as record:
+        raw = load_excel_data(file_name, column_map, sheet=sheet)[EVENT_FIELDS]
+        record.rows = len(raw)
+
+    with timer.stage("diff", rows=len(raw)):
+        hashes = row_hashes(raw)
+        pos = None
+        if previous is not None and previous.hashes is not None:
+            pos = match_rows(previous.hashes, hashes)
+            if (pos >= 0).sum() < len(previous.hashes):
+                # 有行被修改或删除
+                pos = None
+
+    if pos is None:
+        events, unparsed = prepare_events(raw, time_format, timer)
+        return SourceState(file_name, sheet, stamp, events, unparsed, hashes)
+
+    fresh_rows = np.flatnonzero(pos < 0)
+    if not len(fresh_rows):
+        return SourceState(file_name, sheet, stamp, previous.events, previous.unparsed, hashes)
+    fresh, failed = prepare_events(raw.iloc[fresh_rows], time_format, timer)
+    kept_rows = np.flatnonzero(pos >= 0)
+    kept = previous.events.iloc[pos[kept_rows]].set_axis(raw.index[kept_rows])
+    events = compact_events(pd.concat([kept, fresh]).sort_index())
+    memory = merge_memory([previous.events.attrs.get("memory"), fresh.attrs.get("memory")])
+    if memory is not None:
+        memory["after"] = column_bytes(events)
+    events.attrs["memory"] = memory
+    return SourceState(file_name, sheet, stamp, events, previous.unparsed + failed, hashes)
+
+
+def _update_flags(previous: ReportResult, events: pd.DataFrame, calendar: ShiftCalendar, timer: StageTimer):
+    """对比前后两张事件表，只给受影响的 (日期, 姓名) 重新打标记；返回 (flagged, report_dict, 变化的日期)
+
+    受影响的事件过多时整体重新统计，变化的日期为 None。
+    """
+    with timer.stage("diff", rows=len(events)):
+        pos = match_rows(row_hashes(previous.events[EVENT_FIELDS]), row_hashes(events[EVENT_FIELDS]))
+        old_hit = np.zeros(len(previous.events), dtype=bool)
+        old_hit[pos[pos >= 0]] = True
+        keys = _event_keys(events)
+        affected = keys[pos < 0].union(_event_keys(previous.events)[~old_hit])
+        mask = keys.isin(affected)
+
+    if mask.sum() > FULL_RECOMPUTE_RATIO * len(events):
+        with timer.stage("aggregate", rows=len(events)):
+            flagged, report_dict = aggregate_events(events, calendar)
+            return flagged, report_dict, None
+
+    with timer.stage("aggregate", rows=int(mask.sum())):
+        # 上次的标记行换成新事件表中的位置
+        new_of_old = np.full(len(previous.events), -1)
+        new_of_old[pos[pos >= 0]] = np.flatnonzero(pos >= 0)
+        target = new_of_old[previous.events.index.get_indexer(previous.flagged.index)]
+        days = set(affected.get_level_values(0).dropna())
+        flagged, report_dict = _merge_flags(previous, events, target, mask, calendar, days)
+    changed = sorted(d for d in days if d in report_dict or d in previous.report_dict)
+    return flagged, report_dict, changed
+
+
+def _merge_flags(previous: ReportResult, events: pd.DataFrame, target: np.ndarray, mask: np.ndarray,
+                 calendar: ShiftCalendar, days: set) -> tuple:
+    """mask 中的事件重新打标记，其余沿用上次的标记，只重新汇总 days 中的日期；返回 (flagged, report_dict)
+
+    target 为 previous.flagged 每一行在 events 中的位置，-1 表示该行已不存在。
+    """
+    keep = target >= 0
+    keep[keep] = ~mask[target[keep]]
+    kept = previous.flagged[keep].set_axis(events.index[target[keep]])
+
+    flagged = pd.concat([kept, flag_events(events[mask], calendar)]).sort_index()
+    for col in CATEGORY_FIELDS:
+        flagged[col] = flagged[col].astype("category")
+
+    partial = aggregate_flags(flagged[flagged["日期"].isin(list(days))])
+    report_dict = {
+        day: partial[day] if day in partial else previous.report_dict[day]
+        for day in flagged["日期"].drop_duplicates()
+    }
+    return flagged, report_dict
+
+
+def _update_concurrency(previous: ReportResult, flagged: pd.DataFrame, changed: list | None, limit: int,
+                        timer: StageTimer) -> dict:
+    """小休并发按天独立，只重算变化的日期；上限改过时全部重算"""
+    from ivr_concurrency import break_concurrency
+
+    old = previous.concurrency if previous is not None else None
+    reuse = changed is not None and old is not None and all(info["limit"] == limit for info in old.values())
+    with timer.stage("concurrency", rows=int(flagged["break"].sum())):
+        if not reuse:
+            return break_concurrency(flagged, limit)
+        fresh = break_concurrency(flagged[flagged["日期"].isin(changed)], limit)
+        skip = set(changed)
+        merged = {day: info for day, info in old.items() if day not in skip}
+        merged.update(fresh)
+        return dict(sorted(merged.items()))
+
+
+def refresh_report(sources, column_map: dict, calendar: ShiftCalendar, time_format: str | None = None,
+                   previous: ReportResult | None = None, concurrency_limit: int | None = None,
+                   timer: StageTimer | None = None, progress=None, is_cancelled=None) -> ReportResult:
+    """增量生成：文件没变的 sheet 直接沿用，变了的只解析新增行，再只重新统计受影响的 (日期, 姓名)
+
+    previous 为上一次 refresh_report 或 run_report 的结果（没有时整体生成）；结果的
+    snapshots 留给下一次刷新，changed_days 为有变化的日期（整体重新统计时为 None）。
+    run_report 的结果没有 snapshots，第一次刷新时整体重新解析，之后只解析新增行。
+    progress / is_cancelled 与 run_report 相同。
+    """
+    def step(stage, percent):
+        if is_cancelled is not None and is_cancelled():
+            raise ReportCancelled()
+        if progress is not None:
+            progress(stage, percent)
+
+    timer = StageTimer() if timer is None else timer
+    label = describe_sources(sources)
+    if isinstance(sources, str):
+        sources = list_sources([sources], column_map)
+
+    states = {(s.file_name, s.sheet): s for s in (previous.snapshots or [])} if previous is not None else {}
+    snapshots = []
+    for i, (file_name, sheet) in enumerate(sources):
+        step("read", 40 * i // len(sources))
+        state = states.get((file_name, sheet))
+        if state is None or state.stamp != file_stamp(file_name):
+            state = load_state(file_name, sheet, column_map, time_format, state, timer)
+        snapshots.append(state)
+    removed = []
+    events, memory = combine_parts([s.events for s in snapshots], timer, removed)
+    events = events.reset_index(drop=True)
+
+    step("aggregate", 70)
+    if previous is None or previous.flagged is None:
+        with timer.stage("aggregate", rows=len(events)):
+            flagged, report_dict = aggregate_events(events, calendar, step=step)
+            changed = None
+    else:
+        flagged, report_dict, changed = _update_flags(previous, events, calendar, timer)
+
+    step("render", 90)
+    unparsed = sum(s.unparsed for s in snapshots)
+    with timer.stage("validate", rows=len(events)):
+        validation = validate_events(events, flagged, calendar, removed, unparsed)
+    result = ReportResult(label, report_dict, events, unparsed, flagged, timings=timer, memory=memory,
+                          snapshots=snapshots, changed_days=changed, validation=validation,
+                          removed=removed)
+    if concurrency_limit is not None:
+        result.concurrency = _update_concurrency(previous, flagged, changed, concurrency_limit, timer)
+    return result
+
+
+# 改配置后重新统计
+def shift_changes(old: dict, new: dict) -> set:
+    """前后两份班次配置中新增、删除或时间有变化的班次代码"""
+    return {code for code in old.keys() | new.keys() if old.get(code) != new.get(code)}
+
+
+def changed_fields(old: dict, new: dict) -> set:
+    """前后两份列映射中对应的列名有变化的字段"""
+    old, new = mapped_columns(old), mapped_columns(new)
+    return {f for f in EVENT_FIELDS if old[f] != new[f]}
+
+
+def reapply_shifts(previous: ReportResult, calendar: ShiftCalendar, codes: set | None = None,
+                   concurrency_limit: int | None = None, timer: StageTimer | None = None) -> ReportResult:
+    """班次时间或排班表改动后用 previous 的事件表重新统计，不重新读取文件
+
+    codes 为有变化的班次代码（shift_changes），只给当天实际班次（排班表优先）属于其中的事件
+    重新打标记，只重新汇总这些事件所在的日期；codes 为 None（排班表改动）时全部重新统计。
+    """
+    timer = StageTimer() if timer is None else timer
+    events = previous.events
+    mask = None
+    if codes is not None:
+        with timer.stage("diff", rows=len(events)):
+            mask = calendar.shift_codes(events["日期"], events["班次"], events["姓名"]).isin(list(codes)).to_numpy()
+
+    if mask is None or mask.sum() > FULL_RECOMPUTE_RATIO * len(events):
+        with timer.stage("aggregate", rows=len(events)):
+            flagged, report_dict = aggregate_events(events, calendar)
+        changed = None
+    else:
+        with timer.stage("aggregate", rows=int(mask.sum())):
+            target = events.index.get_indexer(previous.flagged.index)
+            days = set(events["日期"][mask].dropna())
+            flagged, report_dict = _merge_flags(previous, events, target, mask, calendar, days)
+        changed = sorted(d for d in days if d in report_dict or d in previous.report_dict)
+
+    with timer.stage("validate", rows=len(events)):
+        validation = validate_events(events, flagged, calendar, previous.removed, previous.unparsed)
+    result = ReportResult(previous.file_name, report_dict, events, previous.unparsed, flagged, timings=timer,
+                          memory=previous.memory, snapshots=previous.snapshots, changed_days=changed,
+                          validation=validation, removed=previous.removed)
+    if concurrency_limit is not None:
+        result.concurrency = _update_concurrency(previous, flagged, changed, concurrency_limit, timer)
+    return result
+
+
+def _remap_events(events: pd.DataFrame, raw: pd.DataFrame, fields: set, time_format: str | None,
+                  timer: StageTimer):
+    """只重新整理 fields 所在的字段组，其余列沿用 events；返回 (事件表, 是否重新解析了时间)
+
+    读取时会跳过映射列全空的行，换了列映射后行数或没改的列对不上时返回 None。
+    """
+    refresh = [col for group in FIELD_GROUPS if fields & set(group) for col in group]
+    kept = [col for col in EVENT_FIELDS if col not in refresh]
+    probe = next((col for col in CATEGORY_FIELDS if col in kept), None)
+    if len(raw) != len(events) or probe is None:
+        return None
+    if not events[probe].astype(object).reset_index(drop=True).equals(raw[probe].astype(object)):
+        return None
+
+    with timer.stage("mapping", rows=len(raw)):
+        before = column_bytes(raw)
+        raw = raw.set_axis(events.index)
+        columns = {col: events[col] for col in kept}
+        for col in refresh:
+            if col == "日期":
+                columns[col] = pd.to_datetime(raw[col], errors="coerce")
+            elif col == "持续时长min":
+                columns[col] = pd.to_numeric(raw[col], errors="coerce").round(2)
+            elif col in CATEGORY_FIELDS:
+                columns[col] = raw[col]
+
+    unparsed = None
+    if "日期" in refresh:
+        unparsed = 0
+        with timer.stage("parse", rows=len(raw)):
+            for col in ["开始时间", "结束时间"]:
+                columns[col], failed = normalize_time_column(raw[col], columns["日期"], time_format)
+                unparsed += failed
+
+    with timer.stage("compact", rows=len(raw)):
+        remapped = compact_events(pd.DataFrame(columns, index=events.index))
+        remapped.attrs["memory"] = {"before": before, "after": column_bytes(remapped)}
+    return remapped, unparsed
+
+
+def remap_columns(previous: ReportResult, sources, column_map: dict, calendar: ShiftCalendar, fields: set,
+                  time_format: str | None = None, concurrency_limit: int | None = None,
+                  timer: StageTimer | None = None) -> ReportResult:
+    """列映射改动后重新统计：新映射到的列不在内存里，只能按新列名重新读取，
+    但只重新整理改动的字段组，其余字段（尤其是最耗时的时间解析）沿用 previous 的事件表
+
+    多个 sheet 时整体重新生成，单个 sheet 去掉过重复行时行号对不上，整体重新整理；
+    字段值变了，规则全部重新统计。
+    """
+    from ivr_concurrency import break_concurrency
+
+    timer = StageTimer() if timer is None else timer
+    label = describe_sources(sources)
+    if isinstance(sources, str):
+        sources = list_sources([sources], column_map)
+
+    remapped = None
+    if len(sources) == 1:
+        file_name, sheet = sources[0]
+        with timer.stage("read") as record:
+            raw = load_excel_data(file_name, column_map, sheet=sheet)[EVENT_FIELDS]
+            record.rows = len(raw)
+        remapped = _remap_events(previous.events, raw, fields, time_format, timer)
+        if remapped is None:
+            remapped = prepare_events(raw, time_format, timer)
+    if remapped is None:
+        result = run_report(sources, column_map, calendar, time_format, timer=timer)
+    else:
+        events, unparsed = remapped
+        unparsed = previous.unparsed if unparsed is None else unparsed
+        # 去重键可能随列映射变化，按新的值重新去重
+        removed = []
+        events, memory = combine_parts([events], timer, removed)
+        with timer.stage("aggregate", rows=len(events)):
+            flagged, report_dict = aggregate_events(events, calendar)
+        with timer.stage("validate", rows=len(events)):
+            validation = validate_events(events, flagged, calendar, removed, unparsed)
+        result = ReportResult(label, report_dict, events, unparsed, flagged, timings=timer,
+                              memory=memory, validation=validation, removed=removed)
+    if concurrency_limit is not None:
+        with timer.stage("concurrency", rows=int(result.flagged["break"].sum())):
+            result.concurrency = break_concurrency(result.flagged, concurrency_limit)
+    return result
+
+
+def reapply_settings(previous: ReportResult, sources, column_map: dict, calendar: ShiftCalendar,
+                     codes: set | None = None, fields: set | None = None, time_format: str | None = None,
+                     concurrency_limit: int | None = None, timer: StageTimer | None = None) -> ReportResult:
+    """改配置后按依赖重新统计：列映射有变化时 remap_columns，否则 reapply_shifts"""
+    if fields:
+        return remap_columns(previous, sources, column_map, calendar, fields, time_format, concurrency_limit, timer)
+    return reapply_shifts(previous, calendar, codes, concurrency_limit, timer)
@@ -0,0 +1,418 @@
+# 报告服务：共享目录中的导出文件每个只读取、统计一次，结果放在内存 LRU 中，以 JSON 经 HTTP
+# 提供给局域网内的 GUI / 脚本；只用标准库，不依赖 Qt
+
+import gzip
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+from urllib.request import Request, urlopen
+
+from ivr_metrics import logger
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_ENTRIES = 16
+FETCH_TIMEOUT = 600  # 秒，服务端首次统计大文件可能较久
+GZIP_MIN_BYTES = 4096
+DIGEST_CHUNK = 1 << 20
+
+
+class QueryError(ValueError):
+    """请求参数有误（缺少或格式不对），返回 400"""
+
+
+def report_query(query: dict) -> tuple:
+    """校验 /report 的参数 -> (file, start, end, sheet)，start / end 为 YYYY-MM-DD 或 None"""
+    if not query.get("file"):
+        raise QueryError("缺少参数 file")
+    days = []
+    for key in ("start", "end"):
+        value = query.get(key) or None
+        if value is not None:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                raise QueryError(f"{key} 应为 YYYY-MM-DD：{value}") from None
+        days.append(value)
+    return query["file"], days[0], days[1], query.get("sheet") or None
+
+
+def file_digest(path: str) -> str:
+    """文件内容的 sha256，客户端据此确认服务器上的同名文件就是本地这一份"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(DIGEST_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """键 -> 结果的 LRU；同一键的并发请求共用一次计算，后到的请求等待先到的那次"""
+
+    def __init__(self, compute, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.compute = compute
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._done = OrderedDict()
+        self._pending = {}
+        self.hits = self.shared = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def get(self, key, *args) -> tuple:
+        """返回 (结果, 来源)，来源为 cache（已缓存）/ shared（等待同一次计算）/ computed"""
+        with self._lock:
+            if key in self._done:
+                self._done.move_to_end(key)
+                self.hits += 1
+                return self._done[key], "cache"
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+                self.misses += 1
+            else:
+                self.shared += 1
+        if not owner:
+            return future.result(), "shared"
+
+        try:
+            value = self.compute(*args)
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._pending[key]
+            self._done[key] = value
+            while len(self._done) > self.max_entries:
+                self._done.popitem(last=False)
+        future.set_result(value)
+        return value, "computed"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._done), "max_entries": self.max_entries, "hits": self.hits,
+                    "shared": self.shared, "misses": self.misses, "pending": len(self._pending)}
+
+
+def _day(value) -> str:
+    return value.strftime("%Y-%m-%d")
+
+
+def _number(value):
+    """NaN（当天有记录但时长缺失）写成 null，保证是标准 JSON"""
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def report_payload(report_dict: dict) -> dict:
+    """report_dict -> JSON 结构：日期为字符串，保持各层字典的顺序"""
+    return {
+        _day(day): {key: {emp: _number(v) for emp, v in people.items()} for key, people in rules.items()}
+        for day, rules in report_dict.items()
+    }
+
+
+def report_from_payload(payload: dict) -> dict:
+    """report_payload 的逆操作，日期还原为 Timestamp，null 还原为 NaN"""
+    import pandas as pd
+
+    return {
+        pd.Timestamp(day): {
+            key: {emp: math.nan if v is None else v for emp, v in people.items()} for key, people in rules.items()
+        }
+        for day, rules in payload.items()
+    }
+
+
+def concurrency_payload(concurrency: dict) -> dict:
+    """break_concurrency 的结果 -> JSON 结构，时刻写成 ISO 字符串"""
+    return {
+        _day(day): {
+            "limit": info["limit"], "peak": info["peak"], "peak_at": info["peak_at"].isoformat(),
+            "shifts": {shift: [peak, t.isoformat()] for shift, (peak, t) in info["shifts"].items()},
+            "slots": [[t.isoformat(), n] for t, n in info["slots"].items()],
+            "windows": [[s.isoformat(), e.isoformat(), n] for s, e, n in info["windows"]],
+        }
+        for day, info in concurrency.items()
+    }
+
+
+def concurrency_from_payload(payload: dict) -> dict:
+    import pandas as pd
+
+    ts = pd.Timestamp
+    return {
+        ts(day): {
+            "limit": info["limit"], "peak": info["peak"], "peak_at": ts(info["peak_at"]),
+            "shifts": {shift: (peak, ts(t)) for shift, (peak, t) in info["shifts"].items()},
+            "slots": {ts(t): n for t, n in info["slots"]},
+            "windows": [(ts(s), ts(e), n) for s, e, n in info["windows"]],
+        }
+        for day, info in payload.items()
+    }
+
+
+def summary_from_payload(payload: dict) -> dict:
+    import pandas as pd
+
+    summary = dict(payload)
+    if summary:
+        summary["start"] = pd.Timestamp(summary["start"])
+        summary["end"] = pd.Timestamp(summary["end"])
+    return summary
+
+
+class ReportService:
+    """root 为共享的导出目录，config 为 ConfigManager 的配置；文件按 (路径, 大小, 修改时间, 配置) 缓存"""
+
+    def __init__(self, root: str, config: dict, max_entries: int = DEFAULT_CACHE_ENTRIES, cache=None):
+        from ivr_engine import load_roster, ShiftCalendar
+
+        self.root = os.path.abspath(root)
+        self.column_map = config.get("column_config", {})
+        self.time_format = config.get("time_format", "")
+        self.concurrency_limit = config.get("break_concurrency_limit")
+        roster = None
+        if config.get("roster_file"):
+            roster = load_roster(config["roster_file"], self.column_map)
+        self.calendar = ShiftCalendar(config.get("shift_config", {}), roster)
+        self.settings = {key: config.get(key) for key in
+                         ("column_config", "shift_config", "roster_file", "time_format",
+                          "break_concurrency_limit")}
+        self.cache = cache
+        self.results = ResultCache(self._compute, max_entries)
+        self._digests = {}  # (路径, 大小, 修改时间) -> sha256，文件不变时只计算一次
+        self._digest_lock = threading.Lock()
+        # 同一时间只统计一个文件：大文件统计本身会占满内存和 CPU，磁盘缓存也不支持多线程同时写
+        self._compute_lock = threading.Lock()
+
+    def resolve(self, name: str) -> str:
+        """客户端给出的相对路径 -> root 下的文件；不允许跳出 root"""
+        path = os.path.abspath(os.path.join(self.root, name))
+        if os.path.commonpath([path, self.root]) != self.root:
+            raise PermissionError(f"不在共享目录中：{name}")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"文件不存在：{name}")
+        return path
+
+    def key(self, path: str, sheet: str | None = None) -> str:
+        stat = os.stat(path)
+        raw = json.dumps({"path": path, "sheet": sheet, "size": stat.st_size, "mtime": stat.st_mtime_ns,
+                          "settings": self.settings}, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def digest(self, path: str) -> str:
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        with self._digest_lock:
+            value = self._digests.get(key)
+        if value is None:
+            value = file_digest(path)
+            with self._digest_lock:
+                self._digests[key] = value
+        return value
+
+    def files(self) -> list:
+        from ivr_batch import collect_files
+
+        files = []
+        for path in collect_files([self.root]):
+            stat = os.stat(path)
+            files.append({"name": os.path.relpath(path, self.root), "size": stat.st_size,
+                          "modified": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stat.st_mtime)),
+                          "sha256": self.digest(path)})
+        return files
+
+    def _compute(self, path: str, sheet: str | None = None) -> dict:
+        """读取、统计一次；缓存 JSON 结构和数据立方，日期范围汇总按请求即时计算"""
+        from ivr_concurrency import break_concurrency
+        from ivr_cube import MetricCube
+        from ivr_engine import daily_violations, run_report
+
+        sources = path if sheet is None else [(path, sheet)]
+        with self._compute_lock:
+            result = run_report(sources, self.column_map, self.calendar, self.time_format, cache=self.cache)
+        validation = result.validation
+        concurrency = {}
+        if self.concurrency_limit:
+            concurrency = break_concurrency(result.flagged, self.concurrency_limit)
+        return {
+            "report": report_payload(result.report_dict),
+            "daily": {_day(day): rules for day, rules in daily_violations(result.report_dict).items()},
+            "cube": MetricCube.from_report(result.report_dict),
+            "unparsed": result.unparsed,
+            "validation": None if validation is None else {
+                "total": validation.total, "counts": validation.counts, "dropped": validation.dropped,
+                "unparsed": validation.unparsed, "issues": validation.issues,
+            },
+            "concurrency": concurrency_payload(concurrency),
+            "seconds": round(result.timings.total(), 3),
+            "computed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def report(self, name: str, start: str | None = None, end: str | None = None,
+               sheet: str | None = None) -> dict:
+        """日报和日期范围汇总（省略范围时为全部日期）；省略 sheet 时为表头符合列映射的全部 sheet"""
+        from ivr_export import report_to_json
+
+        path = self.resolve(name)
+        if sheet is not None and os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+            from ivr_loader import xlsx_sheet_names
+
+            if sheet not in xlsx_sheet_names(path):
+                raise FileNotFoundError(f"工作表不存在：{name} [{sheet}]")
+        entry, source = self.results.get(self.key(path, sheet), path, sheet)
+        summary = entry["cube"].summarize(start, end)
+        _, summary_json = report_to_json({}, summary)
+        return {
+            "file": name, "sheet": sheet, "sha256": self.digest(path), "source": source, "computed_at": entry["computed_at"], "seconds": entry["seconds"],
+            "unparsed": entry["unparsed"], "validation": entry["validation"],
+            "daily": entry["daily"], "summary": summary_json, "report": entry["report"],
+            "concurrency": entry["concurrency"],
+        }
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    """GET /report?file=<相对路径>[&sheet=<sheet>][&start=YYYY-MM-DD&end=YYYY-MM-DD]、/files、/status
+
+    参数有误 400，越出共享目录 403，文件或 sheet 不存在 404，列映射与表头不符 422，统计出错 500。
+    """
+    server_version = "ivr-report/1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        service = self.server.service
+        try:
+            if url.path == "/report":
+                self._send(200, service.report(*report_query(query)))
+            elif url.path == "/files":
+                self._send(200, {"root": service.root, "files": service.files()})
+            elif url.path in ("/", "/status"):
+                self._send(200, {"root": service.root, "cache": service.results.stats()})
+            else:
+                self._send(404, {"error": f"未知路径：{url.path}"})
+        except QueryError as e:
+            self._send(400, {"error": f"参数有误：{e}"})
+        except PermissionError as e:
+            self._send(403, {"error": str(e)})
+        except FileNotFoundError as e:
+            self._send(404, {"error": str(e)})
+        except Exception as e:
+            # 列映射与文件表头不符是数据问题，不是请求写错了；其余统计出错为服务端错误
+            from ivr_loader import ColumnMappingError
+
+            if isinstance(e, ColumnMappingError):
+                return self._send(422, {"error": str(e)})
+            logger.exception("server request failed: %s", self.path)
+            self._send(500, {"error": str(e)})
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        logger.info("server %s %s", self.address_string(), fmt % args)
+
+
+def make_server(service: ReportService, host: str = "0.0.0.0", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """每个请求一个线程；port 为 0 时由系统分配（测试时用）"""
+    server = ThreadingHTTPServer((host, port), ReportHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(root: str, config_path: str | None = None, host: str = "0.0.0.0", port: int = DEFAULT_PORT,
+          max_entries: int = DEFAULT_CACHE_ENTRIES) -> int:
+    """命令行入口：阻塞运行直到 Ctrl+C"""
+    from ivr_cache import ParsedCache
+    from ivr_config import ConfigManager
+    from ivr_metrics import setup_logging
+
+    if not os.path.isdir(root):
+        print(f"目录不存在：{root}")
+        return 2
+    manager = ConfigManager(config_path=config_path)
+    setup_logging(manager.get_config_dir())
+    cache = ParsedCache(manager.get_config_dir(), manager.get_cache_max_mb())
+    server = make_server(ReportService(root, manager.config, max_entries, cache), host, port)
+    print(f"报告服务已启动：http://{host}:{server.server_address[1]}/ ，共享目录 {os.path.abspath(root)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+# 客户端
+def fetch_report(base_url: str, name: str, start=None, end=None, timeout: float = FETCH_TIMEOUT,
+                 sheet: str | None = None) -> dict:
+    """向报告服务请求 name（相对共享目录的路径）的报告，服务端出错时抛出 RuntimeError"""
+    url = f"{base_url.rstrip('/')}/report?file={quote(name)}"
+    if sheet is not None:
+        url += f"&sheet={quote(sheet)}"
+    if start is not None and end is not None:
+        url += f"&start={quote(str(start))}&end={quote(str(end))}"
+    return _get_json(url, timeout)
+
+
+def fetch_files(base_url: str, timeout: float = FETCH_TIMEOUT) -> list:
+    """服务器共享目录中的文件：[{"name", "size", "modified", "sha256"}, ...]"""
+    return _get_json(f"{base_url.rstrip('/')}/files", timeout)["files"]
+
+
+def fetch_matching_report(base_url: str, file_name: str, sheet: str | None = None,
+                          timeout: float = FETCH_TIMEOUT) -> dict:
+    """本地 file_name 的报告：先在 /files 中按大小和 sha256 找到内容相同的文件（同名优先），
+    再请求它的报告并核对返回的 sha256；服务器上没有这一份时抛出 ValueError
+
+    只按文件名请求时，本地文件与服务器上的同名文件内容不同也会拿到服务器的结果。
+    """
+    size, digest = os.path.getsize(file_name), file_digest(file_name)
+    matches = [f for f in fetch_files(base_url, timeout) if f["size"] == size and f["sha256"] == digest]
+    if not matches:
+        raise ValueError(f"报告服务上没有与本地内容相同的文件：{os.path.basename(file_name)}")
+    base = os.path.basename(file_name)
+    name = next((f["name"] for f in matches if os.path.basename(f["name"]) == base), matches[0]["name"])
+    payload = fetch_report(base_url, name, timeout=timeout, sheet=sheet)
+    if payload.get("sha256") != digest:
+        raise ValueError(f"报告服务上的文件在请求期间被修改：{name}")
+    return payload
+
+
+def _get_json(url: str, timeout: float) -> dict:
+    from urllib.error import HTTPError
+
+    request = Request(url, headers={"Accept-Encoding": "gzip"})
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            if response.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+    except HTTPError as e:
+        try:
+            message = json.loads(e.read().decode("utf-8")).get("error", str(e))
+        except ValueError:
+            message = str(e)
+        raise RuntimeError(f"报告服务返回错误（{e.code}）：{message}") from None
+    return json.loads(body.decode("utf-8"))
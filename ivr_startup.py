@@ -0,0 +1,71 @@
+# 启动耗时测量：从启动进程到窗口显示的时间，可对打包后的 exe 或源码运行
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from ivr_metrics import STARTUP_PROBE_ENV
+
+DEFAULT_TIMEOUT = 120
+
+
+def measure_once(command: list, timeout: float = DEFAULT_TIMEOUT) -> dict:
+    """启动一次，返回 {"seconds": 启动到窗口显示的耗时, "pandas_loaded": 显示时是否已导入 pandas}"""
+    fd, probe = tempfile.mkstemp(suffix=".json", prefix="ivr_startup_")
+    os.close(fd)
+    os.remove(probe)
+    env = dict(os.environ, **{STARTUP_PROBE_ENV: probe})
+    try:
+        start = time.time()
+        subprocess.run(command, env=env, timeout=timeout, check=False,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if not os.path.exists(probe):
+            raise RuntimeError(f"程序没有写出启动记录：{' '.join(command)}")
+        with open(probe, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    finally:
+        if os.path.exists(probe):
+            os.remove(probe)
+    return {"seconds": data["shown"] - start, "pandas_loaded": data["pandas_loaded"]}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="ivr_startup", description="测量启动到窗口显示的耗时")
+    parser.add_argument("--exe", help="打包后的程序路径，默认用当前 Python 运行 ivr_status.py")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="启动次数（默认 5），第一次为冷启动")
+    parser.add_argument("-t", "--target", type=float,
+                        help="中位数目标（秒），指定后超出时退出码为 1；默认只报告不判定")
+    parser.add_argument("-o", "--output", help="把每次结果写成 JSON")
+    args = parser.parse_args(argv)
+
+    if args.exe:
+        command = [os.path.abspath(args.exe)]
+    else:
+        command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "ivr_status.py")]
+
+    runs = []
+    for i in range(max(1, args.runs)):
+        run = measure_once(command)
+        runs.append(run)
+        note = "，显示时已加载 pandas" if run["pandas_loaded"] else ""
+        print(f"第 {i + 1} 次：{run['seconds']:.2f}s{note}")
+
+    seconds = [r["seconds"] for r in runs]
+    median = statistics.median(seconds)
+    target = f"，目标 {args.target:.2f}s" if args.target is not None else ""
+    print(f"冷启动 {seconds[0]:.2f}s，中位数 {median:.2f}s{target}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"command": command, "target": args.target, "median": median, "runs": runs},
+                      f, ensure_ascii=False, indent=2)
+    return 0 if args.target is None or median <= args.target else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
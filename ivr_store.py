@@ -0,0 +1,165 @@
+# 历史数据库（SQLite）：保存每人每天的汇总和违规明细，按日期增量入库，按任意日期范围查询汇总
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from ivr_engine import violation_events, BREAK_SUM_LIMIT, MEAL_LIMIT, REPORT_KEYS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    day TEXT PRIMARY KEY,
+    source TEXT,
+    ingested_at TEXT
+);
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT NOT NULL,
+    emp TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    meal REAL,
+    break_sum REAL,
+    break_once INTEGER NOT NULL DEFAULT 0,
+    break_shift INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, emp)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_emp ON daily (emp, day);
+CREATE TABLE IF NOT EXISTS events (
+    day TEXT NOT NULL,
+    emp TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    shift TEXT,
+    status TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS idx_events_day ON events (day);
+CREATE INDEX IF NOT EXISTS idx_events_emp ON events (emp, day);
+"""
+
+
+def _day(value) -> str:
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _nullable(value):
+    return None if value is None or pd.isna(value) else float(value)
+
+
+class HistoryStore:
+    """每次操作单独连接，可在后台线程中使用"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @classmethod
+    def in_dir(cls, base_dir: str) -> "HistoryStore":
+        return cls(os.path.join(base_dir, "history.sqlite3"))
+
+    @contextmanager
+    def _connect(self):
+        """一次事务：正常结束提交，异常回滚，最后关闭连接"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # 入库
+    def ingest(self, report_dict: dict, flagged: pd.DataFrame | None = None, source: str = "") -> list:
+        """写入文件中出现的日期，这些日期的旧数据整体替换；返回写入的日期"""
+        days = [_day(d) for d in report_dict]
+        if not days:
+            return []
+
+        daily_rows = []
+        for day, rules in report_dict.items():
+            emps = list(dict.fromkeys(e for key in REPORT_KEYS for e in rules[key]))
+            for seq, emp in enumerate(emps):
+                daily_rows.append((
+                    _day(day), str(emp), seq,
+                    _nullable(rules["meal"].get(emp)),
+                    _nullable(rules["break_sum"].get(emp)),
+                    int(rules["break_once"].get(emp, 0)),
+                    int(rules["break_shift"].get(emp, 0)),
+                ))
+
+        event_rows = []
+        if flagged is not None and not flagged.empty:
+            events = violation_events(flagged, report_dict)
+            event_rows = list(zip(
+                events["日期"].dt.strftime("%Y-%m-%d"),
+                events["姓名"].astype(str),
+                events["规则"],
+                events["班次"].astype(str),
+                events["状态"].astype(str),
+                events["开始时间"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+                events["结束时间"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+                events["持续时长min"].astype(float),
+            ))
+
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._connect() as conn:
+            placeholders = ",".join("?" * len(days))
+            for table in ("days", "daily", "events"):
+                conn.execute(f"DELETE FROM {table} WHERE day IN ({placeholders})", days)
+            conn.executemany("INSERT INTO days VALUES (?, ?, ?)", [(d, source, now) for d in days])
+            conn.executemany("INSERT INTO daily VALUES (?, ?, ?, ?, ?, ?, ?)", daily_rows)
+            conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", event_rows)
+        return days
+
+    # 查询
+    def date_range(self):
+        """库中已有的 (最早, 最晚) 日期，空库返回 None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT MIN(day), MAX(day) FROM days").fetchone()
+        if row[0] is None:
+            return None
+        return pd.Timestamp(row[0]), pd.Timestamp(row[1])
+
+    def summarize(self, start, end) -> dict:
+        """日期范围汇总，结构同 summarize_report；范围内没有数据返回空字典"""
+        start, end = _day(start), _day(end)
+        with self._connect() as conn:
+            bounds = conn.execute(
+                "SELECT MIN(day), MAX(day) FROM days WHERE day BETWEEN ? AND ?", (start, end)
+            ).fetchone()
+            if bounds[0] is None:
+                return {}
+            rows = conn.execute(
+                """
+                SELECT emp,
+                       SUM(meal > ?) AS meal,
+                       SUM(break_sum > ?) AS break_sum,
+                       SUM(break_once) AS break_once,
+                       SUM(break_shift) AS break_shift
+                FROM daily
+                WHERE day BETWEEN ? AND ?
+                GROUP BY emp
+                ORDER BY MIN(day || printf('%06d', seq))
+                """,
+                (MEAL_LIMIT, BREAK_SUM_LIMIT, start, end),
+            ).fetchall()
+
+        summary = {"start": pd.Timestamp(bounds[0]), "end": pd.Timestamp(bounds[1])}
+        for i, key in enumerate(REPORT_KEYS, start=1):
+            counts = {row[0]: int(row[i]) for row in rows if row[i]}
+            summary[key] = dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+        return summary
+
+    def events(self, start, end, emp: str | None = None) -> pd.DataFrame:
+        """日期范围内的违规明细"""
+        sql = "SELECT * FROM events WHERE day BETWEEN ? AND ?"
+        params = [_day(start), _day(end)]
+        if emp is not None:
+            sql += " AND emp = ?"
+            params.append(emp)
+        with self._connect() as conn:
+            return pd.read_sql_query(sql + " ORDER BY day, start_time", conn, params=params)
@@ -0,0 +1,129 @@
+# 模拟导出数据：按默认 column_config 的表头生成 IVR 状态明细，用于性能测试（真实数据不能外传）
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from ivr_config import ConfigManager
+
+OTHER_STATUSES = ("示忙", "话后", "培训")
+MEAL_MINUTES = (35, 8)       # 就餐时长：均值、标准差
+BREAK_MINUTES = (3, 9)       # 单次小休：均匀分布范围
+LONG_BREAK_RATE = 0.05       # 单次小休超时的比例
+SLOW_RATE = 0.1              # 小休普遍偏长的人员比例（时长翻倍）
+OTHER_MINUTES = (2, 25)
+SHIFT_HOURS = 9
+
+
+def default_settings() -> tuple:
+    """默认班次配置（A–L，J/K/L 跨零点）和列映射"""
+    config = ConfigManager.default_config()
+    return config["shift_config"], config["column_config"]
+
+
+def generate_events(employees: int = 50, days: int = 7, events_per_day: int = 12, seed: int = 0,
+                    start_date: str = "2025-10-01", shift_config: dict | None = None) -> pd.DataFrame:
+    """每人每天一个班次，一次就餐，其余事件为小休和其他状态，列名为统一字段名
+
+    日期为班次所在日期，开始/结束时间只有时刻，跨零点班次零点后的事件
+    由统计时按班次归回当天，和真实导出一致。
+    """
+    if shift_config is None:
+        shift_config, _ = default_settings()
+    rng = np.random.default_rng(seed)
+    codes = np.array(list(shift_config))
+    shift_start = pd.to_timedelta([shift_config[c][0] for c in codes]).to_numpy()
+
+    names = np.array([f"员工{i:04d}" for i in range(employees)])
+    dates = pd.date_range(start_date, periods=days, freq="D").to_numpy()
+    per_day = max(1, events_per_day)
+
+    # 每人每天一个班次
+    shift_idx = rng.integers(0, len(codes), size=(employees, days))
+    emp_idx = np.repeat(np.arange(employees * days), per_day) // days
+    day_idx = np.repeat(np.arange(employees * days), per_day) % days
+    shift_of_row = shift_idx[emp_idx, day_idx]
+    n = employees * days * per_day
+
+    # 每组第一条为就餐，其余约 40% 小休
+    slot = np.tile(np.arange(per_day), employees * days)
+    status = np.where(rng.random(n) < 0.4, "小休", rng.choice(OTHER_STATUSES, size=n)).astype(object)
+    status[slot == 0] = "就餐"
+
+    slow = np.where(rng.random(employees) < SLOW_RATE, 2.0, 1.0)[emp_idx]
+    minutes = np.where(
+        status == "小休",
+        np.where(rng.random(n) < LONG_BREAK_RATE, rng.uniform(8, 15, n), rng.uniform(*BREAK_MINUTES, n) * slow),
+        rng.uniform(*OTHER_MINUTES, n),
+    )
+    meal = status == "就餐"
+    minutes[meal] = np.clip(rng.normal(*MEAL_MINUTES, meal.sum()), 15, 80)
+    minutes = np.round(minutes, 2)
+
+    # 就餐在班次中段，其余事件均匀分布在整个班次内（含首尾半小时）
+    offset_min = np.where(meal, rng.uniform(3.5 * 60, 5 * 60, n), rng.uniform(0, SHIFT_HOURS * 60 - 15, n))
+    start = shift_start[shift_of_row] + pd.to_timedelta(np.round(offset_min * 60), unit="s").to_numpy()
+    end = start + pd.to_timedelta(np.round(minutes * 60), unit="s").to_numpy()
+    order = np.lexsort((start, emp_idx, day_idx))
+    day = pd.Timestamp(0)
+
+    df = pd.DataFrame({
+        "日期": dates[day_idx],
+        "姓名": names[emp_idx],
+        "班次": codes[shift_of_row],
+        "状态": status,
+        "开始时间": (day + pd.to_timedelta(start % np.timedelta64(1, "D"))).time,
+        "结束时间": (day + pd.to_timedelta(end % np.timedelta64(1, "D"))).time,
+        "持续时长min": minutes,
+    })
+    # 按日期、姓名、班次内先后排序
+    return df.iloc[order].reset_index(drop=True)
+
+
+def write_workbook(df: pd.DataFrame, file_name: str, column_map: dict | None = None):
+    """按列映射改表头后写出；.xlsx 用 openpyxl 只写模式逐行写入，也可写 .csv / .parquet"""
+    if column_map is None:
+        _, column_map = default_settings()
+    sheet = column_map.get("表名") or "Sheet1"
+    header = [column_map.get(col, col) for col in df.columns]
+
+    if file_name.lower().endswith(".csv"):
+        df.set_axis(header, axis=1).to_csv(file_name, index=False, encoding="utf-8-sig")
+        return
+    if file_name.lower().endswith(".parquet"):
+        df.set_axis(header, axis=1).to_parquet(file_name, index=False)
+        return
+
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet)
+    ws.append(header)
+    days = df["日期"].dt.date
+    for row in zip(days, *(df[col] for col in df.columns[1:])):
+        ws.append(row)
+    wb.save(file_name)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="ivr_synth", description="生成模拟 IVR 状态导出")
+    parser.add_argument("output", help="输出文件（.xlsx、.csv 或 .parquet）")
+    parser.add_argument("-n", "--employees", type=int, default=50, help="人数（默认 50）")
+    parser.add_argument("-d", "--days", type=int, default=7, help="天数（默认 7）")
+    parser.add_argument("-e", "--events", type=int, default=12, help="每人每天事件数（默认 12）")
+    parser.add_argument("--start", default="2025-10-01", help="开始日期（默认 2025-10-01）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+
+    df = generate_events(args.employees, args.days, args.events, args.seed, args.start)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    write_workbook(df, args.output)
+    print(f"{args.output}：{len(df)} 行")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# 单人时间线：每天一行，灰色为班次时段，色块为就餐/小休，违规的事件用提醒色
+
+import math
+
+from PyQt6.QtCore import QEvent, QRectF, Qt
+from PyQt6.QtGui import QBrush, QColor, QPainter, QPen
+from PyQt6.QtWidgets import QDialog, QLabel, QScrollArea, QToolTip, QVBoxLayout, QWidget
+
+from ivr_models import WARN_COLOR
+
+ROW_HEIGHT = 24
+AXIS_HEIGHT = 20
+LABEL_WIDTH = 170
+MARGIN = 12
+SHIFT_COLOR = "#E8E8E8"
+STATUS_COLORS = {"就餐": "#7EB6E6", "小休": "#9CCB86"}
+OTHER_COLOR = "#C8C8C8"
+
+
+def _clock(hours: float) -> str:
+    minutes = int(round(hours * 60))
+    text = f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+    return f"次日{text}" if minutes >= 24 * 60 else text
+
+
+class TimelineWidget(QWidget):
+    """days 来自 NameIndex.timeline；横轴为小时，范围取所有班次和事件的并集"""
+
+    def __init__(self, days: list, parent=None):
+        super().__init__(parent)
+        self.days = days
+        spans = [h for d in days for h in d["shift_span"]] + [h for d in days for e in d["events"] for h in e[:2]]
+        spans = [h for h in spans if not math.isnan(h)]
+        self.first_hour = math.floor(min(spans)) if spans else 0
+        self.last_hour = max(math.ceil(max(spans)), self.first_hour + 1) if spans else 24
+        self.blocks = []  # (矩形, 提示文本)，用于鼠标提示
+        self.setMinimumHeight(AXIS_HEIGHT + ROW_HEIGHT * len(days) + MARGIN)
+        self.setMinimumWidth(LABEL_WIDTH + 400)
+
+    def _x(self, hours: float) -> float:
+        width = self.width() - LABEL_WIDTH - MARGIN
+        return LABEL_WIDTH + (hours - self.first_hour) / (self.last_hour - self.first_hour) * width
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        grid = QPen(QColor("#DDDDDD"))
+        text_pen = QPen(QColor("#333333"))
+        self.blocks = []
+
+        # 横轴：每小时一条竖线
+        for hour in range(self.first_hour, self.last_hour + 1):
+            x = self._x(hour)
+            painter.setPen(grid)
+            painter.drawLine(int(x), AXIS_HEIGHT, int(x), self.height())
+            painter.setPen(text_pen)
+            painter.drawText(QRectF(x - 20, 0, 40, AXIS_HEIGHT), Qt.AlignmentFlag.AlignCenter, f"{hour % 24:02d}")
+
+        for row, day in enumerate(self.days):
+            top = AXIS_HEIGHT + row * ROW_HEIGHT
+            label = f"{day['day']:%m-%d} {day['shift']}班"
+            if day["meal"] is not None:
+                label += f" 餐{day['meal']:.0f}"
+            if day["break_sum"] is not None:
+                label += f" 休{day['break_sum']:.0f}"
+            painter.setPen(text_pen)
+            painter.drawText(QRectF(4, top, LABEL_WIDTH - 8, ROW_HEIGHT),
+                             Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, label)
+
+            start, end = day["shift_span"]
+            if not (math.isnan(start) or math.isnan(end)):
+                rect = QRectF(self._x(start), top + 3, self._x(end) - self._x(start), ROW_HEIGHT - 6)
+                painter.fillRect(rect, QColor(SHIFT_COLOR))
+                self.blocks.append((rect, f"{day['shift']}班 {_clock(start)} ~ {_clock(end)}"))
+
+            for s, e, status, warn, minutes in day["events"]:
+                color = WARN_COLOR if warn else STATUS_COLORS.get(status, OTHER_COLOR)
+                rect = QRectF(self._x(s), top + 6, max(self._x(e) - self._x(s), 2.0), ROW_HEIGHT - 12)
+                painter.fillRect(rect, QBrush(QColor(color)))
+                tip = f"{status} {_clock(s)} ~ {_clock(e)}，{minutes:.1f} 分钟"
+                self.blocks.append((rect, tip + ("（违规）" if warn else "")))
+        painter.end()
+
+    def event(self, event):
+        if event.type() == QEvent.Type.ToolTip:
+            pos = event.position() if hasattr(event, "position") else event.pos()
+            # 后画的事件在班次色块之上，优先匹配
+            tip = next((text for rect, text in reversed(self.blocks) if rect.contains(pos.x(), pos.y())), None)
+            if tip:
+                QToolTip.showText(event.globalPos(), tip, self)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().event(event)
+
+
+class TimelineDialog(QDialog):
+    def __init__(self, name, days: list, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"{name} 的时间线")
+        self.resize(820, 520)
+        vbox = QVBoxLayout(self)
+
+        events = [e for d in days for e in d["events"]]
+        meals = sum(1 for e in events if e[2] == "就餐")
+        breaks = sum(1 for e in events if e[2] == "小休")
+        warns = sum(1 for e in events if e[3])
+        vbox.addWidget(QLabel(f"{len(days)} 天，就餐 {meals} 次，小休 {breaks} 次，违规 {warns} 次"
+                              f"（蓝色就餐、绿色小休、红色违规，灰色为班次时段）"))
+
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(TimelineWidget(days))
+        vbox.addWidget(scroll)
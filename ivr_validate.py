@@ -0,0 +1,132 @@
+# 数据质量检查：统计时被剔除或可疑的行按原因分类，整列掩码运算，不依赖 Qt
+
+import csv
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from ivr_engine import EVENT_FIELDS
+from ivr_export import EVENT_CHUNK
+
+# 持续时长min 与 结束-开始 相差超过这个分钟数算不符
+DURATION_TOLERANCE = 1.0
+
+ISSUE_LABELS = {
+    "date": "日期缺失或无法解析",
+    "time": "开始/结束时间缺失或无法解析",
+    "shift": "班次缺失或不在班次配置中",
+    "after_shift": "下班后开始的小休",
+    "duplicate": "重复事件（同一人同一开始时间，只保留第一条）",
+    "reversed": "结束早于开始且不是跨零点",
+    "duration": "持续时长与结束-开始不符",
+}
+# 这些原因的行不计入统计（已剔除），其余原因的行仍计入
+DROPPED_ISSUES = ("date", "time", "shift", "after_shift", "duplicate")
+ISSUE_HEADER = EVENT_FIELDS + ["问题", "处理"]
+
+
+@dataclass
+class ValidationReport:
+    """counts 为各原因的行数（一行可能有多个原因）；issues 为问题行数，rows 为问题行，附 问题/处理 两列
+
+    从报告服务取回的结果没有 rows。
+    """
+    total: int
+    counts: dict
+    dropped: int
+    unparsed: int = 0
+    issues: int = 0
+    rows: pd.DataFrame | None = field(default=None, repr=False)
+
+    def __bool__(self) -> bool:
+        return bool(self.dropped or any(self.counts.values()))
+
+    def lines(self) -> list:
+        """用于耗时面板、日志和命令行的摘要"""
+        if not self:
+            return [f"数据检查：{self.total} 行，未发现问题"]
+        lines = [f"数据检查：{self.total} 行，剔除 {self.dropped} 行，"
+                 f"另有 {self.issues - self.dropped} 行可疑但仍计入"]
+        for key, count in self.counts.items():
+            if count:
+                note = f"，其中 {self.unparsed} 个单元格无法解析" if key == "time" and self.unparsed else ""
+                action = "已剔除" if key in DROPPED_ISSUES else "仍计入"
+                lines.append(f"  {ISSUE_LABELS[key]}：{count} 行，{action}{note}")
+        return lines
+
+
+def validate_events(events: pd.DataFrame, flagged: pd.DataFrame, calendar, removed: list | None = None,
+                    unparsed: int = 0) -> ValidationReport:
+    """events 为去重后的事件表，flagged 为其 flag_events 结果（行号一致），removed 为
+    去掉的重复行（combine_parts 的 removed，同一 sheet 内和跨 sheet 的重复都在其中），
+    unparsed 为无法解析的时间单元格数
+
+    被剔除的行就是 events 中不在 flagged 里的行，只对这些行判断原因；
+    其余检查都是整列比较。
+    """
+    total = len(events) + sum(len(part) for part in removed or [])
+    masks = {key: np.zeros(len(events), dtype=bool) for key in ISSUE_LABELS}
+
+    # 被剔除的行：按 日期 -> 时间 -> 班次 的顺序归因，都没问题的只能是下班后的小休
+    dropped = ~events.index.isin(flagged.index)
+    if dropped.any():
+        lost = events[dropped]
+        no_date = lost["日期"].isna().to_numpy()
+        no_time = (lost["开始时间"].isna() | lost["结束时间"].isna()).to_numpy() & ~no_date
+        window = calendar.windows(lost["日期"], lost["班次"], lost["姓名"])
+        no_shift = (window["班次"].isna() | window["班次开始"].isna()).to_numpy() & ~(no_date | no_time)
+        positions = np.flatnonzero(dropped)
+        masks["date"][positions] = no_date
+        masks["time"][positions] = no_time
+        masks["shift"][positions] = no_shift
+        masks["after_shift"][positions] = ~(no_date | no_time | no_shift)
+
+    # 重复行在 combine_parts 中已剔除，只来自 removed
+
+    # 时长：结束早于开始时按跨零点理解，持续时长对得上就不算问题
+    length = ((events["结束时间"] - events["开始时间"]) / pd.Timedelta(minutes=1)).to_numpy(dtype=float)
+    recorded = events["持续时长min"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        wrapped = np.abs(recorded - length % (24 * 60)) > DURATION_TOLERANCE
+        backwards = length < 0
+        masks["reversed"] = backwards & wrapped
+        mismatch = np.isnan(recorded) | (np.abs(recorded - length) > DURATION_TOLERANCE)
+        masks["duration"] = ~backwards & ~np.isnan(length) & mismatch
+
+    counts = {key: int(mask.sum()) for key, mask in masks.items()}
+    counts["duplicate"] += sum(len(part) for part in removed or [])
+    hit = np.logical_or.reduce(list(masks.values()))
+    rows = _issue_rows(events[hit], {key: mask[hit] for key, mask in masks.items()}, dropped[hit])
+    if removed:
+        extra = pd.concat(removed, ignore_index=True)[EVENT_FIELDS]
+        extra = extra.assign(问题=ISSUE_LABELS["duplicate"], 处理="已剔除")
+        rows = pd.concat([rows, extra], ignore_index=True)
+    n_dropped = int(dropped.sum()) + sum(len(part) for part in removed or [])
+    return ValidationReport(total, counts, n_dropped, unparsed, len(rows), rows)
+
+
+def _issue_rows(events: pd.DataFrame, masks: dict, dropped: np.ndarray) -> pd.DataFrame:
+    """问题行附上原因（多个原因用顿号连接）和处理方式；只对问题行拼接文本"""
+    labels = pd.Series("", index=events.index, dtype=object)
+    for key, mask in masks.items():
+        if mask.any():
+            labels[mask] = labels[mask] + np.where(labels[mask] == "", "", "、") + ISSUE_LABELS[key]
+    rows = events[EVENT_FIELDS].astype({col: object for col in ("姓名", "班次", "状态")}).reset_index(drop=True)
+    return rows.assign(问题=labels.to_numpy(), 处理=np.where(dropped, "已剔除", "仍计入"))
+
+
+def write_issue_csv(path: str, report: ValidationReport) -> list:
+    """问题行写成 CSV（utf-8-sig），时间保留到秒"""
+    rows = report.rows if report.rows is not None else pd.DataFrame(columns=ISSUE_HEADER)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(ISSUE_HEADER)
+        for begin in range(0, len(rows), EVENT_CHUNK):
+            part = rows.iloc[begin:begin + EVENT_CHUNK].copy()
+            part["日期"] = part["日期"].dt.strftime("%Y-%m-%d").fillna("")
+            for col in ("开始时间", "结束时间"):
+                part[col] = part[col].dt.strftime("%Y-%m-%d %H:%M:%S").fillna("")
+            part["持续时长min"] = part["持续时长min"].astype(float).round(2)
+            writer.writerows(part[ISSUE_HEADER].itertuples(index=False, name=None))
+    return [path]
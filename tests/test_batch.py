@@ -0,0 +1,43 @@
+# 批量处理：输出文件名不互相覆盖，每个文件的日报与单独 run_report 的结果相同
+
+import json
+import os
+
+from ivr_batch import output_stems, run_batch
+from ivr_config import ConfigManager
+from ivr_engine import daily_violations, run_report, ShiftCalendar
+from ivr_export import report_to_json
+from ivr_synth import generate_events, write_workbook
+
+
+def test_output_stems():
+    root = os.path.abspath("exports")
+    files = [os.path.join(root, *parts) for parts in
+             (("teamA", "export.xlsx"), ("teamB", "Export.xlsx"), ("teamA", "a.xlsx"), ("teamA", "a.csv"),
+              ("teamB", "b.csv"))]
+    stems = output_stems(files)
+    assert list(stems.values()) == ["teamA_export", "teamB_Export", "teamA_a_xlsx", "teamA_a_csv", "b"]
+    assert output_stems([files[0]]) == {files[0]: "export"}
+
+
+def test_same_named_exports_written_separately(tmp_path):
+    config = ConfigManager.default_config()
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+    files = []
+    for seed, team in enumerate(("teamA", "teamB")):
+        (tmp_path / team).mkdir()
+        path = str(tmp_path / team / "export.csv")
+        write_workbook(generate_events(employees=10, days=3, seed=seed), path, config["column_config"])
+        files.append(path)
+
+    out_dir = tmp_path / "out"
+    assert run_batch([str(tmp_path / "teamA"), str(tmp_path / "teamB")], str(config_path), str(out_dir), 2,
+                     "json") == 0
+    calendar = ShiftCalendar(config["shift_config"])
+    for team, path in zip(("teamA", "teamB"), files):
+        with open(out_dir / f"{team}_export_daily.json", encoding="utf-8") as f:
+            written = json.load(f)
+        result = run_report(path, config["column_config"], calendar, workers=1)
+        expected, _ = report_to_json(daily_violations(result.report_dict), {})
+        assert written == json.loads(json.dumps(expected, ensure_ascii=False))
@@ -0,0 +1,49 @@
+# 解析缓存：命中缓存与重新读取的结果相同，缓存写不进去时照常出报表
+
+import pandas as pd
+import pytest
+
+from ivr_cache import ParsedCache
+from ivr_engine import run_report, ShiftCalendar
+from ivr_synth import default_settings, generate_events, write_workbook
+
+
+@pytest.fixture(scope="module")
+def workbook(tmp_path_factory):
+    _, columns = default_settings()
+    path = tmp_path_factory.mktemp("cache_src") / "ivr.xlsx"
+    write_workbook(generate_events(employees=20, days=4, seed=5), str(path), columns)
+    return str(path)
+
+
+def report(workbook, cache=None):
+    shifts, columns = default_settings()
+    return run_report(workbook, columns, ShiftCalendar(shifts), cache=cache, workers=1)
+
+
+def cached_rows(result) -> int:
+    return next(s.rows for s in result.timings.stages if s.name == "cache")
+
+
+def test_cache_hit_matches_fresh_read(workbook, tmp_path):
+    fresh = report(workbook)
+    cache = ParsedCache(str(tmp_path))
+    first = report(workbook, cache)
+    assert cached_rows(first) == 0
+    second = report(workbook, cache)
+    assert cached_rows(second) == len(fresh.events)
+    for result in (first, second):
+        assert result.report_dict == fresh.report_dict
+        assert result.unparsed == fresh.unparsed
+        pd.testing.assert_frame_equal(result.events.reset_index(drop=True), fresh.events.reset_index(drop=True),
+                                      check_dtype=False, check_categorical=False)
+
+
+def test_cache_write_failure_is_not_fatal(workbook, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    cache = ParsedCache(str(tmp_path))
+    monkeypatch.setattr(cache, "_save_index", fail)
+    result = report(workbook, cache)
+    assert result.report_dict == report(workbook).report_dict
@@ -0,0 +1,60 @@
+# 小休并发：扫描线结果与逐个时刻数人数的朴素做法相同
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ivr_concurrency import break_concurrency, SLOT_MINUTES
+from ivr_engine import aggregate_events, prepare_events, EVENT_FIELDS, ShiftCalendar
+from ivr_synth import default_settings, generate_events
+
+LIMIT = 6
+
+
+def naive(start: np.ndarray, end: np.ndarray, limit: int, slot: int) -> dict:
+    """相邻端点之间人数不变：在每个端点上数一遍 start <= t < end 的区间"""
+    points = np.unique(np.concatenate([start, end]))
+    levels = [int(((start <= t) & (t < end)).sum()) for t in points[:-1]]
+    peak = max(levels)
+    slots, windows = {}, []
+    for t, until, level in zip(points[:-1], points[1:], levels):
+        if level > 0:
+            for s in range(t // slot, (until - 1) // slot + 1):
+                slots[s * slot] = max(slots.get(s * slot, 0), level)
+        if level > limit:
+            if windows and windows[-1][1] == t:
+                windows[-1] = (windows[-1][0], until, max(windows[-1][2], level))
+            else:
+                windows.append((t, until, level))
+    return {"peak": peak, "peak_at": points[levels.index(peak)], "slots": slots, "windows": windows}
+
+
+@pytest.fixture(scope="module")
+def flagged():
+    shifts, _ = default_settings()
+    events, _ = prepare_events(generate_events(employees=80, days=3, seed=11)[EVENT_FIELDS])
+    flagged, _ = aggregate_events(events, ShiftCalendar(shifts))
+    return flagged
+
+
+def ns(values: pd.Series) -> np.ndarray:
+    return values.to_numpy(dtype="datetime64[ns]").view("i8")
+
+
+def test_sweep_matches_naive_count(flagged):
+    result = break_concurrency(flagged, LIMIT)
+    brk = flagged[flagged["break"] & (flagged["结束时间"] > flagged["开始时间"])]
+    assert list(result) == sorted(brk["日期"].unique())
+    slot = pd.Timedelta(minutes=SLOT_MINUTES).value
+    assert any(info["windows"] for info in result.values())
+
+    for day, group in brk.groupby("日期"):
+        info = result[day]
+        expected = naive(ns(group["开始时间"]), ns(group["结束时间"]), LIMIT, slot)
+        assert info["peak"] == expected["peak"]
+        assert info["peak_at"] == pd.Timestamp(expected["peak_at"])
+        assert {t.value: n for t, n in info["slots"].items()} == expected["slots"]
+        assert [(s.value, e.value, n) for s, e, n in info["windows"]] == expected["windows"]
+        for shift, part in group.groupby(group["班次"].astype(str)):
+            by_shift = naive(ns(part["开始时间"]), ns(part["结束时间"]), LIMIT, slot)
+            assert info["shifts"][shift] == (by_shift["peak"], pd.Timestamp(by_shift["peak_at"]))
@@ -0,0 +1,33 @@
+# 数据立方：任意日期范围的汇总与对该范围的 report_dict 调用 summarize_report 相同
+
+import itertools
+
+import pandas as pd
+import pytest
+
+from ivr_cube import MetricCube
+from ivr_engine import aggregate_events, prepare_events, summarize_report, EVENT_FIELDS, ShiftCalendar
+from ivr_synth import default_settings, generate_events
+
+
+@pytest.fixture(scope="module")
+def report_dict():
+    shifts, _ = default_settings()
+    events, _ = prepare_events(generate_events(employees=30, days=6, seed=13)[EVENT_FIELDS])
+    # 缺一天，范围端点落在没有数据的日期上
+    events = events[events["日期"] != pd.Timestamp("2025-10-03")]
+    return aggregate_events(events, ShiftCalendar(shifts))[1]
+
+
+def test_every_range_matches_summarize_report(report_dict):
+    cube = MetricCube.from_report(report_dict)
+    assert len(cube) == 5
+    days = pd.date_range("2025-09-30", "2025-10-07")
+    for start, end in itertools.combinations_with_replacement(days, 2):
+        expected = summarize_report({d: r for d, r in report_dict.items() if start <= d <= end})
+        actual = cube.summarize(start, end)
+        assert actual == expected, (start, end)
+        for key in ("meal", "break_sum", "break_once", "break_shift"):
+            assert sorted(actual.get(key, {}).values(), reverse=True) == list(actual.get(key, {}).values())
+    assert cube.summarize() == summarize_report(report_dict)
+    assert cube.summarize("2025-10-05", "2025-10-02") == {}
@@ -0,0 +1,76 @@
+# 报告导出：xlsx / csv / html / json 读回后都与 run_report 算出的日报、汇总、违规明细相同
+
+import json
+import re
+
+import pandas as pd
+import pytest
+
+from ivr_engine import daily_violations, run_report, summarize_report, violation_events, RULE_LABELS, ShiftCalendar
+from ivr_export import export_report, report_to_json, DAILY_HEADER, EVENT_HEADER, SUMMARY_HEADER
+from ivr_synth import default_settings, generate_events, write_workbook
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    shifts, columns = default_settings()
+    root = tmp_path_factory.mktemp("export")
+    write_workbook(generate_events(employees=30, days=4, seed=12), str(root / "ivr.csv"), columns)
+    result = run_report(str(root / "ivr.csv"), columns, ShiftCalendar(shifts), workers=1)
+    daily = daily_violations(result.report_dict)
+    summary = summarize_report(result.report_dict)
+    events = violation_events(result.flagged, result.report_dict)
+    written = export_report(str(root / "out"), ("xlsx", "csv", "html", "json"), daily, summary, events)
+    return root, daily, summary, events, written
+
+
+def expected_tables(daily: dict, summary: dict, events: pd.DataFrame) -> dict:
+    day = "%Y-%m-%d"
+    daily_table = pd.DataFrame(
+        [(d.strftime(day), RULE_LABELS[key], emp, value)
+         for d, rules in daily.items() for key, people in rules.items() for emp, value in people.items()],
+        columns=DAILY_HEADER,
+    )
+    summary_table = pd.DataFrame(
+        [(summary["start"].strftime(day), summary["end"].strftime(day), RULE_LABELS[key], emp, count)
+         for key in RULE_LABELS for emp, count in summary[key].items()],
+        columns=SUMMARY_HEADER,
+    )
+    event_table = events.astype({"姓名": str, "班次": str, "状态": str}).assign(
+        日期=events["日期"].dt.strftime(day), 规则=events["规则"].map(RULE_LABELS),
+        持续时长min=events["持续时长min"].astype(float),
+    ).reset_index(drop=True)[EVENT_HEADER]
+    return {"daily": daily_table, "summary": summary_table, "events": event_table}
+
+
+def as_text(table: pd.DataFrame) -> pd.DataFrame:
+    """时间列转成文本，方便与 csv / html 比较"""
+    table = table.copy()
+    for col in ("开始时间", "结束时间"):
+        if col in table:
+            table[col] = pd.to_datetime(table[col]).dt.strftime("%Y-%m-%d %H:%M:%S")
+    return table
+
+
+def test_all_formats_match_report(exported):
+    root, daily, summary, events, written = exported
+    assert len(written) == 7
+    expected = expected_tables(daily, summary, events)
+    assert all(len(table) for table in expected.values())
+
+    sheets = pd.read_excel(root / "out.xlsx", sheet_name=None)
+    for name, title in (("daily", "日报"), ("summary", "汇总"), ("events", "违规明细")):
+        pd.testing.assert_frame_equal(as_text(sheets[title]), as_text(expected[name]), check_dtype=False)
+        from_csv = pd.read_csv(root / f"out_{name}.csv", encoding="utf-8-sig", dtype={"日期": str})
+        pd.testing.assert_frame_equal(from_csv, as_text(expected[name]), check_dtype=False)
+
+    page = (root / "out.html").read_text(encoding="utf-8")
+    assert page.count("<tr>") == sum(len(table) + 1 for table in expected.values())
+    first_event = as_text(expected["events"]).iloc[0]
+    assert re.search("".join(f"<td>{value}</td>" for value in first_event.iloc[:3]), page)
+
+    daily_json, summary_json = report_to_json(daily, summary)
+    with open(root / "out_daily.json", encoding="utf-8") as f:
+        assert json.load(f) == json.loads(json.dumps(daily_json))
+    with open(root / "out_summary.json", encoding="utf-8") as f:
+        assert json.load(f) == json.loads(json.dumps(summary_json))
@@ -0,0 +1,40 @@
+# 热力图：前缀和分箱的结果与逐条事件计算与各时段重叠分钟数相同
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ivr_engine import aggregate_events, prepare_events, EVENT_FIELDS, ShiftCalendar
+from ivr_heatmap import break_heatmap, HEATMAP_STATUSES
+from ivr_synth import default_settings, generate_events
+
+
+@pytest.fixture(scope="module")
+def flagged():
+    shifts, _ = default_settings()
+    events, _ = prepare_events(generate_events(employees=30, days=3, seed=17)[EVENT_FIELDS])
+    return aggregate_events(events, ShiftCalendar(shifts))[0]
+
+
+def naive(flagged: pd.DataFrame, heatmap, statuses) -> np.ndarray:
+    rows = {key: r for r, key in enumerate(heatmap.rows)}
+    values = np.zeros_like(heatmap.values)
+    bounds = heatmap.origin + heatmap.slot * np.arange(values.shape[1] + 1)
+    for event in flagged[flagged["状态"].isin(list(statuses))].itertuples(index=False):
+        day = event.日期.normalize()
+        start = (event.开始时间 - day) / pd.Timedelta(minutes=1)
+        end = (event.结束时间 - day) / pd.Timedelta(minutes=1)
+        if not end > start:
+            continue
+        overlap = np.minimum(end, bounds[1:]) - np.maximum(start, bounds[:-1])
+        values[rows[(event.班次, day)]] += np.clip(overlap, 0, None)
+    return values
+
+
+@pytest.mark.parametrize("slot, statuses", [(5, ("小休",)), (15, HEATMAP_STATUSES), (30, ("就餐",))])
+def test_heatmap_matches_per_event_overlap(flagged, slot, statuses):
+    shifts, _ = default_settings()
+    heatmap = break_heatmap(flagged, slot, statuses, shift_order=list(shifts))
+    assert heatmap.shifts() == [code for code in shifts if code in set(flagged["班次"].astype(str))]
+    # 结果保留两位小数
+    np.testing.assert_allclose(heatmap.values, naive(flagged, heatmap, statuses), atol=0.005 + 1e-9)
@@ -0,0 +1,64 @@
+# 按列映射流式读取：只取映射到的列，结果与整表读取后改名相同；缺列时报出全部缺失项
+
+import pandas as pd
+import pytest
+
+from ivr_engine import run_report, EVENT_FIELDS, ShiftCalendar
+from ivr_loader import mapped_columns, read_xlsx_columns, resolve_columns, ColumnMappingError
+from ivr_synth import default_settings, generate_events, write_workbook
+
+
+@pytest.fixture(scope="module")
+def settings():
+    return default_settings()
+
+
+@pytest.fixture(scope="module")
+def events():
+    return generate_events(employees=12, days=3, seed=8)
+
+
+@pytest.fixture(scope="module")
+def wide(tmp_path_factory, settings, events):
+    """多出无关列、列顺序打乱的导出"""
+    _, columns = settings
+    df = events.assign(工号=range(len(events)), 备注="x")
+    df = df[["日期", "备注", "结束时间", "姓名", "工号", "状态", "持续时长min", "开始时间", "班次"]]
+    path = tmp_path_factory.mktemp("loader") / "wide.xlsx"
+    write_workbook(df, str(path), columns)
+    return str(path)
+
+
+def test_streamed_columns_match_full_read(settings, wide):
+    _, columns = settings
+    full = pd.read_excel(wide)
+    expected = full.rename(columns={v: k for k, v in mapped_columns(columns).items()})[EVENT_FIELDS]
+    # 块比表小，多块拼接
+    streamed = read_xlsx_columns(wide, columns, chunk_rows=25)
+    assert list(streamed.columns) == EVENT_FIELDS
+    pd.testing.assert_frame_equal(streamed[["日期", "持续时长min"]], expected[["日期", "持续时长min"]],
+                                  check_dtype=False)
+    for col in ("姓名", "班次", "状态", "开始时间", "结束时间"):
+        assert list(streamed[col]) == list(expected[col])
+
+
+def test_report_from_wide_workbook_matches_plain(settings, events, wide, tmp_path):
+    shifts, columns = settings
+    plain = tmp_path / "plain.csv"
+    write_workbook(events, str(plain), columns)
+    calendar = ShiftCalendar(shifts)
+    assert (run_report(wide, columns, calendar, workers=1).report_dict
+            == run_report(str(plain), columns, calendar, workers=1).report_dict)
+
+
+def test_missing_columns_are_all_reported(settings, wide):
+    shifts, columns = settings
+    broken = dict(columns, 姓名="员工姓名", 状态="状态名称")
+    with pytest.raises(ColumnMappingError) as info:
+        read_xlsx_columns(wide, broken)
+    message = str(info.value)
+    assert "姓名（员工姓名）" in message and "状态（状态名称）" in message
+    with pytest.raises(ColumnMappingError):
+        run_report(wide, broken, ShiftCalendar(shifts), workers=1)
+    with pytest.raises(ColumnMappingError):
+        resolve_columns([None, " 日期 "], columns)
@@ -0,0 +1,38 @@
+# 并行统计：按日期分块在进程池中统计的结果与单进程 flag_events + aggregate_flags 相同
+
+import pandas as pd
+import pytest
+
+import ivr_engine
+from ivr_engine import aggregate_events, aggregate_flags, flag_events, prepare_events, EVENT_FIELDS, ShiftCalendar
+from ivr_synth import default_settings, generate_events
+
+
+@pytest.fixture(scope="module")
+def events():
+    df = generate_events(employees=40, days=5, seed=16)
+    # 缺日期、未知班次的行在各进程里一样被剔除
+    df.loc[3, "日期"] = pd.NaT
+    df.loc[8, "班次"] = "Z"
+    return prepare_events(df[EVENT_FIELDS])[0]
+
+
+@pytest.fixture(scope="module")
+def calendar():
+    shifts, _ = default_settings()
+    # 排班表把第一个人每天改成跨零点的 K 班
+    roster = pd.DataFrame({"日期": pd.date_range("2025-10-01", periods=5), "姓名": "员工0000", "班次": "K"})
+    return ShiftCalendar(shifts, roster)
+
+
+def test_parallel_matches_single_process(events, calendar, monkeypatch):
+    calls = []
+    parallel = ivr_engine._aggregate_parallel
+    monkeypatch.setattr(ivr_engine, "PARALLEL_MIN_ROWS", 0)
+    monkeypatch.setattr(ivr_engine, "_aggregate_parallel", lambda *args: calls.append(args) or parallel(*args))
+
+    flagged, report_dict = aggregate_events(events, calendar, workers=3)
+    assert len(calls) == 1
+    expected = flag_events(events, calendar)
+    assert report_dict == aggregate_flags(expected)
+    pd.testing.assert_frame_equal(flagged, expected, check_dtype=False, check_categorical=False)
@@ -0,0 +1,76 @@
+# 改配置后重新统计：改班次、排班表、列映射后的结果与按新配置整体 run_report 相同
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ivr_concurrency import break_concurrency
+from ivr_engine import run_report, ShiftCalendar
+from ivr_refresh import changed_fields, reapply_settings, shift_changes
+from ivr_synth import default_settings, generate_events, write_workbook
+
+LIMIT = 4
+
+
+@pytest.fixture(scope="module")
+def export(tmp_path_factory):
+    """多两列备选：另一套时长和另一套日期（整体后移一天），改列映射时切换过去"""
+    _, columns = default_settings()
+    df = generate_events(employees=30, days=4, seed=18)
+    df = df.assign(核算时长=np.round(df["持续时长min"] * 1.3, 2), 统计日期=df["日期"] + pd.Timedelta(days=1))
+    path = tmp_path_factory.mktemp("reapply") / "ivr.csv"
+    write_workbook(df, str(path), columns)
+    return str(path)
+
+
+def assert_same(result, full):
+    assert result.report_dict == full.report_dict
+    assert result.unparsed == full.unparsed
+    assert result.concurrency == break_concurrency(full.flagged, LIMIT)
+    assert result.validation.counts == full.validation.counts
+    pd.testing.assert_frame_equal(result.flagged.reset_index(drop=True), full.flagged.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+
+
+def initial(export, shifts, columns, roster=None):
+    result = run_report(export, columns, ShiftCalendar(shifts, roster), workers=1)
+    result.concurrency = break_concurrency(result.flagged, LIMIT)
+    return result
+
+
+@pytest.mark.parametrize("edit", ["retime", "remove"])
+def test_shift_edits(export, edit):
+    shifts, columns = default_settings()
+    new = dict(shifts)
+    if edit == "retime":
+        new["B"] = ["07:30:00", "16:30:00"]
+        new["K"] = ["16:30:00", "01:30:00"]
+    else:
+        del new["C"]
+    calendar = ShiftCalendar(new)
+    result = reapply_settings(initial(export, shifts, columns), export, columns, calendar,
+                              codes=shift_changes(shifts, new), concurrency_limit=LIMIT)
+    if edit == "retime":
+        assert result.changed_days is not None
+    assert_same(result, run_report(export, columns, calendar, workers=1))
+
+
+def test_roster_change(export):
+    shifts, columns = default_settings()
+    roster = pd.DataFrame({"日期": pd.date_range("2025-10-01", periods=4), "姓名": "员工0003", "班次": "L"})
+    calendar = ShiftCalendar(shifts, roster)
+    result = reapply_settings(initial(export, shifts, columns), export, columns, calendar, codes=None,
+                              concurrency_limit=LIMIT)
+    assert_same(result, run_report(export, columns, calendar, workers=1))
+
+
+@pytest.mark.parametrize("mapping", [{"持续时长min": "核算时长"}, {"日期": "统计日期"}])
+def test_column_edits(export, mapping):
+    shifts, columns = default_settings()
+    new = dict(columns, **mapping)
+    calendar = ShiftCalendar(shifts)
+    fields = changed_fields(columns, new)
+    assert fields == set(mapping)
+    result = reapply_settings(initial(export, shifts, columns), export, new, calendar, fields=fields,
+                              concurrency_limit=LIMIT)
+    assert_same(result, run_report(export, new, calendar, workers=1))
@@ -0,0 +1,64 @@
+# 自动刷新：导出文件追加、修改后增量统计的结果与整体重新 run_report 相同
+
+import os
+
+import pandas as pd
+import pytest
+
+from ivr_concurrency import break_concurrency
+from ivr_engine import run_report, ShiftCalendar
+from ivr_refresh import refresh_report
+from ivr_synth import default_settings, generate_events, write_workbook
+
+LIMIT = 4
+
+
+@pytest.fixture(scope="module")
+def settings():
+    shifts, columns = default_settings()
+    return ShiftCalendar(shifts), columns
+
+
+def write(df: pd.DataFrame, path: str, columns: dict, tick: int):
+    """写出后把修改时间往后拨，保证能看出文件变了"""
+    write_workbook(df, path, columns)
+    os.utime(path, ns=(tick * 10 ** 9, tick * 10 ** 9))
+
+
+def assert_same(result, full):
+    assert result.report_dict == full.report_dict
+    assert result.unparsed == full.unparsed
+    assert result.concurrency == break_concurrency(full.flagged, LIMIT)
+    assert result.validation.counts == full.validation.counts
+    pd.testing.assert_frame_equal(result.flagged.reset_index(drop=True), full.flagged.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+
+
+def test_refresh_matches_full_report(settings, tmp_path):
+    calendar, columns = settings
+    path = str(tmp_path / "ivr.csv")
+    base = generate_events(employees=30, days=4, seed=14)
+    write(base, path, columns, 1)
+    previous = run_report(path, columns, calendar, workers=1)
+
+    # 追加一天：第一次刷新整体解析（run_report 的结果没有快照），之后只解析新增行
+    extra = generate_events(employees=30, days=2, seed=15, start_date="2025-10-05")
+    steps = [
+        pd.concat([base, extra[extra["日期"] == pd.Timestamp("2025-10-05")]]),
+        pd.concat([base, extra]),
+    ]
+    # 改掉一行的时长、删掉一行
+    edited = steps[-1].reset_index(drop=True)
+    edited.loc[10, "持续时长min"] = 70.0
+    steps.append(edited.drop(index=20))
+
+    for tick, df in enumerate(steps, start=2):
+        write(df, path, columns, tick)
+        previous = refresh_report(path, columns, calendar, previous=previous, concurrency_limit=LIMIT)
+        assert_same(previous, run_report(path, columns, calendar, workers=1))
+        if tick == 3:
+            assert previous.changed_days == [pd.Timestamp("2025-10-06")]
+
+    unchanged = refresh_report(path, columns, calendar, previous=previous, concurrency_limit=LIMIT)
+    assert unchanged.changed_days == []
+    assert_same(unchanged, run_report(path, columns, calendar, workers=1))
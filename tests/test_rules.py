@@ -0,0 +1,205 @@
+# 规则统计：向量化的 build_report_dict 与最初逐行 iterrows 的实现对比
+
+import math
+from datetime import date, datetime, time, timedelta
+
+import pandas as pd
+import pytest
+
+from ivr_engine import build_report_dict, daily_violations, prepare_events, EVENT_FIELDS, ShiftCalendar
+from ivr_synth import default_settings, generate_events
+
+OVERNIGHT = ("J", "K", "L")
+
+
+def force_datetime(x):
+    """最初版本的时间转换：只有时刻的值拼到今天"""
+    if pd.isna(x):
+        return pd.NaT
+    if isinstance(x, datetime):
+        return x
+    if isinstance(x, time):
+        return datetime.combine(date.today(), x)
+    try:
+        return pd.to_datetime(x)
+    except Exception:
+        return pd.NaT
+
+
+def loop_report(df_data: pd.DataFrame, shift_dict: dict, anchor_on_date: bool = False) -> dict:
+    """最初 _report_content 中的逐行循环（除 anchor_on_date 外逐行照搬）
+
+    anchor_on_date 时按 ShiftCalendar 引入的口径：班次放在记录的 日期 上，
+    跨零点班次在下班到上班空档中点之前开始的事件归入零点之后那一段。
+    """
+    report_dict = {}
+    df_data = df_data.copy()
+    df_shift = pd.DataFrame([
+        {"班次": k, "开始时间": v[0], "结束时间": v[1]}
+        for k, v in shift_dict.items()
+    ])
+
+    for col in ["开始时间", "结束时间"]:
+        df_data[col] = df_data[col].apply(force_datetime)
+        df_shift[col] = df_shift[col].apply(force_datetime)
+
+    df_data["持续时长min"] = pd.to_numeric(df_data["持续时长min"], errors="coerce").round(2)
+    df_data["日期"] = pd.to_datetime(df_data["日期"], errors="coerce")
+
+    for idx, row in df_data.iterrows():
+        date_str = row["日期"]
+        emp = row["姓名"]
+        shift = row["班次"]
+        status = row["状态"]
+        start_t = row["开始时间"]
+        end_t = row["结束时间"]
+        dur = row["持续时长min"]
+
+        if pd.isna(start_t) or pd.isna(end_t) or pd.isna(shift) or pd.isna(date_str):
+            continue
+
+        shift_row = df_shift[df_shift["班次"] == shift]
+        if shift_row.empty:
+            continue
+        shift_start = shift_row.iloc[0]["开始时间"]
+        shift_end = shift_row.iloc[0]["结束时间"]
+        if shift_end < shift_start:
+            shift_end += timedelta(days=1)
+
+        if anchor_on_date:
+            start_t = datetime.combine(date_str.date(), start_t.time())
+            shift_start = datetime.combine(date_str.date(), shift_start.time())
+            shift_end = datetime.combine(date_str.date(), shift_end.time())
+            if shift_end < shift_start:
+                shift_end += timedelta(days=1)
+                gap = timedelta(days=1) - (shift_end - shift_start)
+                if start_t < shift_start - gap / 2:
+                    start_t += timedelta(days=1)
+        else:
+            shift_start = datetime.combine(start_t.date(), shift_start.time())
+            shift_end = datetime.combine(start_t.date(), shift_end.time())
+            if shift_end < shift_start:
+                shift_end += timedelta(days=1)
+        if status == "小休" and start_t >= shift_end:
+            continue
+
+        if date_str not in report_dict:
+            report_dict[date_str] = {
+                "meal": {},
+                "break_sum": {},
+                "break_once": {},
+                "break_shift": {}
+            }
+
+        if status == "就餐":
+            report_dict[date_str]["meal"][emp] = report_dict[date_str]["meal"].get(emp, 0) + dur
+
+        if status == "小休":
+            report_dict[date_str]["break_sum"][emp] = report_dict[date_str]["break_sum"].get(emp, 0) + dur
+
+        if status == "小休" and dur > 8:
+            report_dict[date_str]["break_once"][emp] = report_dict[date_str]["break_once"].get(emp, 0) + 1
+
+        if status == "小休":
+            if (shift_start < start_t < shift_start + timedelta(minutes=30)) or \
+                    (shift_end - timedelta(minutes=30) < start_t < shift_end):
+                report_dict[date_str]["break_shift"][emp] = report_dict[date_str]["break_shift"].get(emp, 0) + 1
+
+    return report_dict
+
+
+def boundary_rows() -> pd.DataFrame:
+    """正好落在阈值和班次边界上的事件：就餐 46、小休合计 61、单次 8 分钟，班次首尾正好半小时"""
+    day, next_day = pd.Timestamp("2025-10-01"), pd.Timestamp("2025-10-02")
+    rows = [
+        # A 班 06:00-15:00
+        (day, "边界甲", "A", "就餐", "10:00:00", "10:46:00", 46.0),
+        (day, "边界甲", "A", "小休", "06:00:00", "06:05:00", 5.0),
+        (day, "边界甲", "A", "小休", "06:30:00", "06:38:00", 8.0),
+        (day, "边界甲", "A", "小休", "12:00:00", "12:39:59", 40.0),
+        (day, "边界甲", "A", "小休", "14:30:00", "14:38:00", 8.0),
+        (day, "边界甲", "A", "小休", "15:00:00", "15:08:00", 8.0),
+        (day, "边界乙", "A", "就餐", "10:00:00", "10:46:01", 46.01),
+        (day, "边界乙", "A", "小休", "06:29:59", "06:38:00", 8.01),
+        (day, "边界乙", "A", "小休", "12:00:00", "12:53:00", 53.0),
+        (day, "边界乙", "A", "小休", "14:30:01", "14:38:00", 8.0),
+        # J 班 15:00-00:00，K 班 16:00-01:00，零点之后的事件记在班次开始那天
+        (day, "边界丙", "J", "就餐", "19:00:00", "19:46:00", 46.0),
+        (day, "边界丙", "J", "小休", "23:30:00", "23:38:00", 8.0),
+        (day, "边界丙", "J", "小休", "23:45:00", "23:53:01", 8.01),
+        (day, "边界丙", "J", "小休", "00:00:00", "00:08:00", 8.0),
+        (day, "边界丁", "K", "小休", "00:40:00", "00:50:00", 10.0),
+        (day, "边界丁", "K", "小休", "01:00:00", "01:05:00", 5.0),
+        (day, "边界丁", "K", "小休", "16:00:00", "16:43:00", 43.0),
+        (next_day, "边界丁", "K", "就餐", "20:00:00", "20:46:00", 46.0),
+    ]
+    df = pd.DataFrame(rows, columns=EVENT_FIELDS)
+    for col in ("开始时间", "结束时间"):
+        df[col] = pd.to_datetime(df[col], format="%H:%M:%S").dt.time
+    return df
+
+
+def engine_report(df: pd.DataFrame, shift_dict: dict) -> dict:
+    events, unparsed = prepare_events(df[EVENT_FIELDS])
+    assert unparsed == 0
+    return build_report_dict(events, ShiftCalendar(shift_dict))
+
+
+def assert_same(actual: dict, expected: dict):
+    """日期、规则、人员完全相同，数值允许浮点求和顺序带来的误差，NaN 对 NaN"""
+    assert list(actual) == list(expected)
+    for day, rules in expected.items():
+        for key, people in rules.items():
+            got = actual[day][key]
+            assert list(got) == list(people), (day, key)
+            for emp, value in people.items():
+                if isinstance(value, float) and math.isnan(value):
+                    assert math.isnan(got[emp]), (day, key, emp)
+                else:
+                    assert got[emp] == pytest.approx(value, abs=1e-9), (day, key, emp)
+    # 超时人员（阈值判断）也相同
+    def names(report):
+        return {day: {key: list(people) for key, people in rules.items()}
+                for day, rules in daily_violations(report).items()}
+
+    assert names(actual) == names(expected)
+
+
+@pytest.fixture(scope="module")
+def shifts():
+    return default_settings()[0]
+
+
+def test_day_shifts_match_original_loop(shifts):
+    day_shifts = {code: window for code, window in shifts.items() if code not in OVERNIGHT}
+    df = generate_events(employees=40, days=5, seed=3, shift_config=day_shifts)
+    df = pd.concat([df, boundary_rows().iloc[:10]], ignore_index=True)
+    # 缺失的时长与未知班次
+    df.loc[5, "持续时长min"] = float("nan")
+    df.loc[17, "班次"] = "Z"
+    assert_same(engine_report(df, shifts), loop_report(df, shifts))
+
+
+def test_overnight_shifts_match_loop_anchored_on_date(shifts):
+    df = generate_events(employees=40, days=5, seed=4, shift_config=shifts)
+    assert df["班次"].isin(OVERNIGHT).any()
+    df = pd.concat([df, boundary_rows()], ignore_index=True)
+    assert_same(engine_report(df, shifts), loop_report(df, shifts, anchor_on_date=True))
+
+
+def test_boundaries(shifts):
+    report = engine_report(boundary_rows(), shifts)
+    first = report[pd.Timestamp("2025-10-01")]
+    # 正好 46 / 61 分钟不算超时，正好 8 分钟不算单次超时，正好班次开始/首尾半小时/下班时刻不算首尾
+    assert first["meal"] == {"边界甲": 46.0, "边界乙": 46.01, "边界丙": 46.0}
+    assert first["break_sum"]["边界甲"] == pytest.approx(61.0)
+    assert first["break_once"]["边界甲"] == 1 and first["break_once"]["边界乙"] == 2
+    assert "边界甲" not in first["break_shift"] and first["break_shift"]["边界乙"] == 2
+    # 跨零点：00:00 正好是 J 班下班（剔除），K 班 00:40 在班尾半小时内，01:00 正好下班（剔除）
+    assert first["break_sum"]["边界丙"] == pytest.approx(16.01)
+    assert first["break_shift"]["边界丙"] == 1
+    assert first["break_sum"]["边界丁"] == pytest.approx(53.0)
+    assert first["break_shift"]["边界丁"] == 1
+    violations = daily_violations(report)[pd.Timestamp("2025-10-01")]
+    assert list(violations["meal"]) == ["边界乙"]
+    assert list(violations["break_sum"]) == ["边界乙"]
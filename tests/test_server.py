@@ -0,0 +1,115 @@
+# 报告服务：在 localhost 上启动（端口由系统分配），与本机统计结果对比
+
+import json
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from ivr_config import ConfigManager
+from ivr_engine import run_report, ShiftCalendar
+from ivr_server import (fetch_matching_report, fetch_report, make_server, report_payload, ReportService)
+from ivr_synth import generate_events, write_workbook
+
+
+@pytest.fixture(scope="module")
+def config():
+    config = ConfigManager.default_config()
+    config["break_concurrency_limit"] = 3
+    return config
+
+
+@pytest.fixture(scope="module")
+def share(tmp_path_factory, config):
+    root = tmp_path_factory.mktemp("share")
+    write_workbook(generate_events(employees=20, days=5, seed=1), str(root / "team.csv"), config["column_config"])
+    (root / "sub").mkdir()
+    write_workbook(generate_events(employees=10, days=3, seed=2), str(root / "sub" / "other.csv"),
+                   config["column_config"])
+    return root
+
+
+@pytest.fixture
+def server(share, config):
+    service = ReportService(str(share), config)
+    httpd = make_server(service, "127.0.0.1", 0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", service
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def status_of(url: str) -> int:
+    try:
+        with urlopen(url, timeout=30) as response:
+            return response.status
+    except HTTPError as e:
+        return e.code
+
+
+def test_remote_report_matches_local(server, share, config, tmp_path):
+    url, _ = server
+    # 本地是另一个目录中的同一份文件
+    local = tmp_path / "team.csv"
+    shutil.copy(share / "team.csv", local)
+    payload = fetch_matching_report(url, str(local))
+
+    result = run_report(str(local), config["column_config"], ShiftCalendar(config["shift_config"]), workers=1)
+    assert payload["file"] == "team.csv"
+    assert payload["report"] == json.loads(json.dumps(report_payload(result.report_dict), allow_nan=False))
+    assert payload["unparsed"] == result.unparsed
+    assert payload["validation"]["counts"] == result.validation.counts
+
+
+def test_same_name_with_other_content_is_rejected(server, tmp_path, config):
+    url, _ = server
+    local = tmp_path / "team.csv"
+    write_workbook(generate_events(employees=20, days=5, seed=9), str(local), config["column_config"])
+    with pytest.raises(ValueError):
+        fetch_matching_report(url, str(local))
+
+
+def test_concurrent_requests_share_one_computation(server):
+    url, service = server
+    compute = service.results.compute
+
+    def slow(*args):
+        time.sleep(0.5)
+        return compute(*args)
+
+    service.results.compute = slow
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        payloads = list(pool.map(lambda _: fetch_report(url, "sub/other.csv"), range(6)))
+    stats = service.results.stats()
+    assert stats["misses"] == 1
+    assert stats["shared"] + stats["hits"] == 5
+    assert sorted(p["source"] for p in payloads).count("computed") == 1
+    assert all(p["report"] == payloads[0]["report"] for p in payloads)
+
+
+def test_error_status(server, share, monkeypatch):
+    url, service = server
+    assert status_of(f"{url}/report?file=../team.csv") == 403
+    assert status_of(f"{url}/report?file=missing.csv") == 404
+    assert status_of(f"{url}/nothing") == 404
+    assert status_of(f"{url}/report") == 400
+    assert status_of(f"{url}/report?file=team.csv&start=abc&end=xyz") == 400
+    assert status_of(f"{url}/report?file=team.csv&start=2025-10-01&end=xyz") == 400
+    assert status_of(f"{url}/status") == 200
+    # 表头与列映射不符是数据问题
+    (share / "sub" / "wrong.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+    try:
+        assert status_of(f"{url}/report?file=sub/wrong.csv") == 422
+    finally:
+        (share / "sub" / "wrong.csv").unlink()
+
+    def broken(*args):
+        raise ValueError("统计出错")
+
+    monkeypatch.setattr(service.results, "compute", broken)
+    assert status_of(f"{url}/report?file=team.csv&start=2025-10-01") == 500
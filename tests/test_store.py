@@ -0,0 +1,45 @@
+# 历史数据库：按日期增量入库后，任意日期范围的汇总与 summarize_report 相同
+
+import pandas as pd
+import pytest
+
+from ivr_engine import aggregate_events, prepare_events, summarize_report, violation_events, EVENT_FIELDS, ShiftCalendar
+from ivr_store import HistoryStore
+from ivr_synth import default_settings, generate_events
+
+
+def report(df: pd.DataFrame, calendar: ShiftCalendar) -> tuple:
+    events, _ = prepare_events(df[EVENT_FIELDS])
+    return aggregate_events(events, calendar)
+
+
+@pytest.fixture(scope="module")
+def exports():
+    """第一份 10-01 至 10-05，第二份 10-04 至 10-07（重叠的两天以第二份为准）"""
+    shifts, _ = default_settings()
+    calendar = ShiftCalendar(shifts)
+    first = report(generate_events(employees=25, days=5, seed=1), calendar)
+    second = report(generate_events(employees=25, days=4, seed=2, start_date="2025-10-04"), calendar)
+    return first, second
+
+
+def test_incremental_ingest_matches_summarize_report(exports, tmp_path):
+    (flagged_1, report_1), (flagged_2, report_2) = exports
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    assert store.ingest(report_1, flagged_1, "first.xlsx") == [f"2025-10-0{d}" for d in range(1, 6)]
+    store.ingest(report_2, flagged_2, "second.xlsx")
+    assert store.date_range() == (pd.Timestamp("2025-10-01"), pd.Timestamp("2025-10-07"))
+
+    merged = {day: rules for day, rules in report_1.items() if day < pd.Timestamp("2025-10-04")}
+    merged.update(report_2)
+    for start, end in (("2025-10-01", "2025-10-07"), ("2025-10-02", "2025-10-05"), ("2025-10-06", "2025-10-06")):
+        expected = summarize_report({d: r for d, r in merged.items()
+                                     if pd.Timestamp(start) <= d <= pd.Timestamp(end)})
+        actual = store.summarize(start, end)
+        assert actual == expected
+        for key in ("meal", "break_sum", "break_once", "break_shift"):
+            assert sorted(actual[key].values(), reverse=True) == list(actual[key].values())
+
+    stored = store.events("2025-10-04", "2025-10-07")
+    assert len(stored) == len(violation_events(flagged_2, report_2))
+    assert store.summarize("2025-11-01", "2025-11-30") == {}
@@ -0,0 +1,50 @@
+# 模拟数据与性能基准：生成结果可复现，各输入格式统计结果相同，基准输出结构完整
+
+import argparse
+
+import pandas as pd
+import pytest
+
+from ivr_bench import compare, parse_size, run_bench, STAGES
+from ivr_engine import run_report, EVENT_FIELDS, ShiftCalendar
+from ivr_loader import HAS_PYARROW
+from ivr_synth import default_settings, generate_events, write_workbook
+
+
+def test_generator_is_reproducible():
+    shifts, _ = default_settings()
+    df = generate_events(employees=12, days=3, events_per_day=8, seed=19)
+    pd.testing.assert_frame_equal(df, generate_events(employees=12, days=3, events_per_day=8, seed=19))
+    assert list(df.columns) == EVENT_FIELDS
+    assert len(df) == 12 * 3 * 8
+    # 每人每天一个班次、一次就餐
+    per_day = df.groupby(["日期", "姓名"])
+    assert (per_day["班次"].nunique() == 1).all()
+    assert ((df["状态"] == "就餐").groupby([df["日期"], df["姓名"]]).sum() == 1).all()
+    assert set(df["班次"]) <= set(shifts)
+
+
+@pytest.mark.parametrize("ext", ["xlsx", "csv", "parquet"])
+def test_every_format_gives_the_same_report(tmp_path, ext):
+    if ext == "parquet" and not HAS_PYARROW:
+        pytest.skip("未安装 pyarrow")
+    shifts, columns = default_settings()
+    df = generate_events(employees=15, days=3, seed=20)
+    calendar = ShiftCalendar(shifts)
+    write_workbook(df, str(tmp_path / "ref.csv"), columns)
+    write_workbook(df, str(tmp_path / f"ivr.{ext}"), columns)
+    assert (run_report(str(tmp_path / f"ivr.{ext}"), columns, calendar, workers=1).report_dict
+            == run_report(str(tmp_path / "ref.csv"), columns, calendar, workers=1).report_dict)
+
+
+def test_bench_results(tmp_path):
+    lines = []
+    result = run_bench([parse_size("6x2x5")], 2, str(tmp_path), formats=("csv",), log=lines.append)
+    (entry,) = result["results"]
+    assert (entry["size"], entry["format"], entry["rows"]) == ("6x2x5", "csv", 60)
+    assert set(entry["median"]) >= set(STAGES[:3]) | {"total"}
+    assert all(entry["min"][k] <= entry["median"][k] for k in entry["min"])
+    compare(result, result, log=lines.append)
+    assert "x1.00" in lines[-1]
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_size("6x0")
@@ -0,0 +1,62 @@
+# 数据检查：同一 sheet 内和跨 sheet 的重复行一样剔除，统计结果等于去掉重复后的数据
+
+import pandas as pd
+import pytest
+
+from ivr_engine import run_report, ShiftCalendar
+from ivr_synth import default_settings, generate_events, write_workbook
+from ivr_validate import write_issue_csv
+
+
+@pytest.fixture(scope="module")
+def settings():
+    return default_settings()
+
+
+@pytest.fixture(scope="module")
+def exports(tmp_path_factory, settings):
+    """a：三天数据，末尾重复两行；b：与 a 重叠的最后一天 + 新的一天；clean：去掉重复后的同一份数据"""
+    _, columns = settings
+    root = tmp_path_factory.mktemp("validate")
+    base = generate_events(employees=15, days=3, seed=6)
+    extra = generate_events(employees=15, days=1, seed=7, start_date="2025-10-04")
+    a = pd.concat([base, base.iloc[[3, 10]]], ignore_index=True)
+    b = pd.concat([base[base["日期"] == base["日期"].max()], extra], ignore_index=True)
+    clean = pd.concat([base, extra], ignore_index=True)
+    paths = {}
+    for name, df in (("a", a), ("b", b), ("clean", clean)):
+        paths[name] = str(root / f"{name}.csv")
+        write_workbook(df, paths[name], columns)
+    return paths, 2, len(b) - len(extra)
+
+
+def report(settings, sources):
+    shifts, columns = settings
+    return run_report(sources, columns, ShiftCalendar(shifts), workers=1)
+
+
+def test_duplicates_dropped_within_and_across_sheets(settings, exports, tmp_path):
+    paths, within, across = exports
+    merged = report(settings, [(paths["a"], None), (paths["b"], None)])
+    clean = report(settings, paths["clean"])
+    assert merged.report_dict == clean.report_dict
+    assert len(merged.events) == len(clean.events)
+
+    validation = merged.validation
+    assert validation.counts["duplicate"] == within + across
+    assert validation.total == len(clean.events) + within + across
+    assert validation.dropped == clean.validation.dropped + within + across
+    duplicates = validation.rows[validation.rows["问题"].str.startswith("重复事件")]
+    assert len(duplicates) == within + across
+    assert set(duplicates["处理"]) == {"已剔除"}
+    assert any(line.startswith("  重复事件") and "已剔除" in line for line in validation.lines())
+
+    issues = pd.read_csv(write_issue_csv(str(tmp_path / "issues.csv"), validation)[0], encoding="utf-8-sig")
+    assert len(issues) == validation.issues
+
+
+def test_single_sheet_duplicates_dropped(settings, exports):
+    paths, within, _ = exports
+    single = report(settings, paths["a"])
+    assert single.validation.counts["duplicate"] == within
+    assert len(single.events) == len(report(settings, [(paths["a"], None), (paths["a"], None)]).events)